@@ -0,0 +1,19 @@
+"""Settings for testing signup.routers.ReplicaRouter with two SQLite databases standing
+in for the primary database and its replica. Run the tests with:
+
+    python manage.py test signup.tests.test_replicas --settings=project.replica_test_settings
+"""
+
+# pylint: disable=wildcard-import, unused-wildcard-import
+from project.settings import *
+
+DATABASES = {
+    "default": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": BASE_DIR / "primary.sqlite3",
+    },
+    "replica": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": BASE_DIR / "replica.sqlite3",
+    },
+}
@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/3.2/ref/settings/
 from datetime import time
 from os import environ
 from pathlib import Path
+from tempfile import gettempdir
 
 from decouple import config
 
@@ -52,10 +53,12 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "signup.middleware.CompressionMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "signup.middleware.ReplicaMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -80,6 +83,9 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "project.wsgi.application"
 
+# Live updates on the faculty sign-ups page require serving the project with ASGI.
+ASGI_APPLICATION = "project.asgi.application"
+
 
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
@@ -95,6 +101,22 @@ DATABASES = {
     }
 }
 
+# Read-only faculty views (such as listing and exporting sign-ups) read from this
+# replica of the database if DB_REPLICA_HOST is set. See signup.routers.ReplicaRouter.
+if replica_host := config("DB_REPLICA_HOST", default=""):
+    DATABASES["replica"] = DATABASES["default"] | {
+        "HOST": replica_host,
+        "PORT": config("DB_REPLICA_PORT", default=DATABASES["default"]["PORT"]),
+        "TEST": {"MIRROR": "default"},
+    }
+
+DATABASE_ROUTERS = ["signup.routers.ReplicaRouter"]
+
+# After a session sends a request that might write, its reads go to the primary
+# database for this many seconds, so that users see their own changes even if the
+# replica lags behind.
+DATABASE_REPLICA_PIN_SECONDS = 10
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -280,6 +302,47 @@ DEFAULT_FROM_EMAIL = config("FROM_EMAIL_ADDRESS")
 
 MAX_DATE_RANGE_DAYS = 100
 
+# Schedule templates skip weekends and closed days, so they can safely be applied to a
+# whole school year at once.
+MAX_TEMPLATE_DATE_RANGE_DAYS = 366
+
+# Cancelling class periods with more sign-ups than this runs in the background (using
+# Celery if it is enabled, or a separate thread otherwise).
+BACKGROUND_CANCELLATION_THRESHOLD = 200
+
+# A cancellation that hasn't made progress for this many seconds is assumed to have
+# been interrupted (e.g. by a restart), so it can be restarted from its status page.
+PERIOD_CANCELLATION_STALE_SECONDS = 10 * 60
+
+# Delivers sign-up changes to the faculty sign-ups page. The in-process backend only
+# reaches pages connected to the same process, so deployments with several ASGI worker
+# processes need a backend that shares messages between them.
+SIGNUP_EVENTS_BACKEND = "signup.events.InProcessBackend"
+
+# How often (in seconds) to send a comment on otherwise idle event streams so that
+# proxies don't close them.
+SIGNUP_EVENTS_KEEPALIVE_SECONDS = 15
+
+# Emails such as sign-up removal notices are saved to an outbox and sent in the
+# background, this many per batch over a single connection.
+EMAIL_OUTBOX_BATCH_SIZE = 100
+
+# Emails that fail this many times are no longer retried.
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+
+# Spreadsheets exported in the background are cached in this directory, and reused
+# for this many seconds if the sign-ups haven't changed.
+SPREADSHEET_EXPORT_DIR = Path(gettempdir()) / "signup-exports"
+SPREADSHEET_EXPORT_MAX_AGE = 60 * 60
+
+# Class periods and sign-ups are archived to one gzipped JSON Lines file per school
+# year in this directory before they are deleted. School years end on this
+# (month, day), which the deleteoldclassperiods command can override.
+SIGN_UP_ARCHIVE_DIR = Path(
+    config("SIGN_UP_ARCHIVE_DIR", default=str(BASE_DIR / "archives"))
+)
+SCHOOL_YEAR_END = (7, 1)
+
 # pylint: disable=wildcard-import, unused-wildcard-import
 if DEBUG:
     # Use settings specifically meant for development if DEBUG is True.
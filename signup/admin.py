@@ -1,8 +1,25 @@
 from django.contrib import admin
 
-from signup.models import ClassPeriod, ClassPeriodSignUp, StudentInfo, User
+from signup.models import (
+    ClassPeriod,
+    ClassPeriodSignUp,
+    ClosedDay,
+    OutboxEmail,
+    PeriodCancellation,
+    ScheduleTemplate,
+    ScheduleTemplatePeriod,
+    SpreadsheetExport,
+    StudentInfo,
+    User,
+)
 
 admin.site.register(User)
 admin.site.register(StudentInfo)
 admin.site.register(ClassPeriod)
 admin.site.register(ClassPeriodSignUp)
+admin.site.register(ClosedDay)
+admin.site.register(PeriodCancellation)
+admin.site.register(OutboxEmail)
+admin.site.register(SpreadsheetExport)
+admin.site.register(ScheduleTemplate)
+admin.site.register(ScheduleTemplatePeriod)
@@ -0,0 +1,84 @@
+import asyncio
+import json
+import threading
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from functools import cache
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class BaseEventBackend:
+    """Delivers messages published to a channel to everyone subscribed to it. Backends
+    that share messages between processes (for example, using Redis) can be used by
+    changing ``settings.SIGNUP_EVENTS_BACKEND``."""
+
+    def publish(self, channel, message):
+        """Sends ``message`` (a JSON-serializable object) to the subscribers of
+        ``channel``. May be called from any thread."""
+        raise NotImplementedError
+
+    @asynccontextmanager
+    async def subscribe(self, channel):
+        """An asynchronous context manager that yields an object with an asynchronous
+        ``get()`` method, which returns the next message published to ``channel``."""
+        raise NotImplementedError
+        yield  # pylint: disable=unreachable
+
+
+class InProcessBackend(BaseEventBackend):
+    """Delivers messages to subscribers in the same process, so no external services
+    are needed. Each subscriber receives messages through an :class:`asyncio.Queue` on
+    its own event loop."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscribers = defaultdict(set)
+
+    def publish(self, channel, message):
+        with self.lock:
+            subscribers = list(self.subscribers.get(channel, ()))
+
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, message)
+            except RuntimeError:
+                # The subscriber's event loop was closed before it unsubscribed.
+                pass
+
+    @asynccontextmanager
+    async def subscribe(self, channel):
+        subscriber = (asyncio.get_running_loop(), asyncio.Queue())
+        with self.lock:
+            self.subscribers[channel].add(subscriber)
+        try:
+            yield subscriber[1]
+        finally:
+            with self.lock:
+                self.subscribers[channel].discard(subscriber)
+                if not self.subscribers[channel]:
+                    del self.subscribers[channel]
+
+
+@cache
+def get_backend():
+    return import_string(settings.SIGNUP_EVENTS_BACKEND)()
+
+
+def get_signups_channel(date):
+    return f"signups:{date.isoformat()}"
+
+
+def publish_signup_versions(versions, reset=False):
+    """Notifies the subscribers of each date in ``versions`` (a dictionary mapping dates
+    to their new :class:`signup.models.SignUpDateVersion` versions) that its sign-ups
+    changed."""
+    backend = get_backend()
+    for date, version in versions.items():
+        backend.publish(get_signups_channel(date), {"version": version, "reset": reset})
+
+
+def format_event(message, event="change"):
+    """Formats ``message`` as a server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(message)}\n\n"
@@ -1,6 +1,7 @@
 import django_filters
+from rest_framework.filters import SearchFilter
 
-from signup.models import ClassPeriodSignUp
+from signup.models import ClassPeriod, ClassPeriodSignUp, UserNamePrefix
 
 fields = [
     "id",
@@ -18,4 +19,47 @@ fields = [
 class ClassPeriodSignUpFilter(django_filters.FilterSet):
     class Meta:
         model = ClassPeriodSignUp
-        fields = fields
+        # Sign-ups can also be filtered by a range of dates (e.g. for monthly reports)
+        # with class_period__date__gte and class_period__date__lte.
+        fields = {field: ["exact"] for field in fields} | {
+            "class_period__date": ["exact", "gte", "lte"]
+        }
+
+
+# The filters of ClassPeriodSignUpFilter that also apply to class periods, mapped to
+# the lookups of ClassPeriod that they correspond to.
+CLASS_PERIOD_FILTERS = {
+    "class_period__number": "number",
+    "class_period__date": "date",
+    "class_period__date__gte": "date__gte",
+    "class_period__date__lte": "date__lte",
+}
+
+
+def filter_class_periods(filterset):
+    """Returns the class periods matching the period number and date filters of
+    ``filterset`` (a valid :class:`ClassPeriodSignUpFilter`), including the ones that
+    nobody signed up for."""
+    cleaned_data = filterset.form.cleaned_data
+    return ClassPeriod.objects.get_unordered_queryset().filter(
+        **{
+            lookup: cleaned_data[name]
+            for name, lookup in CLASS_PERIOD_FILTERS.items()
+            if cleaned_data.get(name) is not None
+        }
+    )
+
+
+class NameSearchFilter(SearchFilter):
+    """Filters by the name of the user in the view's ``search_user_field`` using the
+    indexed name prefixes (see :class:`signup.models.UserNamePrefix`). Each word of the
+    ``search`` query parameter must be the start of a word in the user's name."""
+
+    def filter_queryset(self, request, queryset, view):
+        search_terms = self.get_search_terms(request)
+        if not search_terms:
+            return queryset
+
+        return UserNamePrefix.objects.filter_by_name(
+            queryset, " ".join(search_terms), view.search_user_field
+        )
@@ -0,0 +1,160 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from django.core.exceptions import ValidationError
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Opt-in cursor pagination that stays stable under any ordering. Responses are only
+    paginated if the ``page_size`` or ``cursor`` query parameter is given, so existing
+    clients still receive every result.
+
+    Each page continues after the ``(order key, id)`` of the last row of the previous
+    page, so rows are never skipped or repeated when other rows have the same value for
+    the order key, and fetching a page costs the same no matter how far into the results
+    it is. Only the first ordering of the queryset is used as the order key."""
+
+    page_size = 100
+    max_page_size = 500
+    page_size_query_param = "page_size"
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor."
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if (
+            self.page_size_query_param not in params
+            and self.cursor_query_param not in params
+        ):
+            return None
+
+        self.request = request
+        page_size = self.get_page_size(request)
+        order_key, descending = self.get_order_key(queryset)
+        queryset = queryset.order_by(*self.get_ordering(order_key, descending))
+
+        cursor = self.decode_cursor(
+            request, self.get_order_field(queryset.model, order_key)
+        )
+        if cursor is not None:
+            value, pk = cursor
+            queryset = queryset.filter(
+                self.get_position_filter(order_key, descending, value, pk)
+            )
+
+        # Fetches one extra row to find out if there is another page.
+        rows = list(queryset.values_list(order_key, "pk")[: page_size + 1])
+        self.has_next = len(rows) > page_size
+        rows = rows[:page_size]
+        self.next_position = rows[-1] if self.has_next else None
+
+        return queryset.filter(pk__in=[pk for _, pk in rows])
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_order_key(self, queryset):
+        """Returns the first field that ``queryset`` is ordered by (or ``"pk"``) and
+        whether it is sorted in descending order."""
+        ordering = [
+            field
+            for field in queryset.query.order_by
+            if isinstance(field, str) and field.lstrip("-") not in ("pk", "id")
+        ]
+        if not ordering:
+            return "pk", False
+        return ordering[0].lstrip("-"), ordering[0].startswith("-")
+
+    def get_order_field(self, model, order_key):
+        """Returns the model field of ``order_key``, which can span relationships."""
+        if order_key == "pk":
+            return model._meta.pk
+        for name in order_key.split("__"):
+            field = model._meta.get_field(name)
+            model = field.related_model
+        return field
+
+    def get_ordering(self, order_key, descending):
+        # The position of NULL values depends on the database, so it is set explicitly
+        # to match get_position_filter().
+        if order_key == "pk":
+            return ["-pk" if descending else "pk"]
+        if descending:
+            return [F(order_key).desc(nulls_last=True), "-pk"]
+        return [F(order_key).asc(nulls_first=True), "pk"]
+
+    def get_position_filter(self, order_key, descending, value, pk):
+        """Returns a filter for the rows that come after the row with ``value`` for the
+        order key and primary key ``pk``. NULL values come first in ascending order and
+        last in descending order."""
+        after_pk = Q(pk__lt=pk) if descending else Q(pk__gt=pk)
+        if order_key == "pk":
+            return after_pk
+
+        is_null = Q(**{f"{order_key}__isnull": True})
+        if value is None:
+            if descending:
+                return is_null & after_pk
+            return (is_null & after_pk) | ~is_null
+
+        after_value = Q(**{f"{order_key}__{'lt' if descending else 'gt'}": value})
+        same_value = Q(**{order_key: value}) & after_pk
+        if descending:
+            return after_value | same_value | is_null
+        return after_value | same_value
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(self.next_position)
+        )
+
+    def encode_cursor(self, position):
+        value, pk = position
+        if hasattr(value, "isoformat"):
+            # Dates and datetimes are compared as strings, which the database converts
+            # back using the field's type.
+            value = value.isoformat()
+        return urlsafe_b64encode(json.dumps([value, pk]).encode()).decode()
+
+    def decode_cursor(self, request, field):
+        """Returns the order key value and primary key in the cursor, or None if there
+        is no cursor. The value is converted using ``field`` (the field of the order
+        key), so that a tampered cursor results in an HTTP 404 error instead of an error
+        when the queryset is filtered."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            value, pk = json.loads(urlsafe_b64decode(encoded.encode()))
+            if value is not None:
+                value = field.to_python(value)
+            return value, int(pk)
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message) from None
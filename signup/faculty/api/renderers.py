@@ -0,0 +1,116 @@
+import csv
+import json
+from datetime import date
+from itertools import islice
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# The number of rows joined into each chunk of a streamed response. Larger chunks mean
+# fewer writes to the client.
+STREAM_CHUNK_SIZE = 500
+
+
+class _LineBuffer:
+    """A file-like object that returns what is written to it instead of storing it, so
+    that csv.writer can produce lines one at a time."""
+
+    def write(self, value):
+        return value
+
+
+class FastJSONRenderer(JSONRenderer):
+    """Renders the same JSON as DRF's :class:`JSONRenderer`, but with orjson if it is
+    installed, which is several times faster than the json module for large lists.
+    Indented JSON (e.g. for the browsable API) is still rendered by
+    :class:`JSONRenderer`, as is everything if orjson isn't installed."""
+
+    # Datetimes are formatted by DRF's encoder so that they match JSONRenderer.
+    orjson_options = (
+        orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS if orjson else 0
+    )
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or data is None
+            or self.get_indent(accepted_media_type, renderer_context or {})
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        content = orjson.dumps(
+            data, default=self.encoder_class().default, option=self.orjson_options
+        )
+        # Like JSONRenderer, escapes the line and paragraph separators, which are
+        # valid in JSON but not in JavaScript.
+        return content.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+            b"\xe2\x80\xa9", b"\\u2029"
+        )
+
+
+def to_json_value(value):
+    # Dates and datetimes are written in ISO 8601 format.
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+class CSVRenderer(BaseRenderer):
+    """Renders data as CSV. Lists of dictionaries become one row per dictionary, with
+    the keys of the first dictionary as the headings. Large exports should use
+    :meth:`stream` instead."""
+
+    media_type = "text/csv"
+    format = "csv"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        rows = data if isinstance(data, list) else [data]
+        headings = list(rows[0].keys()) if rows else []
+        return "".join(
+            self.stream(headings, ([row.get(key) for key in headings] for row in rows))
+        ).encode(self.charset)
+
+    def stream(self, headings, rows):
+        """Yields ``headings`` and each row in ``rows`` as CSV, a chunk at a time."""
+        writer = csv.writer(_LineBuffer())
+        yield writer.writerow(headings)
+
+        rows = iter(rows)
+        while chunk := list(islice(rows, STREAM_CHUNK_SIZE)):
+            yield "".join(writer.writerow(row) for row in chunk)
+
+
+class JSONLinesRenderer(BaseRenderer):
+    """Renders data as JSON Lines, with one JSON object per line. Lists are rendered
+    one item per line. Large exports should use :meth:`stream` instead."""
+
+    media_type = "application/jsonl"
+    format = "jsonl"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        items = data if isinstance(data, list) else [data]
+        return "".join(f"{json.dumps(item, default=str)}\n" for item in items).encode(
+            self.charset
+        )
+
+    def stream(self, keys, rows):
+        """Yields each row in ``rows`` as a JSON object with ``keys``, a chunk at a
+        time."""
+        encoder = json.JSONEncoder(ensure_ascii=False)
+
+        rows = iter(rows)
+        while chunk := list(islice(rows, STREAM_CHUNK_SIZE)):
+            yield "".join(
+                f"{encoder.encode(dict(zip(keys, map(to_json_value, row))))}\n"
+                for row in chunk
+            )
@@ -1,6 +1,7 @@
+from django.urls import reverse
 from rest_framework import serializers
 
-from signup.models import ClassPeriodSignUp
+from signup.models import ClassPeriodSignUp, SpreadsheetExport
 
 
 class ClassPeriodSignUpSerializer(serializers.ModelSerializer):
@@ -33,3 +34,96 @@ class ClassPeriodSignUpSerializer(serializers.ModelSerializer):
     )
     student_name = serializers.CharField(source="student.name", read_only=True)
     student_id = serializers.CharField(source="student.info.id", read_only=True)
+
+    def __init__(self, *args, fields=None, **kwargs):
+        """If ``fields`` is given, only those fields (and ``id``) are included. The
+        columns and joins needed for the other fields are then skipped by
+        :func:`serialize_values` and :func:`project_queryset`."""
+        super().__init__(*args, **kwargs)
+
+        if fields is not None:
+            for field_name in set(self.fields) - {"id", *fields}:
+                self.fields.pop(field_name)
+
+
+class AttendanceConfirmationSerializer(serializers.Serializer):
+    """Validates the data sent to confirm (or unconfirm) the attendance of several
+    sign-ups at once. If ``id`` is omitted, every sign-up matching the filters in the
+    query parameters is changed."""
+
+    id = serializers.ListField(
+        child=serializers.IntegerField(), required=False, allow_empty=False
+    )
+    attendance_confirmed = serializers.BooleanField(default=True)
+
+
+class KioskCheckInSerializer(serializers.Serializer):
+    """Validates a student ID scanned at the check-in kiosk and the period that the
+    kiosk is checking students in for."""
+
+    student_id = serializers.CharField(max_length=6)
+    period = serializers.IntegerField(min_value=1)
+
+
+class SpreadsheetExportSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SpreadsheetExport
+        fields = [
+            "id",
+            "status",
+            "is_done",
+            "row_count",
+            "exported_row_count",
+            "percent_done",
+            "status_url",
+            "download_url",
+        ]
+        read_only_fields = fields
+
+    is_done = serializers.BooleanField(read_only=True)
+    percent_done = serializers.IntegerField(read_only=True)
+    status_url = serializers.SerializerMethodField()
+    download_url = serializers.SerializerMethodField()
+
+    def get_status_url(self, export):
+        return reverse("api-export-detail", kwargs={"pk": export.pk})
+
+    def get_download_url(self, export):
+        # Only finished exports can be downloaded.
+        if export.status != SpreadsheetExport.FINISHED:
+            return None
+        return reverse("api-export-download", kwargs={"pk": export.pk})
+
+
+def get_columns(serializer):
+    """Returns the readable fields of ``serializer`` along with the lookup of the column
+    that each field's value comes from."""
+    fields = [field for field in serializer.fields.values() if not field.write_only]
+    return fields, [field.source.replace(".", "__") for field in fields]
+
+
+def serialize_values(serializer, queryset):
+    """Returns the same data as ``serializer.__class__(queryset, many=True).data``
+    without creating any model instances. ``serializer`` must be a serializer whose
+    fields are all simple (non-nested) fields, possibly following relationships using
+    dotted sources. Only the columns used by the serializer are fetched, and each value
+    is converted with its field's ``to_representation()``."""
+    fields, columns = get_columns(serializer)
+
+    return [
+        {
+            field.field_name: None if value is None else field.to_representation(value)
+            for field, value in zip(fields, row)
+        }
+        for row in queryset.values_list(*columns)
+    ]
+
+
+def project_queryset(serializer, queryset):
+    """Limits ``queryset`` to the columns used by ``serializer`` (see
+    :func:`serialize_values`) when model instances are needed, and only joins the
+    related tables that those columns come from."""
+    _, columns = get_columns(serializer)
+    relations = {column.rsplit("__", 1)[0] for column in columns if "__" in column}
+
+    return queryset.select_related(None).select_related(*relations).only(*columns)
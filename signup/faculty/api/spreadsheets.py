@@ -1,54 +1,279 @@
+from django.db.models import Count, Q
 from django.utils import timezone
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 
-from signup.models import StudentInfo
+from signup.models import ClassPeriod, ClassPeriodSignUp
 
+HEADINGS = [
+    "Date",
+    "Period Number",
+    "Student Name",
+    "Student ID",
+    "Reason",
+    "Date Signed Up",
+    "Attendance Confirmed",
+    "Date Attendance Confirmed",
+]
 
-def generate_spreadsheet(signups):
-    """Generates spreadsheet (Excel workbook)."""
-    signups = signups.select_related(
-        "student", "student__info", "class_period"
-    ).order_by("class_period__date", "class_period__number", "student__name")
+# The names of the same columns in JSON exports.
+FIELD_NAMES = [
+    "date",
+    "period_number",
+    "student_name",
+    "student_id",
+    "reason",
+    "date_signed_up",
+    "attendance_confirmed",
+    "date_attendance_confirmed",
+]
 
-    workbook = Workbook()
-    sheet = workbook.active
-    sheet.title = "Student Sign-Ups"
 
+def to_local_naive(value):
+    # Excel doesn't support time zones.
+    if value is None:
+        return None
+    return timezone.localtime(value).replace(tzinfo=None)
+
+
+def iter_spreadsheet_rows(signups, chunk_size=2000):
+    """Yields one spreadsheet row for each sign-up in ``signups``. Only the needed
+    columns are fetched, ``chunk_size`` rows at a time, so model instances are never
+    created."""
+    reasons = {
+        reason: str(reason_display)
+        for reason, reason_display in ClassPeriodSignUp.REASON_TYPES
+    }
+    rows = (
+        signups.order_by("class_period__date", "class_period__number", "student__name")
+        .values_list(
+            "class_period__date",
+            "class_period__number",
+            "student__name",
+            # None if a StudentInfo object does not exist for the Student, which should
+            # never occur during normal usage.
+            "student__info__id",
+            "reason",
+            "date_signed_up",
+            "attendance_confirmed",
+            "date_attendance_confirmed",
+        )
+        .iterator(chunk_size=chunk_size)
+    )
+
+    for (
+        period_date,
+        number,
+        name,
+        student_id,
+        reason,
+        date_signed_up,
+        attendance_confirmed,
+        date_attendance_confirmed,
+    ) in rows:
+        yield [
+            period_date,
+            number,
+            name,
+            student_id,
+            reasons.get(reason, reason),
+            to_local_naive(date_signed_up),
+            attendance_confirmed,
+            to_local_naive(date_attendance_confirmed),
+        ]
+
+
+def write_signups_sheet(workbook, signups, chunk_size=2000, progress=None):
+    """Adds a sheet listing each sign-up in ``signups`` to the write-only
+    ``workbook``. If given, ``progress`` is called with the number of rows written after
+    every ``chunk_size`` rows."""
+    sheet = workbook.create_sheet("Student Sign-Ups")
+
+    sheet.append(HEADINGS)
+    for count, row in enumerate(iter_spreadsheet_rows(signups, chunk_size), start=1):
+        sheet.append(row)
+        if progress is not None and count % chunk_size == 0:
+            progress(count)
+
+
+def generate_spreadsheet(signups, file, chunk_size=2000, progress=None):
+    """Writes a spreadsheet (Excel workbook) of ``signups`` to ``file``. The workbook
+    is created in write-only mode, which writes each row to a temporary file as soon as
+    it is added, so memory use doesn't grow with the number of sign-ups. If given,
+    ``progress`` is called with the number of rows written after every ``chunk_size``
+    rows."""
+    workbook = Workbook(write_only=True)
+    write_signups_sheet(workbook, signups, chunk_size, progress)
+    workbook.save(file)
+
+
+def get_rate(count, total):
+    if not total:
+        return None
+    return count / total
+
+
+def percent_cell(sheet, value):
+    cell = WriteOnlyCell(sheet, value=value)
+    cell.number_format = "0.0%"
+    return cell
+
+
+def count_by_reason():
+    # Counts the sign-ups in each group by reason and by confirmed attendance.
+    return {
+        "total": Count("pk"),
+        "lunch": Count("pk", filter=Q(reason=ClassPeriodSignUp.LUNCH)),
+        "study_hall": Count("pk", filter=Q(reason=ClassPeriodSignUp.STUDY_HALL)),
+        "confirmed": Count("pk", filter=Q(attendance_confirmed=True)),
+    }
+
+
+def write_daily_totals_sheet(workbook, signups):
+    sheet = workbook.create_sheet("Daily Totals")
     sheet.append(
         [
             "Date",
+            "Sign-Ups",
+            "Lunch",
+            "Study Hall",
+            "Attendance Confirmed",
+            "Attendance Rate",
+        ]
+    )
+
+    rows = (
+        signups.order_by()
+        .values("class_period__date")
+        .annotate(**count_by_reason())
+        .order_by("class_period__date")
+    )
+    for row in rows.iterator():
+        sheet.append(
+            [
+                row["class_period__date"],
+                row["total"],
+                row["lunch"],
+                row["study_hall"],
+                row["confirmed"],
+                percent_cell(sheet, get_rate(row["confirmed"], row["total"])),
+            ]
+        )
+
+
+def write_period_fill_rates_sheet(workbook, signups, periods):
+    sheet = workbook.create_sheet("Period Fill Rates")
+    sheet.append(
+        ["Date", "Period Number", "Sign-Ups", "Maximum Students Allowed", "Fill Rate"]
+    )
+
+    # Grouping the class periods instead of the sign-ups keeps the periods that nobody
+    # signed up for, which are shown with a fill rate of 0.
+    rows = (
+        periods.order_by()
+        .annotate(
+            total=Count("student_sign_ups", filter=Q(student_sign_ups__in=signups))
+        )
+        .order_by("date", "number")
+        .values_list("date", "number", "total", "max_student_count")
+    )
+    for period_date, number, total, maximum in rows.iterator():
+        sheet.append(
+            [
+                period_date,
+                number,
+                total,
+                maximum,
+                percent_cell(sheet, get_rate(total, maximum)),
+            ]
+        )
+
+
+def write_reasons_sheet(workbook, signups):
+    sheet = workbook.create_sheet("Lunch vs. Study Hall")
+    sheet.append(
+        [
             "Period Number",
+            "Sign-Ups",
+            "Lunch",
+            "Study Hall",
+            "Lunch Share",
+            "Study Hall Share",
+        ]
+    )
+
+    def append_row(label, row):
+        sheet.append(
+            [
+                label,
+                row["total"],
+                row["lunch"],
+                row["study_hall"],
+                percent_cell(sheet, get_rate(row["lunch"], row["total"])),
+                percent_cell(sheet, get_rate(row["study_hall"], row["total"])),
+            ]
+        )
+
+    rows = (
+        signups.order_by()
+        .values("class_period__number")
+        .annotate(**count_by_reason())
+        .order_by("class_period__number")
+    )
+    for row in rows:
+        append_row(row["class_period__number"], row)
+    append_row("All Periods", signups.aggregate(**count_by_reason()))
+
+
+def write_student_attendance_sheet(workbook, signups, chunk_size=2000):
+    sheet = workbook.create_sheet("Student Attendance")
+    sheet.append(
+        [
             "Student Name",
             "Student ID",
-            "Reason",
-            "Date Signed Up",
+            "Sign-Ups",
             "Attendance Confirmed",
-            "Date Attendance Confirmed",
+            "Attendance Rate",
         ]
     )
 
-    for signup in signups:
-        # Handles the event that a StudentInfo object does not exist for the Student,
-        # which should never occur during normal usage.
-        try:
-            student_id = signup.student.info.id
-        except StudentInfo.DoesNotExist:
-            student_id = None
-
-        # Adds signup details to workbook.
+    rows = (
+        signups.order_by()
+        .values("student", "student__name", "student__info__id")
+        .annotate(
+            total=Count("pk"),
+            confirmed=Count("pk", filter=Q(attendance_confirmed=True)),
+        )
+        .order_by("student__name", "student")
+    )
+    for row in rows.iterator(chunk_size=chunk_size):
         sheet.append(
             [
-                signup.class_period.date,
-                signup.class_period.number,
-                signup.student.name,
-                student_id,
-                signup.get_reason_display(),
-                timezone.localtime(signup.date_signed_up).replace(tzinfo=None),
-                signup.attendance_confirmed,
-                timezone.localtime(signup.date_attendance_confirmed).replace(
-                    tzinfo=None
-                ),
+                row["student__name"],
+                row["student__info__id"],
+                row["total"],
+                row["confirmed"],
+                percent_cell(sheet, get_rate(row["confirmed"], row["total"])),
             ]
         )
 
-    return workbook
+
+def generate_analytics_spreadsheet(signups, file, chunk_size=2000, periods=None):
+    """Writes a spreadsheet of ``signups`` to ``file`` with sheets summarizing them
+    after the list of sign-ups: the totals for each day, how full each class period in
+    ``periods`` was, the split between lunch and study hall for each period number, and
+    the attendance rate of each student. Each summary is computed by the database with
+    one grouped query, so only one row per group is sent to Python. By default,
+    ``periods`` contains every class period on the dates of ``signups``."""
+    if periods is None:
+        periods = ClassPeriod.objects.filter(
+            date__in=signups.order_by().values("class_period__date")
+        )
+
+    workbook = Workbook(write_only=True)
+    write_signups_sheet(workbook, signups, chunk_size)
+    write_daily_totals_sheet(workbook, signups)
+    write_period_fill_rates_sheet(workbook, signups, periods)
+    write_reasons_sheet(workbook, signups)
+    write_student_attendance_sheet(workbook, signups, chunk_size)
+    workbook.save(file)
@@ -1,9 +1,41 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from signup.faculty.api.views import ClassPeriodSignUpViewSet
+from signup.faculty.api.views import (
+    ArchiveListView,
+    ArchiveSummaryView,
+    ClassPeriodPlanPreviewView,
+    ClassPeriodSignUpViewSet,
+    KioskCheckInView,
+    SpreadsheetExportDownloadView,
+    SpreadsheetExportView,
+    StudentSearchView,
+)
 
 router = DefaultRouter()
 router.register("signups", ClassPeriodSignUpViewSet, basename="api-signups")
 
-urlpatterns = [path("", include(router.urls))]
+urlpatterns = [
+    path(
+        "periods/preview/",
+        ClassPeriodPlanPreviewView.as_view(),
+        name="api-periods-preview",
+    ),
+    path(
+        "exports/<int:pk>/", SpreadsheetExportView.as_view(), name="api-export-detail"
+    ),
+    path(
+        "exports/<int:pk>/download/",
+        SpreadsheetExportDownloadView.as_view(),
+        name="api-export-download",
+    ),
+    path("archives/", ArchiveListView.as_view(), name="api-archive-list"),
+    path(
+        "archives/<str:school_year>/",
+        ArchiveSummaryView.as_view(),
+        name="api-archive-summary",
+    ),
+    path("students/search/", StudentSearchView.as_view(), name="api-student-search"),
+    path("kiosk/check-in/", KioskCheckInView.as_view(), name="api-kiosk-check-in"),
+    path("", include(router.urls)),
+]
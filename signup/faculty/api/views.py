@@ -1,23 +1,94 @@
-from tempfile import NamedTemporaryFile
+from datetime import date
+from hashlib import md5
+from tempfile import TemporaryFile
 
-from django.core.mail import send_mail, send_mass_mail
-from django.http import HttpResponse
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.http import FileResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
 from django.utils import timezone
-from django.utils.formats import date_format
+from django.utils.cache import get_conditional_response, patch_cache_control
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import status
 from rest_framework.decorators import action
-from rest_framework.filters import OrderingFilter, SearchFilter
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.filters import OrderingFilter
+from rest_framework.generics import RetrieveAPIView
 from rest_framework.permissions import BasePermission
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.views import APIView
 from rest_framework.viewsets import ModelViewSet
 
-from signup.faculty.api.filters import ClassPeriodSignUpFilter, fields
-from signup.faculty.api.serializers import ClassPeriodSignUpSerializer
-from signup.faculty.api.spreadsheets import generate_spreadsheet
-from signup.models import ClassPeriodSignUp, is_library_faculty_member
+from signup.faculty.api.filters import (
+    ClassPeriodSignUpFilter,
+    NameSearchFilter,
+    fields,
+    filter_class_periods,
+)
+from signup.faculty.api.pagination import KeysetPagination
+from signup.faculty.api.renderers import CSVRenderer, JSONLinesRenderer
+from signup.faculty.api.serializers import (
+    AttendanceConfirmationSerializer,
+    ClassPeriodSignUpSerializer,
+    KioskCheckInSerializer,
+    SpreadsheetExportSerializer,
+    project_queryset,
+    serialize_values,
+)
+from signup.faculty.api.spreadsheets import (
+    FIELD_NAMES,
+    HEADINGS,
+    generate_analytics_spreadsheet,
+    generate_spreadsheet,
+    iter_spreadsheet_rows,
+)
+from signup.faculty.archives import GROUPINGS, list_archives, summarize_archive
+from signup.faculty.exports import get_cache_path, normalize_query
+from signup.faculty.forms import FutureClassPeriodsForm
+from signup.faculty.schedules import preview_class_periods
+from signup.faculty.tasks import (
+    delete_in_batches,
+    queue_removal_notices,
+    start_spreadsheet_export,
+)
+from signup.models import (
+    ClassPeriodSignUp,
+    SignUpDateVersion,
+    SignUpTombstone,
+    SpreadsheetExport,
+    Student,
+    UserNamePrefix,
+    is_library_faculty_member,
+)
 
-DATE_FORMAT = "F j, Y"
+
+async def iterate_in_thread(iterator):
+    """Yields each item of the synchronous ``iterator``, which is advanced in the
+    thread used by synchronous views. Under ASGI, Django reads synchronous streaming
+    responses into memory before sending them, which this avoids."""
+    iterator = iter(iterator)
+    next_item = sync_to_async(next)
+    done = object()
+    try:
+        while (item := await next_item(iterator, done)) is not done:
+            yield item
+    finally:
+        # Closes generators (and the database cursors they use) if the client
+        # disconnects.
+        if hasattr(iterator, "close"):
+            await sync_to_async(iterator.close)()
+
+
+def stream_content(request, content):
+    """Returns the iterator ``content`` in the form that streams it to the client
+    without keeping all of it in memory: asynchronously if ``request`` is served with
+    ASGI and as is with WSGI."""
+    # pylint: disable-next=protected-access
+    if isinstance(request._request, ASGIRequest):
+        return iterate_in_thread(content)
+    return content
 
 
 class IsLibraryFacultyMember(BasePermission):
@@ -27,81 +98,575 @@ class IsLibraryFacultyMember(BasePermission):
 
 class ClassPeriodSignUpViewSet(ModelViewSet):
     permission_classes = [IsLibraryFacultyMember]
-    queryset = ClassPeriodSignUp.objects.all()
+    # Every field used by the serializer is fetched with a single query, no matter how
+    # many sign-ups are listed.
+    queryset = ClassPeriodSignUp.objects.select_related(
+        "class_period", "student", "student__info"
+    )
     serializer_class = ClassPeriodSignUpSerializer
 
-    filter_backends = [SearchFilter, DjangoFilterBackend, OrderingFilter]
+    filter_backends = [NameSearchFilter, DjangoFilterBackend, OrderingFilter]
     filterset_class = ClassPeriodSignUpFilter
     ordering_fields = fields
-    search_fields = ["student__name"]
+    search_user_field = "student"
     ordering = ["student__name"]
 
+    # Only used if the page_size or cursor query parameter is given.
+    pagination_class = KeysetPagination
+
+    # The actions that only read, which can use the replica (see
+    # signup.middleware.ReplicaMiddleware).
+    replica_actions = {"list", "retrieve", "generate_spreadsheet", "analytics"}
+
+    # The number of sign-ups deleted per transaction by delete_matching().
+    delete_batch_size = 500
+
+    # The actions that only return the fields in the fields query parameter. Actions
+    # that write sign-ups always use every field, so none are left out of the input.
+    sparse_fieldset_actions = {"list", "retrieve", "changes", "confirm_attendance"}
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == "retrieve":
+            # Only the requested fields are fetched (lists use serialize_values()).
+            return project_queryset(self.get_serializer(), queryset)
+        return queryset
+
+    def get_serializer(self, *args, **kwargs):
+        if self.action in self.sparse_fieldset_actions:
+            kwargs.setdefault("fields", self.get_requested_fields())
+        return super().get_serializer(*args, **kwargs)
+
+    def get_requested_fields(self):
+        """Returns the field names in the comma-separated ``fields`` query parameter, or
+        None if every field should be returned."""
+        value = self.request.query_params.get("fields", "")
+        requested_fields = [name for name in value.split(",") if name]
+        if not requested_fields:
+            return None
+
+        unknown_fields = set(requested_fields) - set(self.serializer_class.Meta.fields)
+        if unknown_fields:
+            raise ValidationError(
+                {
+                    "fields": [
+                        f"Unknown field: {name}" for name in sorted(unknown_fields)
+                    ]
+                }
+            )
+        return requested_fields
+
+    def get_requested_date(self, request):
+        """Returns the date in the ``class_period__date`` query parameter, or None if it
+        is missing or invalid."""
+        try:
+            return date.fromisoformat(request.query_params["class_period__date"])
+        except (KeyError, ValueError):
+            return None
+
+    def conditional_response(self, request, get_response):
+        """Returns HTTP 304 (Not Modified) if the client already has the current
+        response. Otherwise, returns ``get_response()``. Only responses listing the
+        sign-ups for a single date can be cached, and only the version of that date is
+        fetched before deciding.
+
+        The ETag changes whenever the date's :class:`SignUpDateVersion` changes or a
+        different URL (with other filters, ordering, or cursor) is requested. The
+        version is also returned as the sync token for :meth:`changes`."""
+        signup_date = self.get_requested_date(request)
+        if signup_date is None:
+            return get_response()
+
+        version = SignUpDateVersion.objects.get_version(signup_date)
+        key = f"{version}:{request.get_full_path()}"
+        etag = f'"{md5(key.encode(), usedforsecurity=False).hexdigest()}"'
+
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = get_response()
+
+        response.headers["ETag"] = etag
+        response.headers["X-Sync-Token"] = str(version)
+        # Makes browsers check for changes before using their cached response.
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            request, lambda: self.list_signups(request, *args, **kwargs)
+        )
+
+    def list_signups(self, request, *args, **kwargs):
+        # Builds the response from flat rows instead of model instances, which is much
+        # faster when a whole day of sign-ups is listed.
+        queryset = self.filter_queryset(self.get_queryset())
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(
+                serialize_values(self.get_serializer(), page)
+            )
+
+        return Response(serialize_values(self.get_serializer(), queryset))
+
+    @action(detail=False, methods=["GET"])
+    def changes(self, request):
+        """Returns the sign-ups on the date in the ``class_period__date`` query
+        parameter that changed since the sync token in the ``since`` query parameter
+        (taken from the ``X-Sync-Token`` header of the list endpoint or the ``token`` of
+        a previous response). ``changed`` contains the created or updated sign-ups that
+        match the other filters, and ``removed`` contains the IDs of the sign-ups that
+        were deleted or no longer match. If ``reset`` is true, the client must list the
+        sign-ups again instead."""
+        signup_date = self.get_requested_date(request)
+        try:
+            since = int(request.query_params["since"])
+        except (KeyError, ValueError):
+            since = None
+        if signup_date is None or since is None:
+            raise ValidationError(
+                "The class_period__date and since query parameters are required."
+            )
+
+        # The token is read first, so any change committed afterwards is sent again
+        # next time instead of being missed.
+        version, reset_version = SignUpDateVersion.objects.get_versions(signup_date)
+        if not reset_version <= since <= version:
+            return Response(
+                {"token": str(version), "reset": True, "changed": [], "removed": []}
+            )
+
+        changed_ids = set(
+            ClassPeriodSignUp.objects.filter(
+                class_period__date=signup_date, version__gt=since
+            ).values_list("pk", flat=True)
+        )
+        changed = []
+        if changed_ids:
+            changed = serialize_values(
+                self.get_serializer(),
+                self.filter_queryset(self.get_queryset()).filter(pk__in=changed_ids),
+            )
+
+        removed = set(
+            SignUpTombstone.objects.filter(
+                date=signup_date, version__gt=since
+            ).values_list("signup_id", flat=True)
+        )
+        removed |= changed_ids
+        removed -= {signup["id"] for signup in changed}
+
+        return Response(
+            {
+                "token": str(version),
+                "reset": False,
+                "changed": changed,
+                "removed": sorted(removed),
+            }
+        )
+
     def destroy(self, request, *args, **kwargs):
         signup = self.get_object()
-        period = signup.class_period
 
-        if period.date >= timezone.localdate(timezone.now()):
-            period_date_formatted = date_format(period.date, DATE_FORMAT)
-            send_mail(
-                "Media Center Sign-Up Removal",
-                f"You signed up to use the Holy Cross Media Center during period {period.number} on {period_date_formatted}. This sign-up has been removed.",
-                from_email=None,
-                recipient_list=(signup.student.email,),
-                fail_silently=True,
+        # The student is emailed in the background, and only if the sign-up is deleted.
+        with transaction.atomic():
+            queue_removal_notices(
+                ClassPeriodSignUp.objects.filter(
+                    pk=signup.pk,
+                    class_period__date__gte=timezone.localdate(timezone.now()),
+                )
             )
+            self.perform_destroy(signup)
 
-        self.perform_destroy(signup)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
+    @action(detail=False, methods=["POST"])
+    def confirm_attendance(self, request):
+        """Confirms (or unconfirms) the attendance of the sign-ups with the given IDs, or
+        of every sign-up matching the filters if no IDs are given, with a single
+        ``UPDATE`` per date. The confirmation date is set by the server, and sign-ups
+        that are already in the requested state keep theirs. Returns every affected
+        sign-up."""
+        serializer = AttendanceConfirmationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        signup_ids = serializer.validated_data.get("id")
+        attendance_confirmed = serializer.validated_data["attendance_confirmed"]
+
+        queryset = self.filter_queryset(self.get_queryset())
+        if signup_ids is not None:
+            queryset = queryset.filter(pk__in=signup_ids)
+        elif self.get_requested_date(request) is None:
+            # Prevents every sign-up from being changed by accident.
+            raise ValidationError(
+                "Either the id field or the class_period__date query parameter is "
+                "required."
+            )
+
+        signup_ids = list(queryset.order_by().values_list("pk", flat=True))
+        ClassPeriodSignUp.objects.filter(
+            pk__in=signup_ids, attendance_confirmed=not attendance_confirmed
+        ).update(
+            attendance_confirmed=attendance_confirmed,
+            date_attendance_confirmed=timezone.now() if attendance_confirmed else None,
+        )
+
+        # The other filters are skipped because the sign-ups might no longer match
+        # them (e.g. attendance_confirmed).
+        signups = OrderingFilter().filter_queryset(
+            request, self.get_queryset().filter(pk__in=signup_ids), self
+        )
+        return Response(serialize_values(self.get_serializer(), signups))
+
     @action(detail=False, methods=["POST"])
     def delete_multiple(self, request):
-        signup_ids = request.POST.getlist("id")
-        signups = ClassPeriodSignUp.objects.filter(id__in=signup_ids).select_related(
-            "student", "class_period"
-        )
-
-        # Determines if any signups were found.
-        if signups.exists():
-            messages = []
-            now = timezone.localdate(timezone.now())
-            for signup in signups:
-                student = signup.student
-                period = signup.class_period
-                # If associated periods are in the present/future, then emails will be
-                # sent to notify students of the removal of their signups.
-                if period.date >= now:
-                    period_date_formatted = date_format(period.date, DATE_FORMAT)
-                    messages.append(
-                        (
-                            "Media Center Sign-Up Removal",
-                            f"You signed up to use the Holy Cross Media Center during period {period.number} on {period_date_formatted}. This sign-up has been removed.",
-                            None,
-                            (student.email,),
-                        )
-                    )
-            send_mass_mail(messages, fail_silently=True)
+        signups = ClassPeriodSignUp.objects.filter(id__in=request.POST.getlist("id"))
 
+        # Students with sign-ups in the present/future are notified of the removal.
+        with transaction.atomic():
+            queue_removal_notices(
+                signups.filter(
+                    class_period__date__gte=timezone.localdate(timezone.now())
+                )
+            )
             signups.delete()
 
         return Response(status=status.HTTP_204_NO_CONTENT)
 
-    @action(detail=False, methods=["GET"])
+    @action(detail=False, methods=["POST"])
+    def delete_matching(self, request):
+        """Deletes every sign-up matching the filters, which are given as query
+        parameters in the same way as for listing the sign-ups. The sign-ups are deleted
+        ``delete_batch_size`` at a time, and the emails to students with sign-ups in the
+        present/future are queued in the same transaction as each batch. Returns the
+        number of deleted sign-ups.
+
+        The ``version`` query parameter must be the sync token the client listed the
+        sign-ups with. If the sign-ups on the date changed since then, nothing is
+        deleted and a 412 response is returned, so the client can list them again
+        instead of deleting sign-ups it never showed. Sign-ups created or changed
+        while the batches are being deleted are also left alone."""
+        signup_date = self.get_requested_date(request)
+        try:
+            version = int(request.query_params["version"])
+        except (KeyError, ValueError):
+            version = None
+        if signup_date is None or version is None:
+            # Prevents every sign-up from being deleted by accident.
+            raise ValidationError(
+                "The class_period__date and version query parameters are required."
+            )
+
+        if SignUpDateVersion.objects.get_version(signup_date) != version:
+            return Response(
+                {"detail": "The sign-ups changed since they were listed."},
+                status=status.HTTP_412_PRECONDITION_FAILED,
+            )
+
+        signups = (
+            self.filter_queryset(self.get_queryset())
+            .filter(version__lte=version)
+            .order_by()
+        )
+        today = timezone.localdate(timezone.now())
+        deleted = sum(
+            delete_in_batches(
+                signups,
+                self.delete_batch_size,
+                before_delete=lambda batch: queue_removal_notices(
+                    batch.filter(class_period__date__gte=today)
+                ),
+            )
+        )
+
+        return Response({"deleted": deleted})
+
+    @action(
+        detail=False,
+        methods=["GET"],
+        renderer_classes=[
+            *api_settings.DEFAULT_RENDERER_CLASSES,
+            CSVRenderer,
+            JSONLinesRenderer,
+        ],
+    )
     def generate_spreadsheet(self, request):
+        """Returns the sign-ups matching the filters as an Excel spreadsheet, or as CSV
+        or JSON Lines if the ``format`` query parameter is ``csv`` or ``jsonl``."""
+        renderer = request.accepted_renderer
+        if isinstance(renderer, (CSVRenderer, JSONLinesRenderer)):
+            return self.conditional_response(
+                request, lambda: self.generate_stream_response(request, renderer)
+            )
+
+        return self.conditional_response(
+            request, lambda: self.generate_spreadsheet_response(request)
+        )
+
+    @action(detail=False, methods=["GET"])
+    def analytics(self, request):
+        """Returns an Excel spreadsheet of the sign-ups matching the filters along with
+        sheets summarizing them (see
+        :func:`signup.faculty.api.spreadsheets.generate_analytics_spreadsheet`)."""
+        return self.conditional_response(
+            request,
+            lambda: self.generate_spreadsheet_response(request, analytics=True),
+        )
+
+    @action(detail=False, methods=["POST"])
+    def export(self, request):
+        """Starts exporting the sign-ups matching the filters to a spreadsheet in the
+        background and returns the export, which can be polled for its progress and
+        downloaded once it is finished. Exporting the same sign-ups again reuses the
+        cached spreadsheet until one of them changes."""
+        # Invalid filters are rejected here instead of failing in the background.
+        self.filter_queryset(self.get_queryset())
+
+        export = start_spreadsheet_export(
+            normalize_query(request.query_params), requested_by=request.user
+        )
+        return Response(
+            SpreadsheetExportSerializer(export).data,
+            status=status.HTTP_200_OK if export.is_done else status.HTTP_202_ACCEPTED,
+        )
+
+    def generate_spreadsheet_response(self, request, analytics=False):
         queryset = self.filter_queryset(self.get_queryset())
-        workbook = generate_spreadsheet(queryset)
 
-        # Creates file to temporarily store spreadsheet.
-        with NamedTemporaryFile() as temporary_file:
-            workbook.save(temporary_file)
-            temporary_file.seek(0)
-            # Reads file contents as bytes to send back as a response.
-            stream = temporary_file.read()
+        # The spreadsheet is written to a temporary file on disk, which is streamed to
+        # the client in chunks and deleted once it is closed.
+        temporary_file = TemporaryFile()
+        if analytics:
+            # Class periods without sign-ups are summarized too, so they are filtered
+            # separately. The filters were already validated by filter_queryset().
+            filterset = DjangoFilterBackend().get_filterset(request, queryset, self)
+            filterset.is_valid()
+            generate_analytics_spreadsheet(
+                queryset, temporary_file, periods=filter_class_periods(filterset)
+            )
+        else:
+            generate_spreadsheet(queryset, temporary_file)
+        temporary_file.seek(0)
+
+        file_name = timezone.localtime(timezone.now()).strftime("%Y%m%d-%H%M%S")
+        if analytics:
+            file_name = f"analytics-{file_name}"
+        response = FileResponse(
+            temporary_file,
+            as_attachment=True,
+            filename=f"{file_name}.xlsx",
+            content_type="application/vnd.ms-excel",
+        )
+        # The file is still closed (and deleted) when the response is.
+        response.streaming_content = stream_content(request, response.streaming_content)
+        return response
+
+    def generate_stream_response(self, request, renderer):
+        # The rows are written as they are fetched from the database, so only the
+        # current chunk is kept in memory, with WSGI or ASGI. However, Django doesn't
+        # use server-side cursors on MySQL, so MySQLdb fetches the whole result before
+        # iterator() returns any of it. On MySQL, every row is in memory at once,
+        # though as tuples rather than the rendered output.
+        rows = iter_spreadsheet_rows(self.filter_queryset(self.get_queryset()))
+        if isinstance(renderer, CSVRenderer):
+            content = renderer.stream(HEADINGS, rows)
+        else:
+            content = renderer.stream(FIELD_NAMES, rows)
 
         file_name = timezone.localtime(timezone.now()).strftime("%Y%m%d-%H%M%S")
-        return HttpResponse(
-            stream,
+        return StreamingHttpResponse(
+            stream_content(request, content),
+            content_type=f"{renderer.media_type}; charset={renderer.charset}",
             headers={
-                "Content-Type": "application/vnd.ms-excel",
-                "Content-Disposition": f'attachment; filename="{file_name}.xlsx"',
+                "Content-Disposition": (
+                    f'attachment; filename="{file_name}.{renderer.format}"'
+                )
             },
         )
+
+
+class SpreadsheetExportView(RetrieveAPIView):
+    """Returns the progress of a spreadsheet export started by
+    :meth:`ClassPeriodSignUpViewSet.export`."""
+
+    permission_classes = [IsLibraryFacultyMember]
+    queryset = SpreadsheetExport.objects.all()
+    serializer_class = SpreadsheetExportSerializer
+
+
+class SpreadsheetExportDownloadView(APIView):
+    """Downloads the spreadsheet of a finished export."""
+
+    permission_classes = [IsLibraryFacultyMember]
+
+    def get(self, request, pk):
+        export = get_object_or_404(
+            SpreadsheetExport, pk=pk, status=SpreadsheetExport.FINISHED
+        )
+        try:
+            file = get_cache_path(export.cache_key).open("rb")
+        except FileNotFoundError:
+            raise NotFound(
+                "This export has expired. Please export the sign-ups again."
+            ) from None
+
+        file_name = timezone.localtime(export.date_finished).strftime("%Y%m%d-%H%M%S")
+        return FileResponse(
+            file,
+            as_attachment=True,
+            filename=f"{file_name}.xlsx",
+            content_type="application/vnd.ms-excel",
+        )
+
+
+class ArchiveListView(APIView):
+    """Lists the school years whose class periods and sign-ups have been archived (see
+    :mod:`signup.faculty.archives`)."""
+
+    permission_classes = [IsLibraryFacultyMember]
+
+    def get(self, request):
+        return Response(list_archives())
+
+
+class ArchiveSummaryView(APIView):
+    """Summarizes the archive of a school year, grouped by the ``by`` query parameter
+    (see :func:`signup.faculty.archives.summarize_archive`). The archive is read
+    directly, so archived sign-ups never have to be loaded back into the database."""
+
+    permission_classes = [IsLibraryFacultyMember]
+
+    def get(self, request, school_year):
+        by = request.query_params.get("by", "total")
+        if by not in GROUPINGS:
+            raise ValidationError({"by": [f"Must be one of: {', '.join(GROUPINGS)}."]})
+
+        try:
+            rows = summarize_archive(school_year, by)
+        except FileNotFoundError:
+            raise NotFound(
+                f"The {school_year} school year has not been archived."
+            ) from None
+
+        return Response({"school_year": school_year, "by": by, "rows": rows})
+
+
+class ClassPeriodPlanPreviewView(APIView):
+    """Accepts the same data as :class:`signup.faculty.forms.FutureClassPeriodsForm`
+    and returns what submitting it would change, without saving anything."""
+
+    permission_classes = [IsLibraryFacultyMember]
+
+    def post(self, request):
+        form = FutureClassPeriodsForm(data=request.data, check_conflicts=False)
+        if not form.is_valid():
+            return Response(form.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        dates = preview_class_periods(list(form.get_planned_periods()))
+        totals = {
+            key: sum(summary[key] for summary in dates)
+            for key in ("created", "updated", "unchanged", "conflicts", "signed_up")
+        }
+
+        return Response({"totals": totals, "dates": dates})
+
+
+class StudentSearchView(APIView):
+    """Suggests students whose names start with the words in the ``q`` query parameter
+    (see :meth:`signup.models.UserNamePrefixManager.filter_by_name`) for typeahead
+    inputs."""
+
+    permission_classes = [IsLibraryFacultyMember]
+
+    # The maximum number of students suggested.
+    limit = 10
+
+    def get(self, request):
+        query = request.query_params.get("q", "")
+        if not query.strip():
+            return Response([])
+
+        students = UserNamePrefix.objects.filter_by_name(
+            Student.objects.get_similar_queryset(), query
+        ).order_by("name", "pk")[: self.limit]
+
+        return Response(
+            [
+                {"id": pk, "name": name, "email": email, "student_id": student_id}
+                for pk, name, email, student_id in students.values_list(
+                    "pk", "name", "email", "info__id"
+                )
+            ]
+        )
+
+
+class KioskCheckInView(APIView):
+    """Confirms the attendance of the student with a scanned student ID for a period
+    today. The student's sign-ups for today are found with a single query, which is
+    also enough to report that the student didn't sign up or signed up for a different
+    period."""
+
+    permission_classes = [IsLibraryFacultyMember]
+
+    def confirm_attendance(self, pk):
+        """Confirms the attendance of the sign-up with ``pk`` and returns True, or
+        returns False if it was confirmed in the meantime (for example, by another
+        kiosk). The original confirmation date is kept in that case."""
+        return (
+            ClassPeriodSignUp.objects.filter(pk=pk, attendance_confirmed=False).update(
+                attendance_confirmed=True, date_attendance_confirmed=timezone.now()
+            )
+            > 0
+        )
+
+    def post(self, request):
+        serializer = KioskCheckInSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        student_id = serializer.validated_data["student_id"].strip()
+        period = serializer.validated_data["period"]
+
+        signups = list(
+            ClassPeriodSignUp.objects.filter(
+                student__info__id=student_id,
+                class_period__date=timezone.localdate(timezone.now()),
+            )
+            .order_by("class_period__number")
+            .values_list(
+                "pk", "class_period__number", "attendance_confirmed", "student__name"
+            )
+        )
+        if not signups:
+            return Response(
+                {
+                    "status": "not_signed_up",
+                    "student_name": None,
+                    "periods": [],
+                    "message": f"Student {student_id} did not sign up for today.",
+                }
+            )
+
+        student_name = signups[0][3]
+        periods = [number for _, number, _, _ in signups]
+        signup = next((signup for signup in signups if signup[1] == period), None)
+
+        if signup is None:
+            periods_text = ", ".join(str(number) for number in periods)
+            check_in_status = "wrong_period"
+            message = (
+                f"{student_name} signed up for period {periods_text}, not period "
+                f"{period}."
+            )
+        elif signup[2] or not self.confirm_attendance(signup[0]):
+            check_in_status = "already_checked_in"
+            message = f"{student_name} is already checked in."
+        else:
+            check_in_status = "checked_in"
+            message = f"{student_name} is checked in."
+
+        return Response(
+            {
+                "status": check_in_status,
+                "student_name": student_name,
+                "periods": periods,
+                "message": message,
+            }
+        )
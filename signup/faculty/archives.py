@@ -0,0 +1,218 @@
+import gzip
+import json
+import os
+from datetime import date
+from pathlib import Path
+
+from django.conf import settings
+
+from signup.faculty.api.spreadsheets import get_rate
+from signup.models import ClassPeriodSignUp
+
+ARCHIVE_PREFIX = "signups-"
+ARCHIVE_SUFFIX = ".jsonl.gz"
+
+# Records only contain JSON types (dates are formatted when the records are created),
+# so the encoder never has to call back into Python. The default compression level (9)
+# is several times slower than level 6 and barely makes JSON smaller.
+ENCODER = json.JSONEncoder(separators=(",", ":"))
+COMPRESS_LEVEL = 6
+
+# The fields of each kind of record in an archive. Sign-ups repeat the date and number
+# of their class period so that they can be summarized without joining the records.
+PERIOD_FIELDS = ["id", "date", "period_number", "max_student_count"]
+SIGNUP_FIELDS = [
+    "id",
+    "period_id",
+    "date",
+    "period_number",
+    "student_name",
+    "student_id",
+    "reason",
+    "date_signed_up",
+    "attendance_confirmed",
+    "date_attendance_confirmed",
+]
+
+# How archived records can be grouped by summarize_archive(). Class periods have no
+# student, so they are left out of the summary by student.
+GROUPINGS = {
+    "total": lambda record: {},
+    "month": lambda record: {"month": record["date"][:7]},
+    "date": lambda record: {"date": record["date"]},
+    "period": lambda record: {"period_number": record["period_number"]},
+    "student": lambda record: {
+        "student_id": record["student_id"],
+        "student_name": record["student_name"],
+    },
+}
+
+
+def get_school_year(day, end_month, end_day):
+    """Returns the name of the school year (such as ``"2022-2023"``) that ``day`` is
+    part of, if school years end on ``end_month`` and ``end_day``."""
+    if day <= date(day.year, end_month, end_day):
+        return f"{day.year - 1}-{day.year}"
+    return f"{day.year}-{day.year + 1}"
+
+
+def get_archive_path(school_year):
+    return Path(settings.SIGN_UP_ARCHIVE_DIR) / (
+        f"{ARCHIVE_PREFIX}{school_year}{ARCHIVE_SUFFIX}"
+    )
+
+
+def list_archives():
+    """Returns the names of the school years that have been archived, in order."""
+    directory = Path(settings.SIGN_UP_ARCHIVE_DIR)
+    return sorted(
+        path.name[len(ARCHIVE_PREFIX) : -len(ARCHIVE_SUFFIX)]
+        for path in directory.glob(f"{ARCHIVE_PREFIX}*{ARCHIVE_SUFFIX}")
+    )
+
+
+def isoformat(value):
+    if value is None:
+        return None
+    return value.isoformat()
+
+
+def iter_period_records(periods):
+    """Yields an archive record for each ClassPeriod in ``periods``."""
+    rows = periods.order_by("pk").values_list(
+        "pk", "date", "number", "max_student_count"
+    )
+    for row in rows.iterator():
+        record = {"type": "period", **dict(zip(PERIOD_FIELDS, row))}
+        record["date"] = isoformat(record["date"])
+        yield record
+
+
+def iter_signup_records(signups):
+    """Yields an archive record for each ClassPeriodSignUp in ``signups``."""
+    rows = signups.order_by("pk").values_list(
+        "pk",
+        "class_period",
+        "class_period__date",
+        "class_period__number",
+        "student__name",
+        "student__info__id",
+        "reason",
+        "date_signed_up",
+        "attendance_confirmed",
+        "date_attendance_confirmed",
+    )
+    for row in rows.iterator():
+        record = {"type": "signup", **dict(zip(SIGNUP_FIELDS, row))}
+        for field in ("date", "date_signed_up", "date_attendance_confirmed"):
+            record[field] = isoformat(record[field])
+        yield record
+
+
+def append_to_archives(records, school_year_end):
+    """Appends ``records`` to the archive of their school year, which ends on the
+    ``(month, day)`` in ``school_year_end``.
+
+    Archives are gzipped JSON Lines files. Each call appends a separate gzip member to
+    each archive, which is read back as part of the same stream, so archives can be
+    appended to without being rewritten. The member is written and synced to disk all
+    at once and removed again if that fails, so an interrupted write never leaves a
+    truncated member behind."""
+    school_years = {}
+    lines = {}
+    for record in records:
+        if record["date"] not in school_years:
+            school_years[record["date"]] = get_school_year(
+                date.fromisoformat(record["date"]), *school_year_end
+            )
+        lines.setdefault(school_years[record["date"]], []).append(
+            ENCODER.encode(record) + "\n"
+        )
+
+    for school_year, school_year_lines in lines.items():
+        path = get_archive_path(school_year)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = gzip.compress(
+            "".join(school_year_lines).encode(), compresslevel=COMPRESS_LEVEL
+        )
+        with path.open("ab") as file:
+            size = file.tell()
+            try:
+                file.write(data)
+                file.flush()
+                os.fsync(file.fileno())
+            except BaseException:
+                file.truncate(size)
+                raise
+
+
+def iter_archive_records(school_year):
+    """Yields the records in the archive of ``school_year``. A batch is archived before
+    its deletion is committed, so if committing failed, its records can appear again
+    when the batch is retried. Only the first copy of each record is yielded. Raises
+    FileNotFoundError if the school year hasn't been archived."""
+    # School years are only looked up among the archives, so that a school year can't
+    # be used to read other files.
+    if school_year not in list_archives():
+        raise FileNotFoundError(f"The {school_year} school year has not been archived.")
+
+    seen = {"period": set(), "signup": set()}
+    with gzip.open(get_archive_path(school_year), "rt") as file:
+        for line in file:
+            record = json.loads(line)
+            ids = seen[record["type"]]
+            if record["id"] not in ids:
+                ids.add(record["id"])
+                yield record
+
+
+def summarize_archive(school_year, by="total"):
+    """Summarizes the archive of ``school_year`` without loading it into the database.
+    Returns one row for each group of records (see ``GROUPINGS``) with the number of
+    sign-ups, how many were for lunch and for study hall, how many had their attendance
+    confirmed, and the attendance rate. Except for the summary by student, rows also
+    have the number of class periods, the maximum number of students they allowed, and
+    the fill rate. The archive is read once, one record at a time."""
+    group = GROUPINGS[by]
+    rows = {}
+    for record in iter_archive_records(school_year):
+        if by == "student" and record["type"] == "period":
+            continue
+
+        key_fields = group(record)
+        key = tuple(key_fields.values())
+        if key not in rows:
+            rows[key] = {
+                **key_fields,
+                "signups": 0,
+                "lunch": 0,
+                "study_hall": 0,
+                "attendance_confirmed": 0,
+            }
+            if by != "student":
+                rows[key].update(periods=0, max_students=0)
+        row = rows[key]
+
+        if record["type"] == "period":
+            row["periods"] += 1
+            row["max_students"] += record["max_student_count"]
+        else:
+            row["signups"] += 1
+            if record["reason"] == ClassPeriodSignUp.LUNCH:
+                row["lunch"] += 1
+            elif record["reason"] == ClassPeriodSignUp.STUDY_HALL:
+                row["study_hall"] += 1
+            if record["attendance_confirmed"]:
+                row["attendance_confirmed"] += 1
+
+    summary = []
+    # Students without a student ID or name are sorted first.
+    for key in sorted(
+        rows, key=lambda key: [(value is not None, value) for value in key]
+    ):
+        row = rows[key]
+        row["attendance_rate"] = get_rate(row["attendance_confirmed"], row["signups"])
+        if by != "student":
+            row["fill_rate"] = get_rate(row["signups"], row["max_students"])
+        summary.append(row)
+    return summary
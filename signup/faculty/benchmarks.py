@@ -0,0 +1,83 @@
+from contextlib import contextmanager
+from datetime import date
+from time import perf_counter
+
+from django.db import transaction
+
+from signup.models import (
+    ClassPeriod,
+    ClassPeriodSignUp,
+    Student,
+    StudentInfo,
+    UserNamePrefix,
+)
+
+# Benchmark data is created far in the future so that it can't collide with real class
+# periods. It is always rolled back afterwards.
+BENCHMARK_DATE = date(2099, 1, 5)
+
+
+@contextmanager
+def rolled_back():
+    """Runs the block in a transaction that is always rolled back, so that the data
+    created for a benchmark is never saved."""
+    with transaction.atomic():
+        yield
+        transaction.set_rollback(True)
+
+
+def create_signups(count, period_count=8, period_date=BENCHMARK_DATE, index_names=True):
+    """Creates ``count`` students (with student IDs) and signs each of them up for one
+    of ``period_count`` class periods on ``period_date``. Indexing the names for
+    searching can be skipped with ``index_names`` to save time."""
+    periods = ClassPeriod.objects.bulk_create(
+        ClassPeriod(date=period_date, number=number, max_student_count=count)
+        for number in range(1, period_count + 1)
+    )
+
+    Student.objects.bulk_create(
+        (
+            Student(email=f"benchmark{i}@example.com", name=f"Benchmark Student {i}")
+            for i in range(count)
+        ),
+        batch_size=1000,
+    )
+    students = Student.objects.filter(email__startswith="benchmark")
+    if index_names:
+        # bulk_create() doesn't call save(), which normally indexes the names.
+        UserNamePrefix.objects.rebuild(students)
+    students = list(students.order_by("pk"))
+
+    StudentInfo.objects.bulk_create(
+        (
+            StudentInfo(student=student, id=f"{i:06}")
+            for i, student in enumerate(students)
+        ),
+        batch_size=1000,
+    )
+    ClassPeriodSignUp.objects.bulk_create(
+        (
+            ClassPeriodSignUp(
+                student=student,
+                class_period=periods[i % period_count],
+                reason=ClassPeriodSignUp.STUDY_HALL,
+            )
+            for i, student in enumerate(students)
+        ),
+        batch_size=1000,
+    )
+
+    return periods
+
+
+def time_function(function, repeat=3):
+    """Calls ``function`` ``repeat`` times and returns the fastest time in seconds along
+    with the last result."""
+    best = None
+    for _ in range(repeat):
+        start = perf_counter()
+        result = function()
+        elapsed = perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best, result
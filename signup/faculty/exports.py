@@ -0,0 +1,83 @@
+import os
+from datetime import date
+from hashlib import sha256
+from pathlib import Path
+from time import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.http import QueryDict
+
+from signup.faculty.api.filters import ClassPeriodSignUpFilter
+from signup.models import ClassPeriodSignUp, SignUpDateVersion, UserNamePrefix
+
+# Query parameters that don't change which sign-ups are exported. Spreadsheets are
+# always sorted by date, period, and name and always have the same columns, so the
+# ordering and fields are ignored too.
+IGNORED_PARAMETERS = {"ordering", "page_size", "cursor", "format", "fields"}
+
+
+def normalize_query(query_params):
+    """Returns the filters in ``query_params`` as a query string with the parameters in
+    a fixed order and without empty values, so that equivalent requests produce the
+    same string."""
+    items = sorted(
+        (key, value)
+        for key, values in query_params.lists()
+        if key not in IGNORED_PARAMETERS
+        for value in values
+        if value != ""
+    )
+    return urlencode(items)
+
+
+def filter_signups(query):
+    """Returns the sign-ups matching the filters in the normalized ``query``, in the
+    same way as the sign-ups API."""
+    data = QueryDict(query)
+    signups = ClassPeriodSignUpFilter(data, queryset=ClassPeriodSignUp.objects.all()).qs
+    return UserNamePrefix.objects.filter_by_name(
+        signups, " ".join(data.getlist("search")), "student"
+    )
+
+
+def get_cache_key(query):
+    """Returns a key for the spreadsheet of the sign-ups matching ``query`` that
+    changes whenever one of those sign-ups might have changed. If the sign-ups are
+    filtered by date, only the version of that date is used."""
+    try:
+        signup_date = date.fromisoformat(QueryDict(query)["class_period__date"])
+        version = f"{signup_date}:{SignUpDateVersion.objects.get_version(signup_date)}"
+    except (KeyError, ValueError):
+        version = f"all:{SignUpDateVersion.objects.get_total_version()}"
+
+    return sha256(f"{version}|{query}".encode()).hexdigest()
+
+
+def get_cache_path(cache_key):
+    return Path(settings.SPREADSHEET_EXPORT_DIR) / f"{cache_key}.xlsx"
+
+
+def is_cached(cache_key):
+    """Determines if a recent enough spreadsheet exists for ``cache_key``. Changes to
+    student names don't change the key, so old spreadsheets aren't reused forever."""
+    try:
+        modified = get_cache_path(cache_key).stat().st_mtime
+    except FileNotFoundError:
+        return False
+    return time() - modified < settings.SPREADSHEET_EXPORT_MAX_AGE
+
+
+def delete_expired_exports():
+    """Deletes the cached spreadsheets that are too old to be reused."""
+    directory = Path(settings.SPREADSHEET_EXPORT_DIR)
+    if not directory.is_dir():
+        return
+
+    for path in directory.glob("*.xlsx"):
+        try:
+            if time() - path.stat().st_mtime >= settings.SPREADSHEET_EXPORT_MAX_AGE:
+                os.remove(path)
+        except FileNotFoundError:
+            # Another export deleted it first.
+            pass
@@ -4,10 +4,15 @@ from crispy_forms.layout import Submit
 from django import forms
 from django.conf import settings
 from django.core.exceptions import ValidationError
-from django.db.models import Count
 from django.utils.translation import gettext_lazy as _
 
-from signup.models import ClassPeriodSignUp
+from signup.faculty.schedules import (
+    find_capacity_conflicts,
+    find_capacity_conflicts_by_number,
+    plan_class_periods,
+    plan_class_periods_by_number,
+)
+from signup.models import ClosedDay, ScheduleTemplate
 
 
 # Taken from https://stackoverflow.com/a/59893460.
@@ -21,10 +26,13 @@ class HiddenInput(forms.Widget):
 
 
 class FutureClassPeriodsForm(forms.Form):
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, check_conflicts=True, **kwargs):
         super().__init__(*args, **kwargs)
         self.helper = FormHelper(self)
 
+        # The preview API turns this off since it reports conflicts instead.
+        self.check_conflicts = check_conflicts
+
         initial = kwargs.get("initial", {})
         self.existing_periods = initial.get("existing_periods", {})
 
@@ -68,34 +76,46 @@ class FutureClassPeriodsForm(forms.Form):
         if errors:
             raise ValidationError(errors)
 
-        signups = (
-            ClassPeriodSignUp.objects.filter(
-                class_period__date__gte=start_date, class_period__date__lte=end_date
-            )
-            .values(
-                "class_period__date",
-                "class_period__number",
-                "class_period__max_student_count",
-            )
-            .annotate(period_count=Count("class_period__pk"))
-            .order_by("class_period__date", "class_period__number")
-        )
+        max_student_counts = self.get_max_student_counts()
+        if not self.check_conflicts:
+            return cleaned_data
 
-        for signup in signups:
-            period_count = signup["period_count"]
-            class_period_number = signup["class_period__number"]
-            class_period_date = signup["class_period__date"]
-            new_max_student_count = cleaned_data[f"period_{class_period_number}"]
-            if period_count > new_max_student_count:
-                errors.append(
-                    ValidationError(
-                        f"Period {class_period_number} on {class_period_date} currently has {period_count} students, which is greater than the new maximum of {new_max_student_count}."
-                    )
+        # Only the periods whose sign-ups exceed the new maximums are returned.
+        for (
+            class_period_date,
+            class_period_number,
+            period_count,
+            new_max_student_count,
+        ) in find_capacity_conflicts_by_number(
+            start_date, end_date, max_student_counts
+        ):
+            errors.append(
+                ValidationError(
+                    f"Period {class_period_number} on {class_period_date} currently has {period_count} students, which is greater than the new maximum of {new_max_student_count}."
                 )
+            )
 
         if errors:
             raise ValidationError(errors)
 
+        return cleaned_data
+
+    def get_max_student_counts(self):
+        """Maps each period number to the maximum entered for it."""
+        return {
+            number: self.cleaned_data[f"period_{number}"]
+            for number in range(1, config.MAX_PERIOD_NUMBER + 1)
+            if self.cleaned_data.get(f"period_{number}") is not None
+        }
+
+    def get_planned_periods(self):
+        """Generates (unsaved) ClassPeriods for each date and period on the form."""
+        return plan_class_periods_by_number(
+            self.cleaned_data["start_date"],
+            self.cleaned_data["end_date"],
+            self.get_max_student_counts(),
+        )
+
 
 class SettingsForm(forms.Form):
     max_period_number = forms.IntegerField(label=_("Max number of periods"))
@@ -131,3 +151,189 @@ class SettingsForm(forms.Form):
             raise ValidationError(errors)
 
         return cleaned_data
+
+
+class ScheduleTemplateForm(forms.ModelForm):
+    class Meta:
+        model = ScheduleTemplate
+        fields = ["name", "template_type", "rotation_length"]
+        help_texts = {
+            "rotation_length": _(
+                "Only used by rotating templates (e.g. 3 for A/B/C days)."
+            )
+        }
+
+    def clean_rotation_length(self):
+        rotation_length = self.cleaned_data["rotation_length"]
+        if rotation_length < 1:
+            raise ValidationError(_("A rotation must contain at least one day."))
+        return rotation_length
+
+
+class ScheduleTemplateCapacitiesForm(forms.Form):
+    """Contains one field for each period on each day of a :class:`ScheduleTemplate`.
+    Fields are named ``day_<day>_period_<number>``."""
+
+    def __init__(self, *args, schedule_template=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.schedule_template = schedule_template
+
+        existing = {
+            (period.day, period.number): period.max_student_count
+            for period in schedule_template.periods.all()
+        }
+
+        for day in range(schedule_template.day_count):
+            for number in range(1, config.MAX_PERIOD_NUMBER + 1):
+                self.fields[f"day_{day}_period_{number}"] = forms.IntegerField(
+                    label=f"{schedule_template.day_name(day)}, period {number}",
+                    min_value=0,
+                    initial=existing.get((day, number), 0),
+                )
+
+    def rows(self):
+        """Returns a list of ``(day name, bound fields)`` tuples so that the fields can
+        be displayed as a grid."""
+        return [
+            (
+                self.schedule_template.day_name(day),
+                [
+                    self[f"day_{day}_period_{number}"]
+                    for number in range(1, config.MAX_PERIOD_NUMBER + 1)
+                ],
+            )
+            for day in range(self.schedule_template.day_count)
+        ]
+
+
+class ApplyScheduleTemplateForm(forms.Form):
+    start_date = forms.DateField(label=_("Start date"))
+    end_date = forms.DateField(label=_("End date"))
+    first_rotation_day = forms.IntegerField(
+        label=_("Rotation day of the first school day"),
+        min_value=1,
+        initial=1,
+        required=False,
+        help_text=_("Only used by rotating templates."),
+    )
+
+    def __init__(self, *args, schedule_template=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.schedule_template = schedule_template
+
+        # Stores the generated ClassPeriods so that they can be saved by
+        # ApplyScheduleTemplateFormView after validation.
+        self.planned_periods = []
+
+    def clean(self):
+        cleaned_data = super().clean()
+        errors = []
+
+        start_date = cleaned_data.get("start_date")
+        end_date = cleaned_data.get("end_date")
+        if start_date is None or end_date is None:
+            return cleaned_data
+
+        if end_date < start_date:
+            errors.append("Start date must come before end date.")
+        elif (end_date - start_date).days > settings.MAX_TEMPLATE_DATE_RANGE_DAYS:
+            errors.append(
+                "The number of days between the start and end dates must not exceed "
+                f"{settings.MAX_TEMPLATE_DATE_RANGE_DAYS}."
+            )
+
+        first_rotation_day = cleaned_data.get("first_rotation_day") or 1
+        if (
+            self.schedule_template.template_type == ScheduleTemplate.ROTATING
+            and first_rotation_day > self.schedule_template.rotation_length
+        ):
+            errors.append(
+                f"The rotation day must not exceed {self.schedule_template.rotation_length}."
+            )
+
+        if errors:
+            raise ValidationError(errors)
+
+        self.planned_periods = list(
+            plan_class_periods(
+                self.schedule_template, start_date, end_date, first_rotation_day - 1
+            )
+        )
+
+        for (
+            date,
+            number,
+            signed_up_count,
+            new_max_student_count,
+        ) in find_capacity_conflicts(self.planned_periods):
+            errors.append(
+                f"Period {number} on {date} currently has {signed_up_count} students, "
+                f"which is greater than the new maximum of {new_max_student_count}."
+            )
+
+        if errors:
+            raise ValidationError(errors)
+
+        return cleaned_data
+
+
+class ClosedDayForm(forms.ModelForm):
+    class Meta:
+        model = ClosedDay
+        fields = ["date", "description"]
+        widgets = {"date": forms.DateInput(attrs={"type": "date"})}
+
+
+class ImportClassPeriodsForm(forms.Form):
+    file = forms.FileField(
+        label=_("Spreadsheet"),
+        help_text=_(
+            "A CSV or XLSX file. The first row must contain a date heading followed by "
+            "period numbers, and each other row must contain a date followed by the "
+            "maximum number of students for each period."
+        ),
+    )
+    dry_run = forms.BooleanField(
+        label=_("Only show what would change"), initial=True, required=False
+    )
+
+    def clean_file(self):
+        file = self.cleaned_data["file"]
+        if not file.name.lower().endswith((".csv", ".xlsx")):
+            raise ValidationError(_("The file must be a CSV or XLSX file."))
+        return file
+
+
+class CancelClassPeriodsForm(forms.Form):
+    start_date = forms.DateField(
+        label=_("Start date"), widget=forms.DateInput(attrs={"type": "date"})
+    )
+    end_date = forms.DateField(
+        label=_("End date"),
+        required=False,
+        widget=forms.DateInput(attrs={"type": "date"}),
+        help_text=_("Leave blank to cancel a single day."),
+    )
+    mark_closed = forms.BooleanField(
+        label=_("Add these days to the closed days"), initial=True, required=False
+    )
+    description = forms.CharField(
+        label=_("Reason (e.g. snow day)"), max_length=100, required=False
+    )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        start_date = cleaned_data.get("start_date")
+        if start_date is None:
+            return cleaned_data
+
+        end_date = cleaned_data["end_date"] = cleaned_data.get("end_date") or start_date
+        if end_date < start_date:
+            raise ValidationError("Start date must come before end date.")
+        if (end_date - start_date).days > settings.MAX_DATE_RANGE_DAYS:
+            raise ValidationError(
+                "The number of days between the start and end dates must not exceed "
+                f"{settings.MAX_DATE_RANGE_DAYS}."
+            )
+
+        return cleaned_data
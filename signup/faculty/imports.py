@@ -0,0 +1,234 @@
+import csv
+from datetime import date, datetime
+from io import TextIOWrapper
+from itertools import islice
+
+from constance import config
+from django.db import transaction
+from openpyxl import load_workbook
+
+from signup.faculty.schedules import find_capacity_conflicts
+from signup.models import ClassPeriod
+
+# Only this many errors, conflicts, and changes are kept so that the result stays small
+# even if every row of a large file is invalid or changes a period.
+MAX_REPORTED_PROBLEMS = 100
+MAX_REPORTED_CHANGES = 100
+
+DATE_FORMATS = ["%Y-%m-%d", "%m/%d/%Y"]
+
+
+class ClassPeriodImportResult:
+    """Stores the number of ClassPeriods that an import created, updated, or left
+    unchanged, along with the periods that were created or updated and any problems
+    found along the way."""
+
+    def __init__(self, dry_run=False):
+        self.dry_run = dry_run
+        self.created = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.skipped = 0
+        self.problem_count = 0
+        self.problems = []
+        self.changes = []
+
+    def add_problem(self, message):
+        self.problem_count += 1
+        if len(self.problems) < MAX_REPORTED_PROBLEMS:
+            self.problems.append(message)
+
+    def add_change(self, period, old_max_student_count=None):
+        """Records that ``period`` was created (or updated from
+        ``old_max_student_count``), so that a dry run can preview what would change."""
+        if old_max_student_count is None:
+            self.created += 1
+        else:
+            self.updated += 1
+        if len(self.changes) >= MAX_REPORTED_CHANGES:
+            return
+
+        verb = "would be" if self.dry_run else "was"
+        if old_max_student_count is None:
+            change = f"created with a maximum of {period.max_student_count} students"
+        else:
+            change = (
+                f"changed from a maximum of {old_max_student_count} to "
+                f"{period.max_student_count} students"
+            )
+        self.changes.append(f"Period {period.number} on {period.date} {verb} {change}.")
+
+    @property
+    def change_count(self):
+        return self.created + self.updated
+
+    def __str__(self):
+        verb = "would be" if self.dry_run else "were"
+        return (
+            f"{self.created} periods {verb} created, {self.updated} {verb} updated, "
+            f"{self.unchanged} {verb} left unchanged, and {self.skipped} {verb} "
+            "skipped because of existing sign-ups."
+        )
+
+
+def iter_spreadsheet_rows(file, file_name):
+    """Yields each row of ``file`` as a tuple of cell values without loading the whole
+    file into memory. XLSX files are read with openpyxl's read-only mode, and every
+    other file is treated as CSV."""
+    if file_name.lower().endswith(".xlsx"):
+        workbook = load_workbook(file, read_only=True, data_only=True)
+        try:
+            yield from workbook.active.iter_rows(values_only=True)
+        finally:
+            # Read-only workbooks keep the file open until they are closed.
+            workbook.close()
+    else:
+        yield from csv.reader(TextIOWrapper(file, encoding="utf-8-sig", newline=""))
+
+
+def parse_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(str(value).strip(), date_format).date()
+        except ValueError:
+            pass
+    raise ValueError(f'"{value}" is not a valid date.')
+
+
+def is_empty(value):
+    return value is None or str(value).strip() == ""
+
+
+def parse_period_number(value):
+    # Numeric headings in XLSX files can be floats such as 3.0.
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    # Allows headings such as "Period 3" in addition to "3".
+    text = str(value).strip().lower().removeprefix("period").strip()
+    if not text.isdigit() or not 1 <= int(text) <= config.MAX_PERIOD_NUMBER:
+        raise ValueError(f'"{value}" is not a valid period number.')
+    return int(text)
+
+
+def parse_max_student_count(value, number):
+    # Numbers in XLSX files can be floats, so whole floats such as 12.0 are allowed,
+    # but 2.7 is rejected instead of being truncated.
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    try:
+        max_student_count = int(str(value).strip())
+    except ValueError:
+        raise ValueError(
+            f'The count for period {number} ("{value}") is not a whole number.'
+        ) from None
+    if max_student_count < 0:
+        raise ValueError(f"The count for period {number} is negative.")
+    return max_student_count
+
+
+def iter_class_periods(rows, result):
+    """Converts spreadsheet rows into unsaved ClassPeriods. The first row must contain
+    a heading for the date column followed by one period number per column. Each other
+    row contains a date followed by the maximum student counts. Empty cells and columns
+    without a heading (such as the ones left by trailing commas) are skipped, and invalid
+    rows are reported to ``result``."""
+    rows = iter(rows)
+    try:
+        headings = next(rows)
+    except StopIteration:
+        result.add_problem("The file is empty.")
+        return
+
+    try:
+        columns = [
+            (column, parse_period_number(value))
+            for column, value in enumerate(headings[1:], start=1)
+            if not is_empty(value)
+        ]
+    except ValueError as error:
+        result.add_problem(f"Row 1: {error}")
+        return
+
+    for row_number, row in enumerate(rows, start=2):
+        if not row or all(is_empty(value) for value in row):
+            continue
+
+        try:
+            period_date = parse_date(row[0])
+            periods = []
+            for column, number in columns:
+                value = row[column] if column < len(row) else None
+                if is_empty(value):
+                    continue
+                periods.append(
+                    ClassPeriod(
+                        date=period_date,
+                        number=number,
+                        max_student_count=parse_max_student_count(value, number),
+                    )
+                )
+        except ValueError as error:
+            result.add_problem(f"Row {row_number}: {error}")
+            continue
+
+        yield from periods
+
+
+def import_class_periods(file, file_name, dry_run=False, batch_size=500):
+    """Creates or updates ClassPeriods using the spreadsheet in ``file``. The file is
+    processed ``batch_size`` periods at a time, and each batch is saved in its own
+    transaction. Periods whose new maximum would be lower than their current number of
+    sign-ups are skipped. If ``dry_run`` is True, the changes are listed in the result
+    but not saved."""
+    result = ClassPeriodImportResult(dry_run=dry_run)
+    periods = iter_class_periods(iter_spreadsheet_rows(file, file_name), result)
+
+    while batch := list(islice(periods, batch_size)):
+        # If the same period appears more than once, the last one wins.
+        batch = list(
+            {(period.date, period.number): period for period in batch}.values()
+        )
+
+        with transaction.atomic():
+            conflicts = {
+                (period_date, number)
+                for period_date, number, signed_up_count, new_max_student_count in (
+                    find_capacity_conflicts(batch)
+                )
+            }
+            for period_date, number in sorted(conflicts):
+                result.add_problem(
+                    f"Period {number} on {period_date} has more sign-ups than its new "
+                    "maximum, so it was skipped."
+                )
+                result.skipped += 1
+
+            existing_periods = (
+                ClassPeriod.objects.get_unordered_queryset()
+                .filter(date__in={period.date for period in batch})
+                .values_list("date", "number", "max_student_count")
+            )
+            existing = {
+                (period_date, number): max_student_count
+                for period_date, number, max_student_count in existing_periods
+            }
+
+            to_save = []
+            for period in batch:
+                key = (period.date, period.number)
+                if key in conflicts:
+                    continue
+                if key in existing and existing[key] == period.max_student_count:
+                    result.unchanged += 1
+                    continue
+                result.add_change(period, existing.get(key))
+                to_save.append(period)
+
+            if not dry_run and to_save:
+                ClassPeriod.objects.bulk_upsert(to_save)
+
+    return result
@@ -0,0 +1,380 @@
+import gzip
+import tracemalloc
+from datetime import timedelta
+from functools import partial
+from resource import RUSAGE_SELF, getrusage
+from tempfile import TemporaryDirectory, TemporaryFile
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+from rest_framework.renderers import JSONRenderer
+
+from signup import middleware
+from signup.faculty.api import renderers
+from signup.faculty.api.renderers import (
+    CSVRenderer,
+    FastJSONRenderer,
+    JSONLinesRenderer,
+)
+from signup.faculty.api.serializers import (
+    ClassPeriodSignUpSerializer,
+    serialize_values,
+)
+from signup.faculty.api.spreadsheets import (
+    FIELD_NAMES,
+    HEADINGS,
+    generate_analytics_spreadsheet,
+    generate_spreadsheet,
+    iter_spreadsheet_rows,
+)
+from signup.faculty.benchmarks import (
+    BENCHMARK_DATE,
+    create_signups,
+    rolled_back,
+    time_function,
+)
+from signup.faculty.tasks import delete_class_periods
+from signup.models import ClassPeriod, ClassPeriodSignUp, Student, UserNamePrefix
+
+
+class Command(BaseCommand):
+    """Measures the performance of parts of the faculty view using generated data. The
+    data is created in a transaction that is rolled back afterwards, so nothing is
+    saved to the database."""
+
+    help = "Measures the performance of parts of the faculty view."
+
+    def add_arguments(self, parser):
+        subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+        serializers = subparsers.add_parser(
+            "serializers",
+            help="Compares the sign-up serializer to the values_list() fast path.",
+        )
+        serializers.add_argument("--rows", type=int, default=10000)
+
+        search = subparsers.add_parser(
+            "search",
+            help="Compares searching by name with LIKE to the name prefix index.",
+        )
+        search.add_argument(
+            "--users", type=int, nargs="+", default=[5000, 50000], metavar="COUNT"
+        )
+        search.add_argument("--query", default="4999")
+
+        spreadsheet = subparsers.add_parser(
+            "spreadsheet",
+            help="Measures the time and memory used to export sign-ups to Excel.",
+        )
+        spreadsheet.add_argument(
+            "--rows", type=int, nargs="+", default=[10000, 100000], metavar="COUNT"
+        )
+
+        exports = subparsers.add_parser(
+            "exports",
+            help="Compares the throughput of the XLSX, CSV, and JSON Lines exports.",
+        )
+        exports.add_argument("--rows", type=int, default=10000)
+
+        json = subparsers.add_parser(
+            "json",
+            help="Compares JSON renderers and the size of compressed sign-up lists.",
+        )
+        json.add_argument(
+            "--rows", type=int, nargs="+", default=[100, 1000, 5000], metavar="COUNT"
+        )
+
+        retention = subparsers.add_parser(
+            "retention",
+            help="Compares deleting old class periods at once to deleting them in "
+            "batches.",
+        )
+        retention.add_argument("--rows", type=int, default=100000)
+        retention.add_argument("--batch-size", type=int, default=1000)
+
+        analytics = subparsers.add_parser(
+            "analytics",
+            help="Measures the time used to export a school year of sign-ups with "
+            "the analytics sheets.",
+        )
+        analytics.add_argument("--days", type=int, default=180)
+        analytics.add_argument("--students", type=int, default=300)
+
+    def handle(self, *args, **options):
+        with rolled_back():
+            getattr(self, f"benchmark_{options['benchmark']}")(options)
+
+    def report(self, name, seconds):
+        self.stdout.write(f"{name}: {seconds * 1000:.1f} ms")
+
+    def benchmark_serializers(self, options):
+        create_signups(options["rows"])
+        queryset = ClassPeriodSignUp.objects.select_related(
+            "class_period", "student", "student__info"
+        ).order_by("student__name")
+        renderer = JSONRenderer()
+
+        serializer_time, serializer_data = time_function(
+            lambda: renderer.render(
+                ClassPeriodSignUpSerializer(queryset, many=True).data
+            )
+        )
+        values_time, values_data = time_function(
+            lambda: renderer.render(
+                serialize_values(ClassPeriodSignUpSerializer(), queryset)
+            )
+        )
+
+        if serializer_data != values_data:
+            raise CommandError("The two serialization methods produced different JSON.")
+
+        self.stdout.write(f"Serializing {options['rows']} sign-ups:")
+        self.report("ClassPeriodSignUpSerializer", serializer_time)
+        self.report("serialize_values()", values_time)
+        self.stdout.write(f"Speedup: {serializer_time / values_time:.1f}x")
+
+    def benchmark_search(self, options):
+        query = options["query"]
+
+        for count in options["users"]:
+            # Each count starts from an empty database.
+            with rolled_back():
+                create_signups(count)
+                students = Student.objects.get_similar_queryset()
+                signups = ClassPeriodSignUp.objects.filter(
+                    class_period__date=BENCHMARK_DATE
+                )
+
+                timings = {
+                    "Typeahead with LIKE": lambda students=students: list(
+                        students.filter(name__icontains=query)
+                        .order_by("name", "pk")
+                        .values_list("pk", flat=True)[:10]
+                    ),
+                    "Typeahead with the prefix index": lambda students=students: list(
+                        UserNamePrefix.objects.filter_by_name(students, query)
+                        .order_by("name", "pk")
+                        .values_list("pk", flat=True)[:10]
+                    ),
+                    "Sign-ups with LIKE": lambda signups=signups: list(
+                        signups.filter(student__name__icontains=query).values_list(
+                            "pk", flat=True
+                        )
+                    ),
+                    "Sign-ups with the prefix index": lambda signups=signups: list(
+                        UserNamePrefix.objects.filter_by_name(
+                            signups, query, "student"
+                        ).values_list("pk", flat=True)
+                    ),
+                }
+
+                self.stdout.write(f'Searching {count} students for "{query}":')
+                for name, function in timings.items():
+                    self.report(name, time_function(function)[0])
+
+    def benchmark_spreadsheet(self, options):
+        for count in options["rows"]:
+            with rolled_back():
+                create_signups(count, index_names=False)
+                signups = ClassPeriodSignUp.objects.filter(
+                    class_period__date=BENCHMARK_DATE
+                )
+
+                with TemporaryFile() as file:
+                    seconds, _ = time_function(
+                        partial(generate_spreadsheet, signups, file), repeat=1
+                    )
+                    size = file.tell()
+
+                # Memory is measured separately since tracing slows everything down.
+                # ru_maxrss is in kilobytes on Linux.
+                rss_before = getrusage(RUSAGE_SELF).ru_maxrss
+                tracemalloc.start()
+                with TemporaryFile() as file:
+                    generate_spreadsheet(signups, file)
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                rss_after = getrusage(RUSAGE_SELF).ru_maxrss
+
+                self.stdout.write(
+                    f"Exporting {count} sign-ups ({size / 2**20:.1f} MiB file):"
+                )
+                self.report("Time", seconds)
+                self.stdout.write(f"Peak Python memory: {peak / 2**20:.1f} MiB")
+                self.stdout.write(
+                    f"Peak RSS: {rss_after / 1024:.1f} MiB (grew by "
+                    f"{(rss_after - rss_before) / 1024:.1f} MiB during the export)"
+                )
+
+    def benchmark_exports(self, options):
+        count = options["rows"]
+        create_signups(count, index_names=False)
+        signups = ClassPeriodSignUp.objects.filter(class_period__date=BENCHMARK_DATE)
+
+        def export_xlsx():
+            with TemporaryFile() as file:
+                generate_spreadsheet(signups, file)
+
+        def export_csv():
+            for _ in CSVRenderer().stream(HEADINGS, iter_spreadsheet_rows(signups)):
+                pass
+
+        def export_json_lines():
+            rows = iter_spreadsheet_rows(signups)
+            for _ in JSONLinesRenderer().stream(FIELD_NAMES, rows):
+                pass
+
+        self.stdout.write(f"Exporting {count} sign-ups:")
+        for name, function in (
+            ("XLSX", export_xlsx),
+            ("CSV", export_csv),
+            ("JSON Lines", export_json_lines),
+        ):
+            seconds, _ = time_function(function)
+            self.stdout.write(
+                f"{name}: {seconds * 1000:.1f} ms ({count / seconds:,.0f} rows/s)"
+            )
+
+    def benchmark_analytics(self, options):
+        days, student_count = options["days"], options["students"]
+        create_signups(student_count, index_names=False)
+        students = list(Student.objects.filter(email__startswith="benchmark"))
+
+        # Every student signs up for one class period on each of the other days.
+        for day in range(1, days):
+            periods = ClassPeriod.objects.bulk_create(
+                ClassPeriod(
+                    date=BENCHMARK_DATE + timedelta(days=day),
+                    number=number,
+                    max_student_count=student_count,
+                )
+                for number in range(1, 9)
+            )
+            ClassPeriodSignUp.objects.bulk_create(
+                (
+                    ClassPeriodSignUp(
+                        student=student,
+                        class_period=periods[(i + day) % 8],
+                        reason=(
+                            ClassPeriodSignUp.LUNCH
+                            if i % 3 == 0
+                            else ClassPeriodSignUp.STUDY_HALL
+                        ),
+                        attendance_confirmed=i % 4 != 0,
+                    )
+                    for i, student in enumerate(students)
+                ),
+                batch_size=1000,
+            )
+
+        signups = ClassPeriodSignUp.objects.filter(
+            class_period__date__gte=BENCHMARK_DATE
+        )
+        count = signups.count()
+
+        def export(generate):
+            with TemporaryFile() as file:
+                generate(signups, file)
+
+        list_seconds, _ = time_function(lambda: export(generate_spreadsheet), repeat=1)
+        analytics_seconds, _ = time_function(
+            lambda: export(generate_analytics_spreadsheet), repeat=1
+        )
+
+        self.stdout.write(
+            f"Exporting {count} sign-ups over {days} days by {student_count} students:"
+        )
+        self.report("Sign-ups only", list_seconds)
+        self.report("With analytics sheets", analytics_seconds)
+        self.report("Analytics sheets", analytics_seconds - list_seconds)
+
+    def benchmark_json(self, options):
+        if renderers.orjson is None:
+            self.stdout.write("orjson isn't installed, so FastJSONRenderer falls back.")
+
+        for count in options["rows"]:
+            with rolled_back():
+                create_signups(count, index_names=False)
+                data = serialize_values(
+                    ClassPeriodSignUpSerializer(),
+                    ClassPeriodSignUp.objects.order_by("student__name"),
+                )
+
+                json_time, content = time_function(
+                    lambda data=data: JSONRenderer().render(data)
+                )
+                fast_time, fast_content = time_function(
+                    lambda data=data: FastJSONRenderer().render(data)
+                )
+                if content != fast_content:
+                    raise CommandError("The two renderers produced different JSON.")
+
+                self.stdout.write(f"Rendering {count} sign-ups:")
+                self.report("JSONRenderer", json_time)
+                self.report("FastJSONRenderer", fast_time)
+                self.stdout.write(f"Uncompressed: {len(content):,} bytes")
+
+                # Uses the same settings as CompressionMiddleware and GZipMiddleware.
+                compressors = {
+                    "gzip": partial(gzip.compress, content, compresslevel=6, mtime=0)
+                }
+                if middleware.brotli is not None:
+                    compressors["Brotli"] = partial(
+                        middleware.brotli.compress,
+                        content,
+                        quality=middleware.BROTLI_QUALITY,
+                    )
+                for name, compress in compressors.items():
+                    seconds, compressed = time_function(compress)
+                    self.stdout.write(
+                        f"{name}: {len(compressed):,} bytes "
+                        f"({len(compressed) / len(content):.0%}) in "
+                        f"{seconds * 1000:.1f} ms"
+                    )
+
+    def benchmark_retention(self, options):
+        count = options["rows"]
+
+        def run(delete, trace_memory):
+            # Each run deletes its own copy of the data, and archives it to a
+            # temporary directory.
+            with (
+                rolled_back(),
+                TemporaryDirectory() as archive_dir,
+                override_settings(SIGN_UP_ARCHIVE_DIR=archive_dir),
+            ):
+                create_signups(count, index_names=False)
+                periods = ClassPeriod.objects.get_unordered_queryset().filter(
+                    date=BENCHMARK_DATE
+                )
+
+                if not trace_memory:
+                    return time_function(lambda: delete(periods), repeat=1)[0]
+
+                tracemalloc.start()
+                delete(periods)
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                return peak
+
+        self.stdout.write(f"Deleting 8 class periods with {count} sign-ups:")
+        for name, delete in (
+            ("QuerySet.delete()", lambda periods: periods.delete()),
+            (
+                "delete_class_periods()",
+                lambda periods: delete_class_periods(periods, options["batch_size"]),
+            ),
+            (
+                "delete_class_periods() with archiving",
+                lambda periods: delete_class_periods(
+                    periods, options["batch_size"], school_year_end=(7, 1)
+                ),
+            ),
+        ):
+            # Memory is measured separately since tracing slows everything down.
+            seconds = run(delete, trace_memory=False)
+            peak = run(delete, trace_memory=True)
+            self.stdout.write(
+                f"{name}: {seconds * 1000:.1f} ms, peak Python memory "
+                f"{peak / 2**20:.1f} MiB"
+            )
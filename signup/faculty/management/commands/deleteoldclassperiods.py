@@ -3,13 +3,17 @@ from datetime import date
 from django.core.management.base import BaseCommand
 from django.utils import timezone
 
+from signup.faculty.tasks import delete_class_periods
 from signup.models import ClassPeriod
 
 
 class Command(BaseCommand):
     """Removes old class periods and signups from previous school years. Accepts two
     arguments: one for the month and one for the day representing the end of the school
-    year."""
+    year. The class periods and sign-ups are deleted in batches, so the command can be
+    stopped and run again later to continue. Unless ``--no-archive`` is given, each
+    batch is archived to the archive of its school year first (see
+    :mod:`signup.faculty.archives`)."""
 
     help = "Removes old class periods and signups from previous school years."
 
@@ -18,6 +22,23 @@ class Command(BaseCommand):
         parser.add_argument(
             "day", type=int, help="Day of month when this school year ends."
         )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of rows deleted per transaction (1000 by default).",
+        )
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0,
+            help="Seconds to wait between batches so that other queries can run.",
+        )
+        parser.add_argument(
+            "--no-archive",
+            action="store_true",
+            help="Delete the class periods and sign-ups without archiving them.",
+        )
 
     def handle(self, *args, **options):
         now = timezone.now().date()
@@ -30,4 +51,23 @@ class Command(BaseCommand):
                 year=end_of_school_year.year - 1
             )
 
-        ClassPeriod.objects.filter(date__lte=end_of_school_year).delete()
+        signup_count, period_count = delete_class_periods(
+            ClassPeriod.objects.get_unordered_queryset().filter(
+                date__lte=end_of_school_year
+            ),
+            batch_size=options["batch_size"],
+            pause=options["pause"],
+            progress=self.report_progress if options["verbosity"] >= 1 else None,
+            school_year_end=(
+                None if options["no_archive"] else (options["month"], options["day"])
+            ),
+        )
+        self.stdout.write(
+            f"Deleted {signup_count} sign-ups and {period_count} class periods on or "
+            f"before {end_of_school_year}."
+        )
+
+    def report_progress(self, signup_count, period_count):
+        self.stdout.write(
+            f"Deleted {signup_count} sign-ups and {period_count} class periods so far."
+        )
@@ -0,0 +1,58 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from signup.faculty.imports import import_class_periods
+
+
+class Command(BaseCommand):
+    """Creates or updates class periods using a CSV or XLSX spreadsheet. The first row
+    must contain a date heading followed by period numbers, and each other row must
+    contain a date followed by the maximum number of students for each period."""
+
+    help = "Creates or updates class periods using a CSV or XLSX spreadsheet."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", type=Path, help="Path to the spreadsheet.")
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only show what would change without saving anything.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of class periods saved per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be a positive integer.")
+
+        path = options["path"]
+        if not path.is_file():
+            raise CommandError(f"{path} does not exist.")
+
+        with path.open("rb") as file:
+            result = import_class_periods(
+                file,
+                path.name,
+                dry_run=options["dry_run"],
+                batch_size=options["batch_size"],
+            )
+
+        for change in result.changes:
+            self.stdout.write(change)
+        if result.change_count > len(result.changes):
+            verb = "would be" if result.dry_run else "were"
+            self.stdout.write(
+                f"{result.change_count} periods {verb} created or updated in total."
+            )
+
+        for problem in result.problems:
+            self.stderr.write(problem)
+        if result.problem_count > len(result.problems):
+            self.stderr.write(f"{result.problem_count} problems were found in total.")
+
+        self.stdout.write(str(result))
@@ -0,0 +1,45 @@
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+
+from signup.faculty.archives import GROUPINGS, list_archives, summarize_archive
+
+
+class Command(BaseCommand):
+    """Summarizes the class periods and sign-ups that were archived for a school year
+    before being deleted, without loading them back into the database. The summary is
+    written as CSV, so it can be opened in Excel. Without a school year, lists the
+    school years that have been archived."""
+
+    help = "Summarizes the archived class periods and sign-ups of a school year."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "school_year", nargs="?", help='School year to summarize, e.g. "2022-2023".'
+        )
+        parser.add_argument(
+            "--by",
+            choices=list(GROUPINGS),
+            default="total",
+            help="How to group the sign-ups (total by default).",
+        )
+
+    def handle(self, *args, **options):
+        if options["school_year"] is None:
+            for school_year in list_archives():
+                self.stdout.write(school_year)
+            return
+
+        try:
+            rows = summarize_archive(options["school_year"], options["by"])
+        except FileNotFoundError:
+            raise CommandError(
+                f"The {options['school_year']} school year has not been archived."
+            ) from None
+
+        if rows:
+            writer = csv.DictWriter(
+                self.stdout, fieldnames=list(rows[0]), lineterminator="\n"
+            )
+            writer.writeheader()
+            writer.writerows(rows)
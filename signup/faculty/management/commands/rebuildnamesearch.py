@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from signup.models import User, UserNamePrefix
+
+
+class Command(BaseCommand):
+    """Rebuilds the name search index of every user. Names saved through
+    ``User.save()`` are indexed automatically, so this is only needed after names are
+    changed in bulk (e.g. with ``QuerySet.update()``)."""
+
+    help = "Rebuilds the name search index of every user."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of users updated per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        count = UserNamePrefix.objects.rebuild(
+            User.objects.all(), batch_size=options["batch_size"]
+        )
+        self.stdout.write(f"The names of {count} users were indexed.")
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from signup.faculty.notifications import send_outbox_emails
+
+
+class Command(BaseCommand):
+    """Sends the emails in the outbox that are due. Emails are normally sent right
+    after they are queued, so this only needs to run periodically (e.g. with cron) to
+    retry emails that failed."""
+
+    help = "Sends the emails in the outbox that are due."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            help="Number of emails claimed at a time (EMAIL_OUTBOX_BATCH_SIZE by "
+            "default).",
+        )
+
+    def handle(self, *args, **options):
+        sent_count = send_outbox_emails(batch_size=options["batch_size"])
+        self.stdout.write(f"{sent_count} emails were sent.")
@@ -0,0 +1,124 @@
+from datetime import timedelta
+from itertools import groupby
+from operator import itemgetter
+from threading import Lock
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.formats import date_format
+
+from signup.models import OutboxEmail
+
+DATE_FORMAT = "F j, Y"
+
+REMOVAL_SUBJECT = "Media Center Sign-Up Removal"
+
+# Claimed emails aren't claimed again by another sender until this much time passes, in
+# case the sender that claimed them stopped before finishing.
+CLAIM_DURATION = timedelta(minutes=10)
+
+# Failed emails are retried after this delay, which doubles after every failure.
+RETRY_DELAY = timedelta(minutes=1)
+
+# Only one thread of this process sends emails at a time.
+_sending_lock = Lock()
+
+
+def removal_notice_body(periods):
+    """Generates the body of the email sent to a student whose sign-ups were removed.
+    ``periods`` is a list of ``(period number, date)`` tuples."""
+    if len(periods) == 1:
+        number, date = periods[0]
+        return (
+            "You signed up to use the Holy Cross Media Center during period "
+            f"{number} on {date_format(date, DATE_FORMAT)}. This sign-up has been "
+            "removed."
+        )
+
+    lines = "\n".join(
+        f"Period {number} on {date_format(date, DATE_FORMAT)}"
+        for number, date in periods
+    )
+    return (
+        "You signed up to use the Holy Cross Media Center during the following "
+        f"periods. These sign-ups have been removed.\n\n{lines}"
+    )
+
+
+def iter_removal_notices(signups):
+    """Yields one message (in the format used by :func:`send_mass_mail`) for each
+    student with a sign-up in ``signups``. Each message lists all of that student's
+    sign-ups. Only the needed columns are fetched, using a single query."""
+    rows = signups.order_by(
+        "student__email", "class_period__date", "class_period__number"
+    ).values_list("student__email", "class_period__number", "class_period__date")
+
+    for email, student_rows in groupby(rows.iterator(), key=itemgetter(0)):
+        periods = [(number, date) for _, number, date in student_rows]
+        yield (REMOVAL_SUBJECT, removal_notice_body(periods), None, (email,))
+
+
+def claim_outbox_emails(batch_size, max_attempts):
+    """Returns up to ``batch_size`` unsent emails that are due, delaying their next
+    attempt so that other senders skip them. Rows locked by another sender are skipped
+    on databases that support it."""
+    now = timezone.now()
+    with transaction.atomic():
+        emails = list(
+            OutboxEmail.objects.select_for_update(skip_locked=True)
+            .filter(date_sent=None, attempts__lt=max_attempts, next_attempt__lte=now)
+            .order_by("next_attempt", "pk")[:batch_size]
+        )
+        OutboxEmail.objects.filter(pk__in=[email.pk for email in emails]).update(
+            next_attempt=now + CLAIM_DURATION
+        )
+    return emails
+
+
+def send_outbox_emails(batch_size=None, max_attempts=None):
+    """Sends the emails in the outbox that are due, ``batch_size`` at a time, over a
+    single connection to the mail server. Each failed email is retried later with an
+    increasing delay until it has failed ``max_attempts`` times. Returns the number of
+    emails sent."""
+    batch_size = batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE
+    max_attempts = max_attempts or settings.EMAIL_OUTBOX_MAX_ATTEMPTS
+    sent_count = 0
+
+    with _sending_lock:
+        connection = get_connection()
+        try:
+            while emails := claim_outbox_emails(batch_size, max_attempts):
+                sent_ids = []
+                for email in emails:
+                    message = EmailMessage(
+                        email.subject,
+                        email.body,
+                        email.from_email or None,
+                        [email.recipient],
+                        connection=connection,
+                    )
+                    try:
+                        message.send()
+                    except Exception as error:  # pylint: disable=broad-except
+                        # Reconnects for the next email in case the connection broke.
+                        connection.close()
+                        OutboxEmail.objects.filter(pk=email.pk).update(
+                            attempts=F("attempts") + 1,
+                            last_error=str(error),
+                            next_attempt=timezone.now()
+                            + RETRY_DELAY * 2**email.attempts,
+                        )
+                    else:
+                        sent_ids.append(email.pk)
+
+                OutboxEmail.objects.filter(pk__in=sent_ids).update(
+                    date_sent=timezone.now()
+                )
+                sent_count += len(sent_ids)
+        finally:
+            connection.close()
+
+    return sent_count
@@ -0,0 +1,178 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db.models import Case, Count, F, IntegerField, Value, When
+
+from signup.models import ClassPeriod, ClosedDay, ScheduleTemplate
+
+
+def date_range(start_date, end_date):
+    """Yields every date from ``start_date`` to ``end_date`` (inclusive)."""
+    for days in range((end_date - start_date).days + 1):
+        yield start_date + timedelta(days=days)
+
+
+def plan_class_periods(template, start_date, end_date, first_rotation_day=0):
+    """Generates (unsaved) ClassPeriods for every school day between ``start_date`` and
+    ``end_date`` using the maximum student counts in ``template``. Weekends and
+    :class:`ClosedDay` dates are skipped. For rotating templates, ``start_date`` (or the
+    first school day after it) uses ``first_rotation_day``, and the rotation only
+    advances on school days."""
+    closed_days = set(
+        ClosedDay.objects.filter(date__gte=start_date, date__lte=end_date).values_list(
+            "date", flat=True
+        )
+    )
+
+    capacities = defaultdict(list)
+    for day, number, max_student_count in template.periods.values_list(
+        "day", "number", "max_student_count"
+    ):
+        capacities[day].append((number, max_student_count))
+
+    is_weekly = template.template_type == ScheduleTemplate.WEEKLY
+    rotation_day = first_rotation_day
+
+    for date in date_range(start_date, end_date):
+        # Saturday and Sunday are 5 and 6.
+        if date.weekday() >= 5 or date in closed_days:
+            continue
+
+        if is_weekly:
+            day = date.weekday()
+        else:
+            day = rotation_day
+            rotation_day = (rotation_day + 1) % template.rotation_length
+
+        for number, max_student_count in capacities[day]:
+            yield ClassPeriod(
+                date=date, number=number, max_student_count=max_student_count
+            )
+
+
+def plan_class_periods_by_number(start_date, end_date, max_student_counts):
+    """Generates (unsaved) ClassPeriods for every date between ``start_date`` and
+    ``end_date``. ``max_student_counts`` maps period numbers to their maximums."""
+    for date in date_range(start_date, end_date):
+        for number, max_student_count in max_student_counts.items():
+            yield ClassPeriod(
+                date=date, number=number, max_student_count=max_student_count
+            )
+
+
+def find_capacity_conflicts(periods):
+    """Returns a list of ``(date, number, signed_up_count, new_max_student_count)``
+    tuples for each ClassPeriod in ``periods`` whose new maximum student count is lower
+    than the number of students who already signed up for it. Only existing periods
+    on the same dates as ``periods`` that have sign-ups are fetched."""
+    new_max_student_counts = {
+        (period.date, period.number): period.max_student_count for period in periods
+    }
+    if not new_max_student_counts:
+        return []
+
+    signed_up_counts = (
+        ClassPeriod.objects.get_unordered_queryset()
+        .filter(date__in={date for date, _ in new_max_student_counts})
+        .annotate(signed_up_count=Count("student_sign_ups"))
+        .filter(signed_up_count__gt=0)
+        .order_by("date", "number")
+        .values_list("date", "number", "signed_up_count")
+    )
+
+    conflicts = []
+    for date, number, signed_up_count in signed_up_counts:
+        new_max_student_count = new_max_student_counts.get((date, number))
+        if (
+            new_max_student_count is not None
+            and signed_up_count > new_max_student_count
+        ):
+            conflicts.append((date, number, signed_up_count, new_max_student_count))
+
+    return conflicts
+
+
+def find_capacity_conflicts_by_number(start_date, end_date, max_student_counts):
+    """Returns a list of ``(date, number, signed_up_count, new_max_student_count)``
+    tuples for each existing ClassPeriod between ``start_date`` and ``end_date`` that
+    has more sign-ups than its new maximum. ``max_student_counts`` maps period numbers
+    to their new maximums. The comparison is done by the database, so only the
+    conflicting periods are returned."""
+    if not max_student_counts:
+        return []
+
+    new_max_student_count = Case(
+        *(
+            When(number=number, then=Value(max_student_count))
+            for number, max_student_count in max_student_counts.items()
+        ),
+        output_field=IntegerField(),
+    )
+
+    return list(
+        ClassPeriod.objects.get_unordered_queryset()
+        .filter(
+            date__gte=start_date,
+            date__lte=end_date,
+            number__in=max_student_counts.keys(),
+        )
+        .annotate(
+            signed_up_count=Count("student_sign_ups"),
+            new_max_student_count=new_max_student_count,
+        )
+        .filter(signed_up_count__gt=F("new_max_student_count"))
+        .order_by("date", "number")
+        .values_list("date", "number", "signed_up_count", "new_max_student_count")
+    )
+
+
+def preview_class_periods(periods):
+    """Summarizes what saving ``periods`` (unsaved ClassPeriods) would do without
+    saving anything. Returns a list with one dictionary per date containing the number
+    of periods that would be created, updated, or left unchanged, the number of
+    periods whose new maximum is lower than their current number of sign-ups, and the
+    number of students already signed up that day. The existing periods and their
+    sign-up counts are fetched with a single query."""
+    dates = sorted({period.date for period in periods})
+    summaries = {
+        date: {
+            "date": date,
+            "created": 0,
+            "updated": 0,
+            "unchanged": 0,
+            "conflicts": 0,
+            "signed_up": 0,
+        }
+        for date in dates
+    }
+    if not dates:
+        return []
+
+    existing_periods = (
+        ClassPeriod.objects.get_unordered_queryset()
+        .filter(date__gte=dates[0], date__lte=dates[-1])
+        .annotate(signed_up_count=Count("student_sign_ups"))
+        .values_list("date", "number", "max_student_count", "signed_up_count")
+    )
+    existing = {}
+    for date, number, max_student_count, signed_up_count in existing_periods:
+        existing[(date, number)] = (max_student_count, signed_up_count)
+        if date in summaries:
+            summaries[date]["signed_up"] += signed_up_count
+
+    for period in periods:
+        summary = summaries[period.date]
+        key = (period.date, period.number)
+        if key not in existing:
+            summary["created"] += 1
+            continue
+
+        max_student_count, signed_up_count = existing[key]
+        if signed_up_count > period.max_student_count:
+            summary["conflicts"] += 1
+        elif max_student_count != period.max_student_count:
+            summary["updated"] += 1
+        else:
+            summary["unchanged"] += 1
+
+    return list(summaries.values())
@@ -1,14 +1,405 @@
+import os
+from datetime import timedelta
+from tempfile import NamedTemporaryFile
+from threading import Thread
+from time import sleep
+
+from django.conf import settings
+from django.db import connection, transaction
 from django.utils import timezone
 
-from signup.models import ClassPeriod
+from signup.faculty.api.spreadsheets import generate_spreadsheet
+from signup.faculty.archives import (
+    append_to_archives,
+    iter_period_records,
+    iter_signup_records,
+)
+from signup.faculty.exports import (
+    delete_expired_exports,
+    filter_signups,
+    get_cache_key,
+    get_cache_path,
+    is_cached,
+)
+from signup.faculty.notifications import iter_removal_notices, send_outbox_emails
+from signup.faculty.schedules import date_range
+from signup.models import (
+    ClassPeriod,
+    ClassPeriodSignUp,
+    ClosedDay,
+    OutboxEmail,
+    PeriodCancellation,
+    SpreadsheetExport,
+)
+
+
+def iter_pk_ranges(queryset, batch_size):
+    """Yields ``(start, end)`` ranges of primary keys (``start < pk <= end``) that each
+    contain up to ``batch_size`` of the objects in ``queryset``, in order. Only the last
+    primary key of each range is fetched, and only after the previous range has been
+    handled, so the objects can be deleted in between."""
+    queryset = queryset.order_by("pk").values_list("pk", flat=True)
+    start = 0
+    while True:
+        remaining = queryset.filter(pk__gt=start)
+        try:
+            end = remaining[batch_size - 1]
+        except IndexError:
+            end = remaining.last()
+            if end is None:
+                return
+        yield start, end
+        start = end
+
+
+def delete_class_periods(
+    periods, batch_size=1000, pause=0, progress=None, school_year_end=None
+):
+    """Deletes the ClassPeriods in ``periods`` and their ClassPeriodSignUps by ranges of
+    IDs, each with up to ``batch_size`` rows and in its own transaction, so that rows
+    are only locked for a short time.
+
+    The sign-ups are deleted first without tombstones (see
+    :meth:`signup.models.ClassPeriodSignUpQuerySet.delete_resetting_versions`). If
+    ``school_year_end`` is given as a ``(month, day)`` tuple, each batch is first
+    archived to the archive of its school year (see :mod:`signup.faculty.archives`)
+    before its transaction is committed. If given, ``pause`` seconds are slept between
+    batches so that other queries can run, and ``progress`` is called with the number of
+    sign-ups and class periods deleted so far after each batch. Every batch is
+    committed, so if this is interrupted, calling it again continues where it stopped.
+    Returns the number of sign-ups and class periods deleted."""
+    signup_count = period_count = 0
+
+    def finish_batch():
+        if progress is not None:
+            progress(signup_count, period_count)
+        if pause:
+            sleep(pause)
+
+    def archive(records):
+        if records:
+            append_to_archives(records, school_year_end)
+
+    signups = ClassPeriodSignUp.objects.filter(class_period__in=periods)
+    for start, end in iter_pk_ranges(signups, batch_size):
+        batch = signups.filter(pk__gt=start, pk__lte=end)
+        with transaction.atomic():
+            records = []
+            if school_year_end is not None:
+                records.extend(iter_signup_records(batch))
+            deleted, _ = batch.delete_resetting_versions()
+            archive(records)
+        signup_count += deleted
+        finish_batch()
+
+    # Any sign-ups created in the meantime are deleted along with their periods.
+    for start, end in iter_pk_ranges(periods, batch_size):
+        batch = periods.filter(pk__gt=start, pk__lte=end)
+        with transaction.atomic():
+            records = []
+            if school_year_end is not None:
+                records.extend(iter_period_records(batch))
+                records.extend(
+                    iter_signup_records(
+                        ClassPeriodSignUp.objects.filter(class_period__in=batch)
+                    )
+                )
+            _, deleted = batch.delete()
+            archive(records)
+        signup_count += deleted.get(ClassPeriodSignUp._meta.label, 0)
+        period_count += deleted.get(ClassPeriod._meta.label, 0)
+        finish_batch()
+
+    return signup_count, period_count
+
+
+def delete_old_periods_and_signups(batch_size=1000, pause=0, progress=None):
+    """Removes ClassPeriods with a date field that is before/equal to today's date, along
+    with their ClassPeriodSignUps, in batches after archiving them (see
+    :func:`delete_class_periods`)."""
+    return delete_class_periods(
+        ClassPeriod.objects.get_unordered_queryset().filter(date__lte=timezone.now()),
+        batch_size,
+        pause,
+        progress,
+        school_year_end=settings.SCHOOL_YEAR_END,
+    )
+
+
+def delete_in_batches(queryset, batch_size=500, before_delete=None):
+    """Deletes the objects in ``queryset`` ``batch_size`` objects at a time, each batch
+    in its own transaction, so that rows aren't locked for long and the objects don't
+    all have to be loaded at once. If given, ``before_delete`` is called with a queryset
+    of each batch inside its transaction, so that anything it writes (such as emails
+    queued to the outbox) is committed together with the deletion. Yields the number of
+    objects deleted by each batch."""
+    model = queryset.model
+    while ids := list(queryset.values_list("pk", flat=True)[:batch_size]):
+        batch = model.objects.filter(pk__in=ids)
+        with transaction.atomic():
+            if before_delete is not None:
+                before_delete(batch)
+            batch.delete()
+        yield len(ids)
+
+
+def cancel_class_periods(cancellation, batch_size=500):
+    """Deletes the ClassPeriods (and their ClassPeriodSignUps) in the date range of
+    ``cancellation``, updating its progress after each batch. Students who signed up
+    for a period today or in the future receive one email listing all of their removed
+    sign-ups.
+
+    Each batch contains every sign-up of as many students as fit in about
+    ``batch_size`` sign-ups, so that each student's email can be queued in the same
+    transaction that deletes their sign-ups. Emails are therefore only sent for sign-ups
+    that were actually removed, and if the cancellation is interrupted, running it again
+    continues where it stopped without emailing anyone twice. The periods are then
+    deleted by ranges of IDs, up to ``batch_size`` at a time, along with any sign-ups
+    created for them in the meantime."""
+    periods = ClassPeriod.objects.get_unordered_queryset().filter(
+        date__gte=cancellation.start_date, date__lte=cancellation.end_date
+    )
+    signups = ClassPeriodSignUp.objects.filter(class_period__in=periods)
+
+    # Sign-ups deleted before an interruption are still counted.
+    deleted_sign_up_count = PeriodCancellation.objects.values_list(
+        "deleted_sign_up_count", flat=True
+    ).get(pk=cancellation.pk)
+    sign_up_count = deleted_sign_up_count + signups.count()
+    PeriodCancellation.objects.filter(pk=cancellation.pk).update(
+        status=PeriodCancellation.RUNNING,
+        sign_up_count=sign_up_count,
+        date_updated=timezone.now(),
+    )
+
+    # Students can sign up for each period once, so this many students have at most
+    # batch_size sign-ups in the range.
+    students_per_batch = max(1, batch_size // max(1, periods.count()))
+    students = signups.order_by("student").values_list("student", flat=True).distinct()
+    today = timezone.localdate(timezone.now())
+
+    while student_ids := list(students[:students_per_batch]):
+        with transaction.atomic():
+            batch = ClassPeriodSignUp.objects.filter(
+                pk__in=list(
+                    signups.filter(student__in=student_ids).values_list("pk", flat=True)
+                )
+            )
+            queue_removal_notices(batch.filter(class_period__date__gte=today))
+            deleted, _ = batch.delete()
+
+        deleted_sign_up_count += deleted
+        PeriodCancellation.objects.filter(pk=cancellation.pk).update(
+            deleted_sign_up_count=deleted_sign_up_count, date_updated=timezone.now()
+        )
+
+    # Students can still sign up while the cancellation runs. Locking each batch of
+    # periods keeps new sign-ups from being created for them, so any sign-ups created
+    # since their students' batches are deleted (and their students notified) along
+    # with the periods instead of being removed by the cascade.
+    for start, end in iter_pk_ranges(periods, batch_size):
+        with transaction.atomic():
+            period_ids = list(
+                periods.filter(pk__gt=start, pk__lte=end)
+                .select_for_update()
+                .values_list("pk", flat=True)
+            )
+            leftover = ClassPeriodSignUp.objects.filter(class_period__in=period_ids)
+            queue_removal_notices(leftover.filter(class_period__date__gte=today))
+            deleted, _ = leftover.delete()
+            ClassPeriod.objects.get_unordered_queryset().filter(
+                pk__in=period_ids
+            ).delete()
+
+        deleted_sign_up_count += deleted
+        sign_up_count += deleted
+        PeriodCancellation.objects.filter(pk=cancellation.pk).update(
+            sign_up_count=sign_up_count,
+            deleted_sign_up_count=deleted_sign_up_count,
+            date_updated=timezone.now(),
+        )
+
+    PeriodCancellation.objects.filter(pk=cancellation.pk).update(
+        status=PeriodCancellation.FINISHED,
+        date_finished=timezone.now(),
+        date_updated=timezone.now(),
+    )
+
+
+def restart_period_cancellation(cancellation):
+    """Runs ``cancellation`` again in the background if it failed or was interrupted
+    (see :attr:`signup.models.PeriodCancellation.can_restart`). Returns whether it was
+    restarted, which only happens once even if several requests try at the same
+    time."""
+    if not cancellation.can_restart:
+        return False
 
+    restarted = PeriodCancellation.objects.filter(
+        pk=cancellation.pk,
+        status=cancellation.status,
+        date_updated=cancellation.date_updated,
+    ).update(
+        status=PeriodCancellation.PENDING,
+        date_finished=None,
+        date_updated=timezone.now(),
+    )
+    if restarted:
+        run_in_background(
+            run_period_cancellation, cancellation.pk, task_name="Cancel Class Periods"
+        )
+    return bool(restarted)
 
-def delete_old_periods_and_signups():
-    """Removes ClassPeriods with a date field that is before/equal to today's date. This
-    will also cause the deletion of the associated ClassPeriodSignUps."""
-    ClassPeriod.objects.get_unordered_queryset().filter(
-        date__lte=timezone.now()
-    ).delete()
+
+def run_period_cancellation(cancellation_id):
+    """Runs the :class:`PeriodCancellation` with the given id, marking it as failed if
+    an error occurs."""
+    cancellation = PeriodCancellation.objects.get(pk=cancellation_id)
+    try:
+        cancel_class_periods(cancellation)
+    except Exception:
+        PeriodCancellation.objects.filter(pk=cancellation_id).update(
+            status=PeriodCancellation.FAILED, date_finished=timezone.now()
+        )
+        raise
+
+
+def start_spreadsheet_export(query, requested_by=None):
+    """Returns a :class:`SpreadsheetExport` of the sign-ups matching the normalized
+    ``query`` (see :func:`signup.faculty.exports.normalize_query`). If the same sign-ups
+    were recently exported or are being exported, that export is returned instead of
+    starting a new one in the background."""
+    cache_key = get_cache_key(query)
+    recent = timezone.now() - timedelta(seconds=settings.SPREADSHEET_EXPORT_MAX_AGE)
+    existing = (
+        SpreadsheetExport.objects.filter(cache_key=cache_key, date_requested__gt=recent)
+        .exclude(status=SpreadsheetExport.FAILED)
+        .order_by("-date_requested")
+        .first()
+    )
+    if existing is not None and (not existing.is_done or is_cached(cache_key)):
+        return existing
+
+    export = SpreadsheetExport.objects.create(
+        query=query, cache_key=cache_key, requested_by=requested_by
+    )
+    run_in_background(run_spreadsheet_export, export.pk, task_name="Export Sign-Ups")
+    return export
+
+
+def export_spreadsheet(export):
+    """Writes the spreadsheet of ``export`` to its cache file, updating its progress
+    along the way. The spreadsheet is written to a temporary file that replaces the
+    cache file once it is complete, so a partial spreadsheet is never downloaded."""
+    signups = filter_signups(export.query)
+    row_count = signups.count()
+    SpreadsheetExport.objects.filter(pk=export.pk).update(
+        status=SpreadsheetExport.RUNNING, row_count=row_count
+    )
+
+    delete_expired_exports()
+    path = get_cache_path(export.cache_key)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    with NamedTemporaryFile(dir=path.parent, suffix=".tmp", delete=False) as file:
+        try:
+            generate_spreadsheet(
+                signups,
+                file,
+                progress=lambda count: SpreadsheetExport.objects.filter(
+                    pk=export.pk
+                ).update(exported_row_count=count),
+            )
+        except BaseException:
+            os.remove(file.name)
+            raise
+    os.replace(file.name, path)
+
+    SpreadsheetExport.objects.filter(pk=export.pk).update(
+        status=SpreadsheetExport.FINISHED,
+        exported_row_count=row_count,
+        date_finished=timezone.now(),
+    )
+
+
+def run_spreadsheet_export(export_id):
+    """Runs the :class:`SpreadsheetExport` with the given id, marking it as failed if
+    an error occurs."""
+    export = SpreadsheetExport.objects.get(pk=export_id)
+    try:
+        export_spreadsheet(export)
+    except Exception:
+        SpreadsheetExport.objects.filter(pk=export_id).update(
+            status=SpreadsheetExport.FAILED, date_finished=timezone.now()
+        )
+        raise
+
+
+def mark_closed(start_date, end_date, description=""):
+    """Adds every weekday between ``start_date`` and ``end_date`` to the closed days so
+    that schedule templates won't recreate their class periods."""
+    ClosedDay.objects.bulk_create(
+        (
+            ClosedDay(date=date, description=description)
+            for date in date_range(start_date, end_date)
+            if date.weekday() < 5
+        ),
+        ignore_conflicts=True,
+    )
+
+
+def _run_in_thread(function, *args):
+    try:
+        function(*args)
+    finally:
+        # Each thread gets its own database connection, which wouldn't be closed
+        # otherwise.
+        connection.close()
+
+
+def run_in_background(function, *args, task_name=None):
+    """Runs ``function(*args)`` once the current transaction is committed. If Celery is
+    enabled, the Celery task named ``task_name`` (which should call the same function)
+    is sent instead. Otherwise, the function runs in a separate thread."""
+
+    def start():
+        if settings.CELERY_ENABLED and task_name:
+            # pylint: disable=import-outside-toplevel
+            from celery import current_app  # type: ignore
+
+            current_app.send_task(task_name, args=args)
+        else:
+            Thread(target=_run_in_thread, args=(function, *args), daemon=True).start()
+
+    transaction.on_commit(start)
+
+
+def queue_emails(messages):
+    """Saves ``messages`` (in the format used by ``send_mass_mail()``) to the outbox
+    and sends them in the background once the current transaction is committed, so
+    that they are only sent if the transaction succeeds and the request doesn't wait for
+    the mail server. Returns the number of emails queued."""
+    emails = OutboxEmail.objects.bulk_create(
+        (
+            OutboxEmail(
+                subject=subject,
+                body=body,
+                from_email=from_email or "",
+                recipient=recipient,
+            )
+            for subject, body, from_email, recipients in messages
+            for recipient in recipients
+        ),
+        batch_size=500,
+    )
+    if emails:
+        run_in_background(send_outbox_emails, task_name="Send Outbox Emails")
+    return len(emails)
+
+
+def queue_removal_notices(signups):
+    """Queues an email to each student with a sign-up in ``signups`` (see
+    :func:`signup.faculty.notifications.iter_removal_notices`)."""
+    return queue_emails(iter_removal_notices(signups))
 
 
 # Makes Celery functionality optional.
@@ -19,5 +410,18 @@ try:
     def delete_old_periods_and_signups_task():
         delete_old_periods_and_signups()
 
+    @shared_task(name="Cancel Class Periods")
+    def run_period_cancellation_task(cancellation_id):
+        run_period_cancellation(cancellation_id)
+
+    @shared_task(name="Export Sign-Ups")
+    def run_spreadsheet_export_task(export_id):
+        run_spreadsheet_export(export_id)
+
+    # Can also be scheduled to run periodically so that failed emails are retried.
+    @shared_task(name="Send Outbox Emails")
+    def send_outbox_emails_task():
+        send_outbox_emails()
+
 except ImportError:
     pass
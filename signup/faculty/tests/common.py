@@ -1,3 +1,7 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from django.test import override_settings
 from django.utils import timezone
 
 
@@ -5,3 +9,18 @@ def convert_datetime(datetime_obj):
     """Converts datetime object into a form similar to the one used by Django REST
     Framework when it serializes datetime objects."""
     return str(timezone.localtime(datetime_obj)).replace(" ", "T")
+
+
+class TemporaryArchiveDirMixin:
+    """Archives class periods and sign-ups (see :mod:`signup.faculty.archives`) to a
+    temporary directory during each test."""
+
+    def setUp(self):
+        super().setUp()
+        directory = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.archive_dir = Path(directory.name)
+
+        settings_override = override_settings(SIGN_UP_ARCHIVE_DIR=self.archive_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
@@ -1,13 +1,23 @@
+import csv
+import json
+from base64 import urlsafe_b64encode
 from datetime import datetime, timedelta
-from io import BytesIO
+from io import BytesIO, StringIO
+from unittest.mock import patch
 
+from asgiref.sync import sync_to_async
+from constance.test import override_config
 from django.core import mail
+from django.db import DatabaseError, connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 from openpyxl import load_workbook
 from rest_framework.test import APIClient, APITestCase
 
+from signup.faculty.api.views import ClassPeriodSignUpViewSet
+from signup.faculty.notifications import send_outbox_emails
 from signup.faculty.tests.common import convert_datetime
 from signup.faculty.tests.test_spreadsheets import (
     CommonTestLogicMixin as SpreadsheetTestLogicMixin,
@@ -15,9 +25,14 @@ from signup.faculty.tests.test_spreadsheets import (
 from signup.models import (
     ClassPeriod,
     ClassPeriodSignUp,
+    ClassPeriodSignUpQuerySet,
     LibraryFacultyMember,
+    OutboxEmail,
+    SignUpDateVersion,
+    SignUpTombstone,
     Student,
     StudentInfo,
+    User,
 )
 
 
@@ -238,7 +253,8 @@ class TestClassPeriodSignUpDetailAPIView(CommonTestLogicMixin, APITestCase):
 
     def test_updating_signup(self):
         """Tests updating info on a single ClassPeriodSignUp by performing a PATCH
-        request on ``api-signups-detail``. Also tests that only writable fields are updated."""
+        request on ``api-signups-detail``. Also tests that only writable fields are updated.
+        """
         # Attempts to change both a writable field ("attendance_confirmed") and a
         # read-only field ("reason") for the first ClassPeriodSignUp.
         response = self.client.patch(
@@ -275,6 +291,10 @@ class TestClassPeriodSignUpDetailAPIView(CommonTestLogicMixin, APITestCase):
         response = self.client.delete(reverse("api-signups-detail", kwargs={"pk": "1"}))
         self.assertEqual(response.status_code, 204)
 
+        # Emails are queued and sent in the background.
+        self.assertEqual(len(mail.outbox), 0)
+        send_outbox_emails()
+
         # Checks that an email has been sent to the student who signed up.
         self.assertEqual(len(mail.outbox), 1)
         self.assertEqual(mail.outbox[0].subject, "Media Center Sign-Up Removal")
@@ -382,6 +402,7 @@ class TestClassPeriodSignUpDetailAPIView(CommonTestLogicMixin, APITestCase):
         self.assertEqual(remaining.count(), 1)
 
         # Ensures that two emails were sent because of the deleted signups.
+        send_outbox_emails()
         self.assertEqual(len(mail.outbox), 2)
 
         # Verifies the contents of the first email.
@@ -401,6 +422,80 @@ class TestClassPeriodSignUpDetailAPIView(CommonTestLogicMixin, APITestCase):
         )
 
 
+@override_config(MAX_PERIOD_NUMBER=3)
+class TestClassPeriodPlanPreviewView(CommonTestLogicMixin, APITestCase):
+    """Tests :class:`signup.faculty.api.views.ClassPeriodPlanPreviewView`."""
+
+    def test_accessing_as_student(self):
+        """Tests that students will get an HTTP 403 error."""
+        client = APIClient()
+        client.force_login(self.student1)
+
+        response = client.post(reverse("api-periods-preview"), {})
+        self.assertEqual(response.status_code, 403)
+
+    def test_preview(self):
+        """Tests that the preview counts the periods that would be created, updated,
+        or left unchanged on each date, along with the conflicts, without saving
+        anything."""
+        today = self.now.date()
+        tomorrow = today + timedelta(days=1)
+        ClassPeriod.objects.create(date=today, number=2, max_student_count=5)
+
+        response = self.client.post(
+            reverse("api-periods-preview"),
+            {
+                "start_date": str(today),
+                "end_date": str(tomorrow),
+                "period_1": "1",
+                "period_2": "5",
+                "period_3": "3",
+            },
+        )
+        self.assertEqual(response.status_code, 200)
+
+        # Period 1 today has two sign-ups, which is more than the new maximum of one.
+        self.assertDictEqual(
+            response.data,
+            {
+                "totals": {
+                    "created": 4,
+                    "updated": 0,
+                    "unchanged": 1,
+                    "conflicts": 1,
+                    "signed_up": 2,
+                },
+                "dates": [
+                    {
+                        "date": today,
+                        "created": 1,
+                        "updated": 0,
+                        "unchanged": 1,
+                        "conflicts": 1,
+                        "signed_up": 2,
+                    },
+                    {
+                        "date": tomorrow,
+                        "created": 3,
+                        "updated": 0,
+                        "unchanged": 0,
+                        "conflicts": 0,
+                        "signed_up": 0,
+                    },
+                ],
+            },
+        )
+
+        # Checks that nothing was saved.
+        self.assertEqual(ClassPeriod.objects.count(), 2)
+
+    def test_invalid_data(self):
+        """Tests that invalid form data results in an HTTP 400 error."""
+        response = self.client.post(reverse("api-periods-preview"), {"period_1": "1"})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("start_date", response.data)
+
+
 class TestSpreadsheetView(SpreadsheetTestLogicMixin, TestCase):
     """Tests the custom action for generating a spreadsheet on
     :class:`signup.faculty.api.views.ClassPeriodSignUpViewSet`."""
@@ -408,10 +503,10 @@ class TestSpreadsheetView(SpreadsheetTestLogicMixin, TestCase):
     def setUp(self):
         super().setUp()
 
-        library_faculty_member = LibraryFacultyMember.objects.create_user(
+        self.library_faculty_member = LibraryFacultyMember.objects.create_user(
             email="faculty@myhchs.org", password="12345"
         )
-        self.client.force_login(library_faculty_member)
+        self.client.force_login(self.library_faculty_member)
 
     def test_generate_spreadsheet_full(self):
         """Tests that the HTTP response details are correct. Also tests that the
@@ -426,7 +521,7 @@ class TestSpreadsheetView(SpreadsheetTestLogicMixin, TestCase):
         self.assertTrue("attachment" in response["Content-Disposition"])
 
         # Loads workbook from response.
-        with BytesIO(response.content) as bytes_io:
+        with BytesIO(response.getvalue()) as bytes_io:
             workbook = load_workbook(bytes_io)
 
         # Checks that the workbook only contains one sheet.
@@ -461,9 +556,11 @@ class TestSpreadsheetView(SpreadsheetTestLogicMixin, TestCase):
         second_row_values = [cell.value for cell in rows[1]]
         # Removes nanosecond and microsecond precision.
         second_row_values = [
-            value.replace(second=int(value.second), microsecond=0)
-            if isinstance(value, datetime)
-            else value
+            (
+                value.replace(second=int(value.second), microsecond=0)
+                if isinstance(value, datetime)
+                else value
+            )
             for value in second_row_values
         ]
 
@@ -487,9 +584,11 @@ class TestSpreadsheetView(SpreadsheetTestLogicMixin, TestCase):
         third_row_values = [cell.value for cell in rows[2]]
         # Removes nanosecond and microsecond precision.
         third_row_values = [
-            value.replace(second=int(value.second), microsecond=0)
-            if isinstance(value, datetime)
-            else value
+            (
+                value.replace(second=int(value.second), microsecond=0)
+                if isinstance(value, datetime)
+                else value
+            )
             for value in third_row_values
         ]
 
@@ -510,6 +609,145 @@ class TestSpreadsheetView(SpreadsheetTestLogicMixin, TestCase):
             ],
         )
 
+    def test_csv(self):
+        """Tests exporting the sign-ups as CSV with the same columns as the
+        spreadsheet."""
+        response = self.client.get(
+            reverse("api-signups-generate-spreadsheet")
+            + f"?class_period__date={self.now.strftime('%Y-%m-%d')}&format=csv"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        self.assertIn('.csv"', response["Content-Disposition"])
+
+        rows = list(csv.reader(StringIO(response.getvalue().decode())))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0][2], "Student Name")
+        self.assertListEqual(
+            rows[1],
+            [
+                self.now.strftime("%Y-%m-%d"),
+                "1",
+                "Student1",
+                "123456",
+                "lunch",
+                str(timezone.localtime(self.now).replace(tzinfo=None)),
+                "True",
+                str(timezone.localtime(self.now).replace(tzinfo=None)),
+            ],
+        )
+
+    def test_json_lines(self):
+        """Tests exporting the sign-ups as JSON Lines."""
+        response = self.client.get(
+            reverse("api-signups-generate-spreadsheet")
+            + f"?class_period__date={self.now.strftime('%Y-%m-%d')}&format=jsonl"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/jsonl; charset=utf-8")
+
+        lines = [json.loads(line) for line in response.getvalue().splitlines()]
+        self.assertEqual(len(lines), 2)
+        self.assertDictEqual(
+            lines[1],
+            {
+                "date": self.now.strftime("%Y-%m-%d"),
+                "period_number": 2,
+                "student_name": "Student2",
+                "student_id": None,
+                "reason": "study hall",
+                "date_signed_up": timezone.localtime(self.now)
+                .replace(tzinfo=None)
+                .isoformat(),
+                "attendance_confirmed": True,
+                "date_attendance_confirmed": timezone.localtime(self.now)
+                .replace(tzinfo=None)
+                .isoformat(),
+            },
+        )
+
+    async def test_streaming_with_asgi(self):
+        """Tests that CSV and JSON Lines exports are streamed asynchronously with ASGI,
+        since Django reads synchronous streaming responses into memory before sending
+        them."""
+        await self.async_client.aforce_login(self.library_faculty_member)
+
+        for export_format in ["csv", "jsonl"]:
+            with self.subTest(format=export_format):
+                response = await self.async_client.get(
+                    reverse("api-signups-generate-spreadsheet")
+                    + f"?class_period__date={self.now.strftime('%Y-%m-%d')}"
+                    + f"&format={export_format}"
+                )
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(response.is_async)
+
+                chunks = [chunk async for chunk in response.streaming_content]
+                self.assertIn(b"Student1", b"".join(chunks))
+
+    async def test_spreadsheet_streaming_with_asgi(self):
+        """Tests that the Excel and analytics spreadsheets are streamed from their
+        temporary files asynchronously with ASGI."""
+        await self.async_client.aforce_login(self.library_faculty_member)
+
+        query = f"?class_period__date={self.now.strftime('%Y-%m-%d')}"
+        for url in [
+            reverse("api-signups-generate-spreadsheet") + query,
+            reverse("api-signups-analytics") + query,
+        ]:
+            with self.subTest(url=url):
+                response = await self.async_client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(response.is_async)
+
+                chunks = [chunk async for chunk in response.streaming_content]
+                await sync_to_async(response.close)()
+                content = b"".join(chunks)
+                self.assertEqual(int(response["Content-Length"]), len(content))
+                with BytesIO(content) as bytes_io:
+                    workbook = load_workbook(bytes_io)
+                self.assertEqual(workbook.worksheets[0].cell(2, 3).value, "Student1")
+
+    def test_analytics(self):
+        """Tests that the analytics spreadsheet summarizes the sign-ups in a range of
+        dates."""
+        today = self.now.date()
+        ClassPeriod.objects.create(
+            date=today - timedelta(days=1), number=1, max_student_count=10
+        )
+        # Class periods outside of the range are left out.
+        ClassPeriod.objects.create(
+            date=today + timedelta(days=1), number=1, max_student_count=10
+        )
+        response = self.client.get(
+            reverse("api-signups-analytics")
+            + f"?class_period__date__gte={today - timedelta(days=3)}"
+            + f"&class_period__date__lte={today}"
+        )
+        self.assertEqual(response["Content-Type"], "application/vnd.ms-excel")
+        self.assertIn("analytics-", response["Content-Disposition"])
+
+        with BytesIO(response.getvalue()) as bytes_io:
+            workbook = load_workbook(bytes_io)
+        self.assertEqual(len(workbook.worksheets), 5)
+        self.assertEqual(list(workbook["Daily Totals"].values)[1][1], 2)
+
+        # Class periods without sign-ups in the range have a fill rate of 0, even on
+        # days without any sign-ups.
+        self.assertListEqual(
+            [row[1:] for row in workbook["Period Fill Rates"].values][1:],
+            [(1, 0, 10, 0), (1, 1, 10, 0.1), (2, 1, 10, 0.1)],
+        )
+
+        # Sign-ups after the end of the range are left out.
+        response = self.client.get(
+            reverse("api-signups-analytics")
+            + f"?class_period__date__lte={today - timedelta(days=1)}"
+        )
+        with BytesIO(response.getvalue()) as bytes_io:
+            workbook = load_workbook(bytes_io)
+        self.assertEqual(len(list(workbook["Daily Totals"].values)), 1)
+
     def test_generate_spreadsheet_empty(self):
         """Tests that the HTTP response details are correct. Also tests that the
         generated spreadsheet will contain only one row (the headings) when there are no
@@ -527,7 +765,7 @@ class TestSpreadsheetView(SpreadsheetTestLogicMixin, TestCase):
         self.assertTrue("attachment" in response["Content-Disposition"])
 
         # Loads workbook from response.
-        with BytesIO(response.content) as bytes_io:
+        with BytesIO(response.getvalue()) as bytes_io:
             workbook = load_workbook(bytes_io)
 
         # Checks that the workbook only contains one sheet.
@@ -554,3 +792,774 @@ class TestSpreadsheetView(SpreadsheetTestLogicMixin, TestCase):
                 "Date Attendance Confirmed",
             ],
         )
+
+
+class TestQueryCounts(CommonTestLogicMixin, APITestCase):
+    """Checks that the number of queries used by
+    :class:`signup.faculty.api.views.ClassPeriodSignUpViewSet` doesn't depend on the
+    number of sign-ups."""
+
+    def add_signups(self, count):
+        """Adds ``count`` sign-ups (each for a new student) to ``self.period``."""
+        for i in range(count):
+            student = Student.objects.create_user(
+                email=f"extra{i}@myhchs.org", name=f"Extra{i}"
+            )
+            StudentInfo.objects.create(student=student, id=f"9{i:05}")
+            ClassPeriodSignUp.objects.create(
+                student=student,
+                class_period=self.period,
+                reason=ClassPeriodSignUp.LUNCH,
+            )
+
+    def assertConstantQueries(self, num, url):
+        """Checks that a GET request to ``url`` uses ``num`` queries, both before and
+        after more sign-ups are added."""
+        # pylint: disable=invalid-name
+        with self.assertNumQueries(num):
+            self.client.get(url)
+
+        self.add_signups(20)
+
+        with self.assertNumQueries(num):
+            self.client.get(url)
+
+    def test_list(self):
+        """Tests listing the sign-ups for a day. One of the queries fetches the
+        date's version for the ETag."""
+        self.assertConstantQueries(
+            4,
+            reverse("api-signups-list")
+            + "?class_period__date="
+            + self.now.strftime("%Y-%m-%d"),
+        )
+
+    def test_retrieve(self):
+        """Tests retrieving a single sign-up."""
+        with self.assertNumQueries(3):
+            self.client.get(
+                reverse("api-signups-detail", kwargs={"pk": self.signup1.id})
+            )
+
+    def test_spreadsheet(self):
+        """Tests generating a spreadsheet of every sign-up."""
+        self.assertConstantQueries(3, reverse("api-signups-generate-spreadsheet"))
+
+
+class TestKeysetPagination(CommonTestLogicMixin, APITestCase):
+    """Tests :class:`signup.faculty.api.pagination.KeysetPagination` on
+    :class:`signup.faculty.api.views.ClassPeriodSignUpViewSet`."""
+
+    def setUp(self):
+        super().setUp()
+
+        # Adds sign-ups that share values for the order keys. Some have no student ID
+        # or attendance confirmation date.
+        for i in range(10):
+            student = Student.objects.create_user(
+                email=f"extra{i}@myhchs.org", name=f"Extra{i % 3}"
+            )
+            if i % 2:
+                StudentInfo.objects.create(student=student, id=f"9{i:05}")
+            ClassPeriodSignUp.objects.create(
+                student=student,
+                class_period=self.period,
+                reason=ClassPeriodSignUp.LUNCH,
+                date_attendance_confirmed=self.now if i % 4 else None,
+            )
+
+    def get_all_pages(self, ordering, page_size=3):
+        """Follows the ``next`` links until every page has been fetched and returns the
+        IDs of the sign-ups in the order they were received."""
+        url = (
+            reverse("api-signups-list")
+            + f"?class_period__date={self.now.strftime('%Y-%m-%d')}"
+            + f"&ordering={ordering}&page_size={page_size}"
+        )
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.data["results"]), page_size)
+            ids += [signup["id"] for signup in response.data["results"]]
+            url = response.data["next"]
+        return ids
+
+    def test_orderings(self):
+        """Tests that every sign-up is received exactly once, in order, with ascending
+        and descending orderings on fields with duplicate and NULL values."""
+        signups = list(
+            ClassPeriodSignUp.objects.values_list(
+                "id", "reason", "student__name", "date_attendance_confirmed"
+            )
+        )
+
+        for ordering, index in [
+            ("reason", 1),
+            ("-reason", 1),
+            ("student__name", 2),
+            ("-student__name", 2),
+            ("date_attendance_confirmed", 3),
+            ("-date_attendance_confirmed", 3),
+        ]:
+            with self.subTest(ordering=ordering):
+                descending = ordering.startswith("-")
+                # NULL values come first in ascending order and last in descending
+                # order. Ties are sorted by ID in the same direction.
+                expected = sorted(
+                    signups,
+                    key=lambda signup, index=index: (
+                        signup[index] is not None,
+                        signup[index] or "",
+                        signup[0],
+                    ),
+                    reverse=descending,
+                )
+
+                self.assertListEqual(
+                    self.get_all_pages(ordering),
+                    [signup[0] for signup in expected],
+                )
+
+    def test_page_size(self):
+        """Tests that the page size is capped and that results are only paginated if
+        requested."""
+        response = self.client.get(reverse("api-signups-list") + "?page_size=100000")
+        self.assertEqual(len(response.data["results"]), 12)
+        self.assertIsNone(response.data["next"])
+
+        response = self.client.get(reverse("api-signups-list"))
+        self.assertEqual(len(response.data), 12)
+
+    def test_invalid_cursor(self):
+        """Tests that an invalid cursor results in an HTTP 404 error."""
+        response = self.client.get(reverse("api-signups-list") + "?cursor=invalid")
+        self.assertEqual(response.status_code, 404)
+
+    def test_tampered_cursor(self):
+        """Tests that a well-formed cursor with a value of the wrong type for the order
+        key results in an HTTP 404 error."""
+        for ordering, value in [
+            ("date_attendance_confirmed", "not a date"),
+            ("-date_attendance_confirmed", ["2022-01-01"]),
+            ("id", "not a number"),
+        ]:
+            with self.subTest(ordering=ordering, value=value):
+                cursor = urlsafe_b64encode(json.dumps([value, 1]).encode()).decode()
+                response = self.client.get(
+                    reverse("api-signups-list")
+                    + f"?ordering={ordering}&cursor={cursor}"
+                )
+                self.assertEqual(response.status_code, 404)
+
+    def test_query_count(self):
+        """Tests that fetching a page uses the same number of queries no matter how
+        far into the results it is."""
+        url = reverse("api-signups-list") + "?page_size=2"
+        with self.assertNumQueries(4):
+            response = self.client.get(url)
+
+        with self.assertNumQueries(4):
+            self.client.get(response.data["next"])
+
+
+class TestConditionalRequests(CommonTestLogicMixin, APITestCase):
+    """Tests the ETags used by the list and spreadsheet endpoints of
+    :class:`signup.faculty.api.views.ClassPeriodSignUpViewSet`."""
+
+    def get_url(self, name, ordering="student__name"):
+        return (
+            reverse(name)
+            + f"?class_period__date={self.now.strftime('%Y-%m-%d')}&ordering={ordering}"
+        )
+
+    def test_not_modified(self):
+        """Tests that a request with a matching ETag gets HTTP 304 without fetching the
+        sign-ups, and that changing a sign-up or the URL changes the ETag."""
+        for name in ("api-signups-list", "api-signups-generate-spreadsheet"):
+            with self.subTest(name=name):
+                url = self.get_url(name)
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                etag = response.headers["ETag"]
+
+                # Only the session, user, and version are fetched.
+                with self.assertNumQueries(3):
+                    response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response.headers["ETag"], etag)
+
+                response = self.client.get(
+                    self.get_url(name, "-student__name"), HTTP_IF_NONE_MATCH=etag
+                )
+                self.assertEqual(response.status_code, 200)
+
+                self.signup1.attendance_confirmed = not (
+                    self.signup1.attendance_confirmed
+                )
+                self.signup1.save()
+
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+                self.assertNotEqual(response.headers["ETag"], etag)
+
+    def test_without_date(self):
+        """Tests that no ETag is used if the sign-ups aren't filtered by date."""
+        response = self.client.get(reverse("api-signups-list"))
+        self.assertNotIn("ETag", response.headers)
+
+    def test_versions(self):
+        """Tests that creating, updating, and deleting sign-ups or class periods
+        changes the version of their date."""
+        signup_date = self.period.date
+
+        def get_version():
+            return SignUpDateVersion.objects.get_version(signup_date)
+
+        version = get_version()
+        other_date = signup_date + timedelta(days=1)
+        other_period = ClassPeriod.objects.create(
+            date=other_date, number=1, max_student_count=10
+        )
+        ClassPeriodSignUp.objects.create(
+            student=self.student1,
+            class_period=other_period,
+            reason=ClassPeriodSignUp.LUNCH,
+        )
+        self.assertEqual(get_version(), version)
+        self.assertEqual(SignUpDateVersion.objects.get_version(other_date), 1)
+
+        for change in [
+            lambda: ClassPeriodSignUp.objects.filter(pk=self.signup1.pk).update(
+                attendance_confirmed=True
+            ),
+            self.signup1.delete,
+            lambda: ClassPeriodSignUp.objects.filter(pk=self.signup2.pk).delete(),
+            lambda: ClassPeriod.objects.filter(pk=self.period.pk).delete(),
+        ]:
+            change()
+            self.assertGreater(get_version(), version)
+            version = get_version()
+
+
+class TestChanges(CommonTestLogicMixin, APITestCase):
+    """Tests the ``changes`` action of
+    :class:`signup.faculty.api.views.ClassPeriodSignUpViewSet`."""
+
+    def get_changes(self, since, filters=""):
+        return self.client.get(
+            reverse("api-signups-changes")
+            + f"?class_period__date={self.now.strftime('%Y-%m-%d')}&since={since}"
+            + filters
+        )
+
+    def get_token(self):
+        response = self.client.get(
+            reverse("api-signups-list")
+            + f"?class_period__date={self.now.strftime('%Y-%m-%d')}"
+        )
+        return response.headers["X-Sync-Token"]
+
+    def test_changes(self):
+        """Tests that created, updated, and deleted sign-ups are returned, and that the
+        new token only returns later changes."""
+        token = self.get_token()
+
+        response = self.get_changes(token)
+        self.assertDictEqual(
+            response.data,
+            {"token": token, "reset": False, "changed": [], "removed": []},
+        )
+
+        student3 = Student.objects.create_user(email="student3@myhchs.org")
+        signup3 = ClassPeriodSignUp.objects.create(
+            student=student3, class_period=self.period, reason=ClassPeriodSignUp.LUNCH
+        )
+        self.client.patch(
+            reverse("api-signups-detail", kwargs={"pk": self.signup1.id}),
+            {"attendance_confirmed": True},
+        )
+        self.client.delete(
+            reverse("api-signups-detail", kwargs={"pk": self.signup2.id})
+        )
+
+        # Fetches the session, user, token, changed IDs, changed sign-ups, and
+        # tombstones.
+        with self.assertNumQueries(6):
+            response = self.get_changes(token, "&ordering=id")
+
+        self.assertFalse(response.data["reset"])
+        self.assertListEqual(
+            [signup["id"] for signup in response.data["changed"]],
+            [self.signup1.id, signup3.id],
+        )
+        self.assertTrue(response.data["changed"][0]["attendance_confirmed"])
+        self.assertListEqual(response.data["removed"], [self.signup2.id])
+
+        response = self.get_changes(response.data["token"])
+        self.assertListEqual(response.data["changed"], [])
+        self.assertListEqual(response.data["removed"], [])
+
+    def test_student_changes(self):
+        """Tests that changing a student's name or student ID returns their sign-ups
+        as changed, and that deleting a student returns them as removed."""
+        token = self.get_token()
+        self.student1.name = "Renamed"
+        self.student1.save()
+
+        response = self.get_changes(token)
+        self.assertListEqual(
+            [signup["id"] for signup in response.data["changed"]], [self.signup1.id]
+        )
+
+        token = response.data["token"]
+        info = StudentInfo.objects.get(student=self.student2)
+        info.id = "111111"
+        info.save()
+
+        response = self.get_changes(token)
+        self.assertListEqual(
+            [signup["id"] for signup in response.data["changed"]], [self.signup2.id]
+        )
+
+        token = response.data["token"]
+        User.objects.get(pk=self.student1.pk).delete()
+
+        response = self.get_changes(token)
+        self.assertListEqual(response.data["changed"], [])
+        self.assertListEqual(response.data["removed"], [self.signup1.id])
+
+    def test_filters(self):
+        """Tests that changed sign-ups that no longer match the filters are returned as
+        removed."""
+        token = self.get_token()
+        ClassPeriodSignUp.objects.filter(pk=self.signup1.pk).update(
+            attendance_confirmed=True
+        )
+
+        response = self.get_changes(token, "&attendance_confirmed=false")
+        self.assertListEqual(response.data["changed"], [])
+        self.assertListEqual(response.data["removed"], [self.signup1.id])
+
+    def test_reset(self):
+        """Tests that deleting a class period requires clients to start over."""
+        token = self.get_token()
+        self.period.delete()
+
+        response = self.get_changes(token)
+        self.assertTrue(response.data["reset"])
+        self.assertFalse(SignUpTombstone.objects.exists())
+
+    def test_missing_token(self):
+        """Tests that an HTTP 400 error is returned without a valid token."""
+        response = self.client.get(reverse("api-signups-changes"))
+        self.assertEqual(response.status_code, 400)
+
+        response = self.get_changes("invalid")
+        self.assertEqual(response.status_code, 400)
+
+
+class TestConfirmAttendance(CommonTestLogicMixin, APITestCase):
+    """Tests the ``confirm_attendance`` action of
+    :class:`signup.faculty.api.views.ClassPeriodSignUpViewSet`."""
+
+    def test_confirming_by_id(self):
+        """Tests confirming and unconfirming sign-ups by ID."""
+        response = self.client.post(
+            reverse("api-signups-confirm-attendance"),
+            {"id": [self.signup1.id]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 1)
+        self.assertTrue(response.data[0]["attendance_confirmed"])
+        self.assertIsNotNone(response.data[0]["date_attendance_confirmed"])
+
+        self.signup1.refresh_from_db()
+        self.signup2.refresh_from_db()
+        self.assertTrue(self.signup1.attendance_confirmed)
+        self.assertFalse(self.signup2.attendance_confirmed)
+        date_confirmed = self.signup1.date_attendance_confirmed
+
+        # Sign-ups that were already confirmed keep their confirmation date.
+        response = self.client.post(
+            reverse("api-signups-confirm-attendance"),
+            {"id": [self.signup1.id, self.signup2.id]},
+            format="json",
+        )
+        self.assertEqual(len(response.data), 2)
+        self.signup1.refresh_from_db()
+        self.assertEqual(self.signup1.date_attendance_confirmed, date_confirmed)
+
+        response = self.client.post(
+            reverse("api-signups-confirm-attendance"),
+            {"id": [self.signup1.id], "attendance_confirmed": False},
+            format="json",
+        )
+        self.signup1.refresh_from_db()
+        self.assertFalse(self.signup1.attendance_confirmed)
+        self.assertIsNone(self.signup1.date_attendance_confirmed)
+
+    def test_confirming_by_filter(self):
+        """Tests confirming every sign-up matching the filters, and that a date is
+        required if no IDs are given."""
+        response = self.client.post(reverse("api-signups-confirm-attendance"))
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post(
+            reverse("api-signups-confirm-attendance")
+            + f"?class_period__date={self.now.strftime('%Y-%m-%d')}"
+            + "&attendance_confirmed=false&ordering=-student__name"
+        )
+        self.assertListEqual(
+            [signup["id"] for signup in response.data],
+            [self.signup2.id, self.signup1.id],
+        )
+        self.assertEqual(
+            ClassPeriodSignUp.objects.filter(attendance_confirmed=True).count(), 2
+        )
+
+
+class TestKioskCheckIn(CommonTestLogicMixin, APITestCase):
+    """Tests :class:`signup.faculty.api.views.KioskCheckInView`."""
+
+    def setUp(self):
+        super().setUp()
+        # The period from CommonTestLogicMixin is on the UTC date, which can also be
+        # the local date.
+        self.period.delete()
+        self.today_period = ClassPeriod.objects.create(
+            date=timezone.localdate(self.now), number=3, max_student_count=10
+        )
+        self.today_signup = ClassPeriodSignUp.objects.create(
+            student=self.student1,
+            class_period=self.today_period,
+            reason=ClassPeriodSignUp.STUDY_HALL,
+        )
+
+    def check_in(self, student_id, period):
+        return self.client.post(
+            reverse("api-kiosk-check-in"),
+            {"student_id": student_id, "period": period},
+            format="json",
+        )
+
+    def test_checking_in(self):
+        """Tests checking in a student twice."""
+        response = self.check_in("123456", 3)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["status"], "checked_in")
+        self.assertEqual(response.data["student_name"], "Student1")
+
+        self.today_signup.refresh_from_db()
+        self.assertTrue(self.today_signup.attendance_confirmed)
+        date_confirmed = self.today_signup.date_attendance_confirmed
+        self.assertIsNotNone(date_confirmed)
+
+        response = self.check_in("123456", 3)
+        self.assertEqual(response.data["status"], "already_checked_in")
+        self.today_signup.refresh_from_db()
+        self.assertEqual(self.today_signup.date_attendance_confirmed, date_confirmed)
+
+    def test_concurrent_check_in(self):
+        """Tests that a student who was checked in by another request after their
+        sign-ups were read is reported as already checked in."""
+        update = ClassPeriodSignUpQuerySet.update
+        date_confirmed = self.now - timedelta(minutes=1)
+
+        def check_in_first(queryset, **kwargs):
+            update(
+                ClassPeriodSignUp.objects.filter(pk=self.today_signup.pk),
+                attendance_confirmed=True,
+                date_attendance_confirmed=date_confirmed,
+            )
+            return update(queryset, **kwargs)
+
+        with patch.object(ClassPeriodSignUpQuerySet, "update", check_in_first):
+            response = self.check_in("123456", 3)
+        self.assertEqual(response.data["status"], "already_checked_in")
+
+        self.today_signup.refresh_from_db()
+        self.assertEqual(self.today_signup.date_attendance_confirmed, date_confirmed)
+
+    def test_wrong_period_and_not_signed_up(self):
+        """Tests that students who signed up for another period or didn't sign up
+        are reported with a single query (after the session and user are loaded)."""
+        with self.assertNumQueries(3):
+            response = self.check_in("123456", 4)
+        self.assertEqual(response.data["status"], "wrong_period")
+        self.assertListEqual(response.data["periods"], [3])
+
+        with self.assertNumQueries(3):
+            response = self.check_in("654321", 3)
+        self.assertEqual(response.data["status"], "not_signed_up")
+
+        # Unknown student IDs are treated the same way.
+        response = self.check_in("000000", 3)
+        self.assertEqual(response.data["status"], "not_signed_up")
+
+        self.today_signup.refresh_from_db()
+        self.assertFalse(self.today_signup.attendance_confirmed)
+
+    def test_invalid_input_and_permissions(self):
+        """Tests that invalid input is rejected and that students can't check in."""
+        self.assertEqual(self.check_in("123456", 0).status_code, 400)
+        self.assertEqual(self.check_in("1234567", 3).status_code, 400)
+
+        self.client.force_login(self.student1)
+        self.assertEqual(self.check_in("123456", 3).status_code, 403)
+
+
+class TestDeleteMatching(CommonTestLogicMixin, APITestCase):
+    """Tests the ``delete_matching`` action of
+    :class:`signup.faculty.api.views.ClassPeriodSignUpViewSet`."""
+
+    def setUp(self):
+        super().setUp()
+        self.other_period = ClassPeriod.objects.create(
+            date=self.now.date(), number=2, max_student_count=10
+        )
+        self.signup3 = ClassPeriodSignUp.objects.create(
+            student=self.student1,
+            class_period=self.other_period,
+            reason=ClassPeriodSignUp.STUDY_HALL,
+        )
+        self.version = SignUpDateVersion.objects.get_version(self.now.date())
+
+    def test_deleting_by_filter(self):
+        """Tests that only the sign-ups matching the filters are deleted, in batches,
+        and that each student is emailed once."""
+        url = reverse("api-signups-delete-matching")
+        with patch.object(ClassPeriodSignUpViewSet, "delete_batch_size", 1):
+            response = self.client.post(
+                f"{url}?class_period__date={self.now.date()}&class_period__number=1"
+                f"&version={self.version}"
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertDictEqual(response.data, {"deleted": 2})
+        self.assertListEqual(
+            list(ClassPeriodSignUp.objects.values_list("pk", flat=True)),
+            [self.signup3.pk],
+        )
+        self.assertSetEqual(
+            set(SignUpTombstone.objects.values_list("signup_id", flat=True)),
+            {self.signup1.pk, self.signup2.pk},
+        )
+        send_outbox_emails()
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertSetEqual(
+            {message.to[0] for message in mail.outbox},
+            {"student1@myhchs.org", "student2@myhchs.org"},
+        )
+
+    def test_search_filter(self):
+        """Tests deleting the sign-ups of one student on a date."""
+        url = reverse("api-signups-delete-matching")
+        response = self.client.post(
+            f"{url}?class_period__date={self.now.date()}&search=Student1"
+            f"&version={self.version}"
+        )
+
+        self.assertDictEqual(response.data, {"deleted": 2})
+        self.assertListEqual(
+            list(ClassPeriodSignUp.objects.values_list("pk", flat=True)),
+            [self.signup2.pk],
+        )
+        # Both sign-ups are listed in the same email.
+        send_outbox_emails()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn("following periods", mail.outbox[0].body)
+
+    def test_failed_batch(self):
+        """Tests that each batch's emails are queued in the same transaction as its
+        deletion, so a failed batch neither loses nor sends its emails."""
+        delete = ClassPeriodSignUpQuerySet.delete
+        calls = []
+
+        def fail_second_batch(queryset):
+            calls.append(queryset)
+            if len(calls) == 2:
+                raise DatabaseError
+            return delete(queryset)
+
+        url = reverse("api-signups-delete-matching")
+        with (
+            patch.object(ClassPeriodSignUpViewSet, "delete_batch_size", 1),
+            patch.object(ClassPeriodSignUpQuerySet, "delete", fail_second_batch),
+            self.assertRaises(DatabaseError),
+            self.assertLogs("django.request", "ERROR"),
+        ):
+            self.client.post(
+                f"{url}?class_period__date={self.now.date()}&class_period__number=1"
+                f"&version={self.version}"
+            )
+
+        self.assertListEqual(
+            list(ClassPeriodSignUp.objects.order_by("pk").values_list("pk", flat=True)),
+            [self.signup2.pk, self.signup3.pk],
+        )
+        self.assertListEqual(
+            list(OutboxEmail.objects.values_list("recipient", flat=True)),
+            ["student1@myhchs.org"],
+        )
+
+    def test_date_and_version_required(self):
+        """Tests that nothing is deleted without a date or a version."""
+        url = reverse("api-signups-delete-matching")
+        for query in [
+            f"version={self.version}",
+            f"class_period__date={self.now.date()}",
+            f"class_period__date={self.now.date()}&version=latest",
+        ]:
+            with self.subTest(query=query):
+                response = self.client.post(f"{url}?{query}")
+
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(ClassPeriodSignUp.objects.count(), 3)
+
+    def test_out_of_date_version(self):
+        """Tests that nothing is deleted if a sign-up was created since the client
+        listed the sign-ups."""
+        signup = ClassPeriodSignUp.objects.create(
+            student=self.student2,
+            class_period=self.other_period,
+            reason=ClassPeriodSignUp.STUDY_HALL,
+        )
+
+        url = reverse("api-signups-delete-matching")
+        response = self.client.post(
+            f"{url}?class_period__date={self.now.date()}&version={self.version}"
+        )
+
+        self.assertEqual(response.status_code, 412)
+        self.assertEqual(ClassPeriodSignUp.objects.count(), 4)
+        self.assertTrue(ClassPeriodSignUp.objects.filter(pk=signup.pk).exists())
+        self.assertEqual(OutboxEmail.objects.count(), 0)
+
+    def test_sign_up_during_deletion(self):
+        """Tests that a sign-up created while the batches are being deleted isn't
+        deleted."""
+        delete = ClassPeriodSignUpQuerySet.delete
+        created = []
+
+        def sign_up_after_first_batch(queryset):
+            result = delete(queryset)
+            if not created:
+                created.append(
+                    ClassPeriodSignUp.objects.create(
+                        student=self.student2,
+                        class_period=self.other_period,
+                        reason=ClassPeriodSignUp.STUDY_HALL,
+                    )
+                )
+            return result
+
+        url = reverse("api-signups-delete-matching")
+        with (
+            patch.object(ClassPeriodSignUpViewSet, "delete_batch_size", 1),
+            patch.object(
+                ClassPeriodSignUpQuerySet, "delete", sign_up_after_first_batch
+            ),
+        ):
+            response = self.client.post(
+                f"{url}?class_period__date={self.now.date()}&version={self.version}"
+            )
+
+        self.assertDictEqual(response.data, {"deleted": 3})
+        self.assertListEqual(
+            list(ClassPeriodSignUp.objects.values_list("pk", flat=True)),
+            [created[0].pk],
+        )
+
+
+class TestSparseFieldsets(CommonTestLogicMixin, APITestCase):
+    """Tests the ``fields`` query parameter of
+    :class:`signup.faculty.api.views.ClassPeriodSignUpViewSet`."""
+
+    def get_with_queries(self, url):
+        """Sends a GET request to ``url`` and returns the response along with the SQL
+        of the query that fetched the sign-ups."""
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+        queries = [
+            query["sql"]
+            for query in context.captured_queries
+            if 'FROM "signup_classperiodsignup"' in query["sql"]
+        ]
+        self.assertEqual(len(queries), 1)
+        return response, queries[0]
+
+    def test_list(self):
+        """Tests that only the requested fields (and the ID) are listed, and that the
+        columns and joins for the other fields are skipped."""
+        response, sql = self.get_with_queries(
+            reverse("api-signups-list")
+            + f"?class_period__date={self.now.date()}"
+            + "&ordering=class_period__number&fields=period_number,reason"
+        )
+
+        self.assertListEqual(
+            response.json(),
+            [
+                {"id": 1, "period_number": 1, "reason": "S"},
+                {"id": 2, "period_number": 1, "reason": "S"},
+            ],
+        )
+        self.assertNotIn("date_signed_up", sql)
+        self.assertNotIn('"signup_user"', sql)
+        self.assertNotIn('"signup_studentinfo"', sql)
+
+    def test_all_fields(self):
+        """Tests that every field is listed if the parameter is empty."""
+        response = self.client.get(reverse("api-signups-list") + "?fields=")
+        self.assertEqual(len(response.json()[0]), 8)
+
+    def test_retrieve(self):
+        """Tests that retrieving a sign-up only fetches the requested fields."""
+        response, sql = self.get_with_queries(
+            reverse("api-signups-detail", kwargs={"pk": self.signup1.id})
+            + "?fields=student_name,attendance_confirmed"
+        )
+
+        self.assertDictEqual(
+            response.json(),
+            {"id": 1, "student_name": "Student1", "attendance_confirmed": False},
+        )
+        self.assertNotIn("date_signed_up", sql)
+        self.assertNotIn('"signup_studentinfo"', sql)
+
+    def test_changes(self):
+        response = self.client.get(
+            reverse("api-signups-changes")
+            + f"?class_period__date={self.now.date()}&since=0"
+            + "&fields=attendance_confirmed"
+        )
+        self.assertListEqual(
+            response.json()["changed"],
+            [
+                {"id": 1, "attendance_confirmed": False},
+                {"id": 2, "attendance_confirmed": False},
+            ],
+        )
+
+    def test_unknown_field(self):
+        response = self.client.get(
+            reverse("api-signups-list") + "?fields=student_name,password"
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertListEqual(response.json()["fields"], ["Unknown field: password"])
+
+    def test_update(self):
+        """Tests that updates ignore the parameter, so no input is left out."""
+        response = self.client.patch(
+            reverse("api-signups-detail", kwargs={"pk": self.signup1.id})
+            + "?fields=student_name",
+            {"attendance_confirmed": True},
+        )
+
+        self.assertTrue(response.json()["attendance_confirmed"])
+        self.signup1.refresh_from_db()
+        self.assertTrue(self.signup1.attendance_confirmed)
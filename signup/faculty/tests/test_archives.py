@@ -0,0 +1,264 @@
+from datetime import date
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from signup.faculty.archives import (
+    append_to_archives,
+    get_archive_path,
+    get_school_year,
+    iter_archive_records,
+    list_archives,
+    summarize_archive,
+)
+from signup.faculty.tasks import delete_class_periods
+from signup.faculty.tests.common import TemporaryArchiveDirMixin
+from signup.models import (
+    ClassPeriod,
+    ClassPeriodSignUp,
+    LibraryFacultyMember,
+    Student,
+    StudentInfo,
+)
+
+
+class TestArchives(TemporaryArchiveDirMixin, TestCase):
+    """Tests :mod:`signup.faculty.archives`."""
+
+    def setUp(self):
+        super().setUp()
+        self.students = []
+        for number in range(1, 3):
+            student = Student.objects.create_user(
+                email=f"student{number}@myhchs.org", name=f"Student{number}"
+            )
+            StudentInfo.objects.create(student=student, id=f"{number:06}")
+            self.students.append(student)
+
+        # Two periods in April 2022, one in June 2022 without sign-ups, and one in the
+        # next school year.
+        self.period1 = ClassPeriod.objects.create(
+            date=date(2022, 4, 1), number=1, max_student_count=4
+        )
+        self.period2 = ClassPeriod.objects.create(
+            date=date(2022, 4, 1), number=2, max_student_count=2
+        )
+        ClassPeriod.objects.create(date=date(2022, 6, 1), number=1, max_student_count=2)
+        self.period4 = ClassPeriod.objects.create(
+            date=date(2022, 9, 1), number=1, max_student_count=10
+        )
+
+        self.create_signup(self.students[0], self.period1, ClassPeriodSignUp.LUNCH)
+        self.create_signup(
+            self.students[1],
+            self.period1,
+            ClassPeriodSignUp.STUDY_HALL,
+            attendance_confirmed=True,
+        )
+        self.create_signup(
+            self.students[0],
+            self.period2,
+            ClassPeriodSignUp.STUDY_HALL,
+            attendance_confirmed=True,
+        )
+        self.create_signup(self.students[1], self.period4, ClassPeriodSignUp.LUNCH)
+
+    def create_signup(self, student, period, reason, **kwargs):
+        return ClassPeriodSignUp.objects.create(
+            student=student, class_period=period, reason=reason, **kwargs
+        )
+
+    def archive_all(self, batch_size=1000):
+        return delete_class_periods(
+            ClassPeriod.objects.get_unordered_queryset(),
+            batch_size=batch_size,
+            school_year_end=(7, 1),
+        )
+
+    def test_get_school_year(self):
+        self.assertEqual(get_school_year(date(2022, 7, 1), 7, 1), "2021-2022")
+        self.assertEqual(get_school_year(date(2022, 7, 2), 7, 1), "2022-2023")
+        self.assertEqual(get_school_year(date(2023, 1, 5), 7, 1), "2022-2023")
+
+    def test_archive_by_school_year(self):
+        """Tests that each batch is appended to the archive of its school year."""
+        self.assertEqual(self.archive_all(batch_size=1), (4, 4))
+        self.assertFalse(ClassPeriod.objects.exists())
+        self.assertListEqual(list_archives(), ["2021-2022", "2022-2023"])
+
+        records = list(iter_archive_records("2021-2022"))
+        self.assertEqual(len(records), 6)
+        self.assertDictEqual(
+            records[0],
+            {
+                "type": "signup",
+                "id": records[0]["id"],
+                "period_id": self.period1.pk,
+                "date": "2022-04-01",
+                "period_number": 1,
+                "student_name": "Student1",
+                "student_id": "000001",
+                "reason": ClassPeriodSignUp.LUNCH,
+                "date_signed_up": records[0]["date_signed_up"],
+                "attendance_confirmed": False,
+                "date_attendance_confirmed": None,
+            },
+        )
+        self.assertDictEqual(
+            records[3],
+            {
+                "type": "period",
+                "id": self.period1.pk,
+                "date": "2022-04-01",
+                "period_number": 1,
+                "max_student_count": 4,
+            },
+        )
+        self.assertEqual(len(list(iter_archive_records("2022-2023"))), 2)
+
+    def test_failed_archive(self):
+        """Tests that a batch isn't deleted if it couldn't be archived."""
+        with (
+            patch(
+                "signup.faculty.tasks.append_to_archives", side_effect=OSError
+            ) as append,
+            self.assertRaises(OSError),
+        ):
+            self.archive_all()
+
+        append.assert_called_once()
+        self.assertEqual(ClassPeriodSignUp.objects.count(), 4)
+
+    def test_duplicate_records(self):
+        """Tests that records archived again, such as when committing a batch failed,
+        are only read once."""
+        self.archive_all()
+        records = list(iter_archive_records("2021-2022"))
+        append_to_archives(records, (7, 1))
+
+        self.assertListEqual(list(iter_archive_records("2021-2022")), records)
+
+    def test_missing_archive(self):
+        with self.assertRaises(FileNotFoundError):
+            summarize_archive("2021-2022")
+
+        # Only archives can be read.
+        get_archive_path("2021-2022").write_bytes(b"")
+        with self.assertRaises(FileNotFoundError):
+            list(iter_archive_records("../signups-2021-2022"))
+
+    def test_summarize_archive(self):
+        self.archive_all()
+
+        self.assertListEqual(
+            summarize_archive("2021-2022"),
+            [
+                {
+                    "signups": 3,
+                    "lunch": 1,
+                    "study_hall": 2,
+                    "attendance_confirmed": 2,
+                    "periods": 3,
+                    "max_students": 8,
+                    "attendance_rate": 2 / 3,
+                    "fill_rate": 3 / 8,
+                }
+            ],
+        )
+        self.assertListEqual(
+            [
+                (row["month"], row["signups"], row["periods"])
+                for row in summarize_archive("2021-2022", by="month")
+            ],
+            [("2022-04", 3, 2), ("2022-06", 0, 1)],
+        )
+        self.assertListEqual(
+            [
+                (row["period_number"], row["signups"], row["max_students"])
+                for row in summarize_archive("2021-2022", by="period")
+            ],
+            [(1, 2, 6), (2, 1, 2)],
+        )
+        self.assertListEqual(
+            summarize_archive("2021-2022", by="student"),
+            [
+                {
+                    "student_id": "000001",
+                    "student_name": "Student1",
+                    "signups": 2,
+                    "lunch": 1,
+                    "study_hall": 1,
+                    "attendance_confirmed": 1,
+                    "attendance_rate": 0.5,
+                },
+                {
+                    "student_id": "000002",
+                    "student_name": "Student2",
+                    "signups": 1,
+                    "lunch": 0,
+                    "study_hall": 1,
+                    "attendance_confirmed": 1,
+                    "attendance_rate": 1.0,
+                },
+            ],
+        )
+
+    def test_query_archive_command(self):
+        """Tests :mod:`signup.faculty.management.commands.queryarchive`."""
+        self.archive_all()
+
+        stdout = StringIO()
+        call_command("queryarchive", stdout=stdout)
+        self.assertListEqual(stdout.getvalue().splitlines(), ["2021-2022", "2022-2023"])
+
+        stdout = StringIO()
+        call_command("queryarchive", "2021-2022", "--by", "period", stdout=stdout)
+        self.assertListEqual(
+            stdout.getvalue().splitlines(),
+            [
+                "period_number,signups,lunch,study_hall,attendance_confirmed,periods,"
+                "max_students,attendance_rate,fill_rate",
+                "1,2,1,1,1,2,6,0.5,0.3333333333333333",
+                "2,1,0,1,1,1,2,1.0,0.5",
+            ],
+        )
+
+        with self.assertRaises(CommandError):
+            call_command("queryarchive", "2020-2021", stdout=StringIO())
+
+    def test_api_views(self):
+        """Tests :class:`signup.faculty.api.views.ArchiveListView` and
+        :class:`signup.faculty.api.views.ArchiveSummaryView`."""
+        self.archive_all()
+
+        self.client.force_login(self.students[0])
+        response = self.client.get(reverse("api-archive-list"))
+        self.assertEqual(response.status_code, 403)
+
+        self.client.force_login(
+            LibraryFacultyMember.objects.create_user(
+                email="faculty@myhchs.org", password="12345"
+            )
+        )
+        response = self.client.get(reverse("api-archive-list"))
+        self.assertListEqual(response.json(), ["2021-2022", "2022-2023"])
+
+        url = reverse("api-archive-summary", args=["2022-2023"])
+        response = self.client.get(url + "?by=date")
+        self.assertDictEqual(
+            response.json(),
+            {
+                "school_year": "2022-2023",
+                "by": "date",
+                "rows": summarize_archive("2022-2023", by="date"),
+            },
+        )
+
+        response = self.client.get(url + "?by=teacher")
+        self.assertEqual(response.status_code, 400)
+
+        url = reverse("api-archive-summary", args=["2020-2021"])
+        self.assertEqual(self.client.get(url).status_code, 404)
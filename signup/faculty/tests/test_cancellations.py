@@ -0,0 +1,258 @@
+from datetime import date, timedelta
+from functools import partial
+from unittest.mock import patch
+
+from django.core import mail
+from django.db import DatabaseError
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from signup.faculty import tasks
+from signup.faculty.notifications import send_outbox_emails
+from signup.faculty.tasks import cancel_class_periods, run_period_cancellation
+from signup.models import (
+    ClassPeriod,
+    ClassPeriodSignUp,
+    ClassPeriodSignUpQuerySet,
+    ClosedDay,
+    LibraryFacultyMember,
+    PeriodCancellation,
+    Student,
+)
+
+# A Monday in the future, so that every student is notified.
+MONDAY = date(2030, 1, 7)
+
+
+class TestCancelClassPeriods(TestCase):
+    """Tests :func:`signup.faculty.tasks.cancel_class_periods` and the views for
+    cancelling days."""
+
+    def setUp(self):
+        self.students = [
+            Student.objects.create_user(email=f"student{i}@myhchs.org")
+            for i in range(3)
+        ]
+
+        # Two days with two periods each. Every student signs up for every period.
+        self.periods = [
+            ClassPeriod.objects.create(
+                date=MONDAY + timedelta(days=days), number=number, max_student_count=5
+            )
+            for days in (0, 1)
+            for number in (1, 2)
+        ]
+        ClassPeriodSignUp.objects.bulk_create(
+            ClassPeriodSignUp(
+                student=student,
+                class_period=period,
+                reason=ClassPeriodSignUp.STUDY_HALL,
+            )
+            for student in self.students
+            for period in self.periods
+        )
+
+        # A period after the cancelled range, which should be left alone.
+        self.other_period = ClassPeriod.objects.create(
+            date=MONDAY + timedelta(days=2), number=1, max_student_count=5
+        )
+        ClassPeriodSignUp.objects.create(
+            student=self.students[0],
+            class_period=self.other_period,
+            reason=ClassPeriodSignUp.STUDY_HALL,
+        )
+
+    def test_cancelling_in_batches(self):
+        """Tests that the periods and sign-ups are deleted in batches, that the progress
+        is recorded, and that each student receives one email listing every removed
+        sign-up."""
+        cancellation = PeriodCancellation.objects.create(
+            start_date=MONDAY, end_date=MONDAY + timedelta(days=1)
+        )
+
+        cancel_class_periods(cancellation, batch_size=5)
+
+        cancellation.refresh_from_db()
+        self.assertEqual(cancellation.status, PeriodCancellation.FINISHED)
+        self.assertEqual(cancellation.sign_up_count, 12)
+        self.assertEqual(cancellation.deleted_sign_up_count, 12)
+        self.assertEqual(cancellation.percent_done, 100)
+
+        self.assertListEqual(list(ClassPeriod.objects.all()), [self.other_period])
+        self.assertEqual(ClassPeriodSignUp.objects.count(), 1)
+
+        send_outbox_emails()
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertListEqual(
+            sorted(message.to[0] for message in mail.outbox),
+            [student.email for student in self.students],
+        )
+        self.assertEqual(mail.outbox[0].body.count("Period "), 4)
+
+    def test_sign_up_during_cancellation(self):
+        """Tests that a sign-up created after the last batch of sign-ups is deleted
+        along with its period, and that its student is notified."""
+        cancellation = PeriodCancellation.objects.create(
+            start_date=MONDAY, end_date=MONDAY + timedelta(days=1)
+        )
+        student = Student.objects.create_user(email="late@myhchs.org")
+        iter_pk_ranges = tasks.iter_pk_ranges
+
+        def sign_up_first(*args, **kwargs):
+            ClassPeriodSignUp.objects.create(
+                student=student,
+                class_period=self.periods[0],
+                reason=ClassPeriodSignUp.STUDY_HALL,
+            )
+            yield from iter_pk_ranges(*args, **kwargs)
+
+        with patch("signup.faculty.tasks.iter_pk_ranges", sign_up_first):
+            cancel_class_periods(cancellation, batch_size=2)
+
+        cancellation.refresh_from_db()
+        self.assertEqual(cancellation.sign_up_count, 13)
+        self.assertEqual(cancellation.deleted_sign_up_count, 13)
+        self.assertListEqual(list(ClassPeriod.objects.all()), [self.other_period])
+
+        send_outbox_emails()
+        self.assertIn("late@myhchs.org", [message.to[0] for message in mail.outbox])
+
+    def test_failed_batch(self):
+        """Tests that a failed batch marks the cancellation as failed without emailing
+        the students whose sign-ups weren't removed, and that running it again removes
+        the rest without emailing anyone twice."""
+        cancellation = PeriodCancellation.objects.create(
+            start_date=MONDAY, end_date=MONDAY + timedelta(days=1)
+        )
+        delete = ClassPeriodSignUpQuerySet.delete
+        calls = []
+
+        def fail_second_batch(queryset):
+            calls.append(queryset)
+            if len(calls) == 2:
+                raise DatabaseError
+            return delete(queryset)
+
+        # Each batch has the 4 sign-ups of one student.
+        with (
+            patch.object(ClassPeriodSignUpQuerySet, "delete", fail_second_batch),
+            patch(
+                "signup.faculty.tasks.cancel_class_periods",
+                partial(cancel_class_periods, batch_size=4),
+            ),
+            self.assertRaises(DatabaseError),
+        ):
+            run_period_cancellation(cancellation.pk)
+
+        cancellation.refresh_from_db()
+        self.assertEqual(cancellation.status, PeriodCancellation.FAILED)
+        self.assertTrue(cancellation.can_restart)
+        self.assertEqual(cancellation.deleted_sign_up_count, 4)
+        self.assertEqual(ClassPeriodSignUp.objects.count(), 9)
+        send_outbox_emails()
+        self.assertEqual(len(mail.outbox), 1)
+
+        run_period_cancellation(cancellation.pk)
+
+        cancellation.refresh_from_db()
+        self.assertEqual(cancellation.status, PeriodCancellation.FINISHED)
+        self.assertEqual(cancellation.sign_up_count, 12)
+        self.assertEqual(cancellation.deleted_sign_up_count, 12)
+        send_outbox_emails()
+        self.assertListEqual(
+            sorted(message.to[0] for message in mail.outbox),
+            [student.email for student in self.students],
+        )
+
+    def test_restarting_stale_cancellation(self):
+        """Tests that a cancellation that stopped making progress (e.g. because the
+        server restarted) can be restarted from its status page, once."""
+        library_faculty_member = LibraryFacultyMember.objects.create_user(
+            email="faculty@myhchs.org"
+        )
+        self.client.force_login(library_faculty_member)
+        cancellation = PeriodCancellation.objects.create(
+            start_date=MONDAY,
+            end_date=MONDAY,
+            status=PeriodCancellation.RUNNING,
+            date_updated=timezone.now() - timedelta(hours=1),
+        )
+        url = reverse("period_cancellation_status", kwargs={"pk": cancellation.pk})
+
+        response = self.client.get(url)
+        self.assertContains(response, "stopped making progress")
+        self.assertContains(response, 'value="Restart"')
+        self.assertNotContains(response, 'http-equiv="refresh"')
+
+        with (
+            patch("signup.faculty.tasks.Thread") as thread,
+            self.captureOnCommitCallbacks(execute=True),
+        ):
+            self.assertRedirects(self.client.post(url), url)
+            # The cancellation is no longer stale, so it isn't restarted again.
+            self.client.post(url)
+
+        thread.return_value.start.assert_called_once()
+        cancellation.refresh_from_db()
+        self.assertEqual(cancellation.status, PeriodCancellation.PENDING)
+        self.assertFalse(cancellation.can_restart)
+        self.assertNotContains(self.client.get(url), 'value="Restart"')
+
+    def test_view(self):
+        """Tests that cancelling a small number of sign-ups from the form finishes
+        immediately and adds the dates to the closed days."""
+        library_faculty_member = LibraryFacultyMember.objects.create_user(
+            email="faculty@myhchs.org"
+        )
+        self.client.force_login(library_faculty_member)
+
+        response = self.client.post(
+            reverse("cancel_class_periods"),
+            {
+                "start_date": str(MONDAY),
+                "mark_closed": "on",
+                "description": "Snow day",
+            },
+        )
+
+        cancellation = PeriodCancellation.objects.get()
+        self.assertRedirects(
+            response,
+            reverse("period_cancellation_status", kwargs={"pk": cancellation.pk}),
+        )
+        self.assertEqual(cancellation.end_date, MONDAY)
+        self.assertEqual(cancellation.requested_by, library_faculty_member)
+        self.assertEqual(cancellation.status, PeriodCancellation.FINISHED)
+        self.assertEqual(ClassPeriod.objects.count(), 3)
+
+        self.assertEqual(ClosedDay.objects.get().date, MONDAY)
+        self.assertEqual(ClosedDay.objects.get().description, "Snow day")
+
+        response = self.client.get(response.url)
+        self.assertContains(response, "6 sign-ups were removed")
+        self.assertNotContains(response, 'http-equiv="refresh"')
+
+    @override_settings(BACKGROUND_CANCELLATION_THRESHOLD=0)
+    def test_large_cancellation_runs_in_background(self):
+        """Tests that cancellations with many sign-ups are started in the background
+        after the transaction is committed."""
+        library_faculty_member = LibraryFacultyMember.objects.create_user(
+            email="faculty@myhchs.org"
+        )
+        self.client.force_login(library_faculty_member)
+
+        with patch("signup.faculty.tasks.Thread") as thread:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(
+                    reverse("cancel_class_periods"),
+                    {"start_date": str(MONDAY)},
+                )
+
+        cancellation = PeriodCancellation.objects.get()
+        thread.return_value.start.assert_called_once()
+        self.assertEqual(cancellation.status, PeriodCancellation.PENDING)
+        self.assertEqual(ClassPeriod.objects.count(), 5)
+
+        response = self.client.get(response.url)
+        self.assertContains(response, 'http-equiv="refresh"')
@@ -0,0 +1,107 @@
+import asyncio
+import json
+from threading import Thread
+
+from asgiref.sync import sync_to_async
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from signup.events import InProcessBackend, get_backend
+from signup.models import ClassPeriod, ClassPeriodSignUp, LibraryFacultyMember, Student
+
+
+class TestInProcessBackend(TestCase):
+    """Tests :class:`signup.events.InProcessBackend`."""
+
+    async def test_publishing_from_another_thread(self):
+        """Tests that messages published from another thread are only received by the
+        subscribers of their channel."""
+        backend = InProcessBackend()
+
+        async with backend.subscribe("a") as subscription:
+            thread = Thread(target=backend.publish, args=("b", "ignored"))
+            thread.start()
+            thread.join()
+            thread = Thread(target=backend.publish, args=("a", "message"))
+            thread.start()
+            thread.join()
+
+            message = await asyncio.wait_for(subscription.get(), 1)
+            self.assertEqual(message, "message")
+            self.assertTrue(subscription.empty())
+
+        self.assertDictEqual(backend.subscribers, {})
+
+
+class TestSignUpEventsView(TestCase):
+    """Tests :class:`signup.faculty.views.SignUpEventsView`."""
+
+    def setUp(self):
+        self.library_faculty_member = LibraryFacultyMember.objects.create_user(
+            email="faculty@myhchs.org"
+        )
+        self.student = Student.objects.create_user(email="student@myhchs.org")
+        self.period = ClassPeriod.objects.create(
+            date=timezone.localdate(timezone.now()), number=1, max_student_count=10
+        )
+        self.url = reverse(
+            "signup_events", kwargs={"signup_date": str(self.period.date)}
+        )
+
+    def create_signup(self):
+        # Events are only published once the transaction is committed.
+        with self.captureOnCommitCallbacks(execute=True):
+            ClassPeriodSignUp.objects.create(
+                student=self.student,
+                class_period=self.period,
+                reason=ClassPeriodSignUp.LUNCH,
+            )
+
+    def test_permissions_and_wsgi(self):
+        """Tests that only library faculty members can connect, and that HTTP 501 is
+        returned if the project isn't served with ASGI."""
+        self.client.force_login(self.student)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 403)
+
+        self.client.force_login(self.library_faculty_member)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 501)
+
+    @override_settings(SIGNUP_EVENTS_KEEPALIVE_SECONDS=0.01)
+    async def test_streaming_changes(self):
+        """Tests that the current version is sent first, followed by an event for each
+        change and keepalive comments while idle."""
+        await self.async_client.aforce_login(self.library_faculty_member)
+
+        response = await self.async_client.get(self.url)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        events = aiter(response.streaming_content)
+
+        event = (await asyncio.wait_for(anext(events), 5)).decode()
+        self.assertEqual(
+            event, 'event: change\ndata: {"version": 0, "reset": false}\n\n'
+        )
+
+        self.assertEqual(
+            (await asyncio.wait_for(anext(events), 5)).decode(), ": keepalive\n\n"
+        )
+
+        await sync_to_async(self.create_signup)()
+
+        # Skips any keepalive comments sent in the meantime.
+        event = b":"
+        while event.startswith(b":"):
+            event = await asyncio.wait_for(anext(events), 5)
+        data = json.loads(event.decode().split("data: ")[1])
+        self.assertDictEqual(data, {"version": 1, "reset": False})
+
+        # Disconnecting cancels the task that is waiting for the next event, which
+        # unsubscribes from the channel.
+        reader = asyncio.ensure_future(anext(events))
+        await asyncio.sleep(0)
+        reader.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await reader
+        self.assertDictEqual(get_backend().subscribers, {})
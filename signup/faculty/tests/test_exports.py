@@ -0,0 +1,159 @@
+from io import BytesIO
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+from django.http import QueryDict
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from openpyxl import load_workbook
+from rest_framework.test import APITestCase
+
+from signup.faculty.exports import get_cache_path, normalize_query
+from signup.faculty.tasks import run_spreadsheet_export
+from signup.models import (
+    ClassPeriod,
+    ClassPeriodSignUp,
+    LibraryFacultyMember,
+    SpreadsheetExport,
+    Student,
+)
+
+
+class TestSpreadsheetExports(APITestCase):
+    """Tests exporting sign-ups in the background using
+    :class:`signup.faculty.api.views.ClassPeriodSignUpViewSet` and the export views."""
+
+    def setUp(self):
+        directory = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_override = override_settings(SPREADSHEET_EXPORT_DIR=directory.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.library_faculty_member = LibraryFacultyMember.objects.create_user(
+            email="faculty@myhchs.org"
+        )
+        self.client.force_login(self.library_faculty_member)
+
+        self.date = timezone.localdate(timezone.now())
+        self.period = ClassPeriod.objects.create(
+            date=self.date, number=1, max_student_count=10
+        )
+        for i in range(3):
+            ClassPeriodSignUp.objects.create(
+                student=Student.objects.create_user(
+                    email=f"student{i}@myhchs.org", name=f"Student {i}"
+                ),
+                class_period=self.period,
+                reason=ClassPeriodSignUp.STUDY_HALL,
+            )
+
+        self.export_url = (
+            f"{reverse('api-signups-export')}?class_period__date={self.date}"
+        )
+
+    def start_export(self, url=None):
+        """Starts an export and returns the response along with whether a new export
+        was started in the background."""
+        with patch("signup.faculty.tasks.Thread") as thread:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(url or self.export_url)
+        return response, thread.return_value.start.called
+
+    def test_normalizing_query(self):
+        """Tests that the order of the parameters and ignored parameters don't change
+        the normalized query."""
+        self.assertEqual(
+            normalize_query(
+                QueryDict("search=a&class_period__date=2030-01-07&reason=")
+            ),
+            normalize_query(
+                QueryDict("ordering=-reason&class_period__date=2030-01-07&search=a")
+            ),
+        )
+
+    def test_exporting(self):
+        """Tests starting an export, polling its progress, and downloading it."""
+        response, started = self.start_export()
+        self.assertEqual(response.status_code, 202)
+        self.assertTrue(started)
+        self.assertEqual(response.data["status"], SpreadsheetExport.PENDING)
+        self.assertIsNone(response.data["download_url"])
+
+        run_spreadsheet_export(response.data["id"])
+
+        response = self.client.get(response.data["status_url"])
+        self.assertEqual(response.data["status"], SpreadsheetExport.FINISHED)
+        self.assertEqual(response.data["row_count"], 3)
+        self.assertEqual(response.data["percent_done"], 100)
+
+        response = self.client.get(response.data["download_url"])
+        self.assertEqual(response["Content-Type"], "application/vnd.ms-excel")
+        workbook = load_workbook(BytesIO(response.getvalue()))
+        self.assertListEqual(
+            [row[2] for row in workbook.active.values],
+            ["Student Name", "Student 0", "Student 1", "Student 2"],
+        )
+
+    def test_caching(self):
+        """Tests that exporting the same sign-ups again reuses the export until one of
+        them changes."""
+        response, _ = self.start_export()
+        export_id = response.data["id"]
+
+        # Unfinished exports are shared too.
+        response, started = self.start_export(f"{self.export_url}&ordering=reason")
+        self.assertFalse(started)
+        self.assertEqual(response.data["id"], export_id)
+
+        run_spreadsheet_export(export_id)
+        response, started = self.start_export()
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(started)
+        self.assertEqual(response.data["id"], export_id)
+        self.assertIsNotNone(response.data["download_url"])
+
+        # Other filters are exported separately.
+        response, started = self.start_export(f"{self.export_url}&search=student")
+        self.assertTrue(started)
+        self.assertNotEqual(response.data["id"], export_id)
+
+        ClassPeriodSignUp.objects.first().delete()
+        response, started = self.start_export()
+        self.assertTrue(started)
+        self.assertNotEqual(response.data["id"], export_id)
+
+        # Student names are exported too.
+        export_id = response.data["id"]
+        student = Student.objects.get(name="Student 1")
+        student.name = "Renamed"
+        student.save()
+        response, started = self.start_export()
+        self.assertTrue(started)
+        self.assertNotEqual(response.data["id"], export_id)
+
+    def test_expired_export(self):
+        """Tests that downloading an export whose file was deleted fails."""
+        response, _ = self.start_export()
+        run_spreadsheet_export(response.data["id"])
+        export = SpreadsheetExport.objects.get()
+        get_cache_path(export.cache_key).unlink()
+
+        response = self.client.get(
+            reverse("api-export-download", kwargs={"pk": export.pk})
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_invalid_filters_and_permissions(self):
+        """Tests that invalid filters are rejected and that students can't export."""
+        response = self.client.post(
+            f"{reverse('api-signups-export')}?class_period__date=invalid"
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(SpreadsheetExport.objects.exists())
+
+        self.client.force_login(Student.objects.get(email="student0@myhchs.org"))
+        response, started = self.start_export()
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(started)
@@ -43,5 +43,14 @@ class TestBasicFacultyViewsAuth(TestCase):
         response = self.client.get(reverse("signups_app"))
         self.assertEqual(response.status_code, 403)
 
+        response = self.client.get(reverse("kiosk"))
+        self.assertEqual(response.status_code, 403)
+
         response = self.client.get(reverse("settings_form"))
         self.assertEqual(response.status_code, 403)
+
+        response = self.client.get(reverse("schedule_templates_list"))
+        self.assertEqual(response.status_code, 403)
+
+        response = self.client.get(reverse("closed_days_form"))
+        self.assertEqual(response.status_code, 403)
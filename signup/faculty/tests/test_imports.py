@@ -0,0 +1,271 @@
+from datetime import date
+from io import BytesIO, StringIO
+from tempfile import NamedTemporaryFile
+from zipfile import ZipFile
+
+from constance.test import override_config
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.urls import reverse
+from openpyxl import Workbook
+
+from signup.faculty.imports import import_class_periods
+from signup.models import (
+    ClassPeriod,
+    ClassPeriodSignUp,
+    LibraryFacultyMember,
+    Student,
+)
+
+CSV_CONTENTS = b"""Date,Period 1,Period 2
+2030-01-07,10,11
+01/08/2030,20,
+2030-01-09,30,31
+"""
+
+
+def get_periods():
+    return list(
+        ClassPeriod.objects.order_by("date", "number").values_list(
+            "date", "number", "max_student_count"
+        )
+    )
+
+
+@override_config(MAX_PERIOD_NUMBER=2)
+class TestImportClassPeriods(TestCase):
+    """Tests :func:`signup.faculty.imports.import_class_periods`."""
+
+    def test_importing_csv(self):
+        """Tests that a CSV file creates new periods and updates existing ones. Also
+        tests that small batches produce the same result."""
+        ClassPeriod.objects.create(
+            date=date(2030, 1, 7), number=1, max_student_count=10
+        )
+        ClassPeriod.objects.create(date=date(2030, 1, 7), number=2, max_student_count=5)
+
+        result = import_class_periods(BytesIO(CSV_CONTENTS), "file.csv", batch_size=2)
+
+        self.assertEqual(
+            (result.created, result.updated, result.unchanged, result.skipped),
+            (3, 1, 1, 0),
+        )
+        self.assertListEqual(result.problems, [])
+
+        # The empty cell for period 2 on January 8 is skipped.
+        self.assertListEqual(
+            get_periods(),
+            [
+                (date(2030, 1, 7), 1, 10),
+                (date(2030, 1, 7), 2, 11),
+                (date(2030, 1, 8), 1, 20),
+                (date(2030, 1, 9), 1, 30),
+                (date(2030, 1, 9), 2, 31),
+            ],
+        )
+
+    def test_importing_xlsx(self):
+        """Tests importing an XLSX file."""
+        workbook = Workbook()
+        sheet = workbook.active
+        sheet.append(["Date", 1, 2])
+        sheet.append([date(2030, 1, 7), 10, 11])
+        file = BytesIO()
+        workbook.save(file)
+        file.seek(0)
+
+        result = import_class_periods(file, "file.xlsx")
+
+        self.assertEqual(result.created, 2)
+        self.assertListEqual(
+            get_periods(), [(date(2030, 1, 7), 1, 10), (date(2030, 1, 7), 2, 11)]
+        )
+
+    def test_float_headings(self):
+        """Tests that period numbers stored as floats, which openpyxl reads back as
+        floats such as 1.0, are allowed as headings."""
+        workbook = Workbook()
+        sheet = workbook.active
+        sheet.append(["Date", 1, 2])
+        sheet.append([date(2030, 1, 7), 10, 11])
+        saved = BytesIO()
+        workbook.save(saved)
+
+        # openpyxl saves whole floats as integers, so the headings are rewritten the
+        # way other spreadsheet programs can store them.
+        file = BytesIO()
+        with ZipFile(saved) as source, ZipFile(file, "w") as destination:
+            for name in source.namelist():
+                data = source.read(name)
+                if name == "xl/worksheets/sheet1.xml":
+                    data = data.replace(b"<v>1</v>", b"<v>1.0</v>").replace(
+                        b"<v>2</v>", b"<v>2.0</v>"
+                    )
+                destination.writestr(name, data)
+        file.seek(0)
+
+        result = import_class_periods(file, "file.xlsx")
+
+        self.assertListEqual(result.problems, [])
+        self.assertListEqual(
+            get_periods(), [(date(2030, 1, 7), 1, 10), (date(2030, 1, 7), 2, 11)]
+        )
+
+    def test_dry_run(self):
+        """Tests that a dry run lists the changes without saving them."""
+        ClassPeriod.objects.create(date=date(2030, 1, 7), number=2, max_student_count=5)
+
+        result = import_class_periods(BytesIO(CSV_CONTENTS), "file.csv", dry_run=True)
+
+        self.assertEqual((result.created, result.updated), (4, 1))
+        self.assertIn("would be created", str(result))
+        self.assertListEqual(
+            result.changes,
+            [
+                "Period 1 on 2030-01-07 would be created with a maximum of 10 "
+                "students.",
+                "Period 2 on 2030-01-07 would be changed from a maximum of 5 to 11 "
+                "students.",
+                "Period 1 on 2030-01-08 would be created with a maximum of 20 "
+                "students.",
+                "Period 1 on 2030-01-09 would be created with a maximum of 30 "
+                "students.",
+                "Period 2 on 2030-01-09 would be created with a maximum of 31 "
+                "students.",
+            ],
+        )
+        self.assertEqual(ClassPeriod.objects.count(), 1)
+
+    def test_blank_headings(self):
+        """Tests that columns without a heading, such as the ones left by trailing
+        commas, are skipped."""
+        contents = b"Date,1,2,\n2030-01-07,10,11,\n"
+        result = import_class_periods(BytesIO(contents), "file.csv")
+        self.assertListEqual(result.problems, [])
+
+        workbook = Workbook()
+        sheet = workbook.active
+        sheet.append(["Date", 1, None, 2])
+        sheet.append([date(2030, 1, 8), 20, None, 21])
+        file = BytesIO()
+        workbook.save(file)
+        file.seek(0)
+        result = import_class_periods(file, "file.xlsx")
+        self.assertListEqual(result.problems, [])
+
+        self.assertListEqual(
+            get_periods(),
+            [
+                (date(2030, 1, 7), 1, 10),
+                (date(2030, 1, 7), 2, 11),
+                (date(2030, 1, 8), 1, 20),
+                (date(2030, 1, 8), 2, 21),
+            ],
+        )
+
+    def test_counts_that_are_not_whole_numbers(self):
+        """Tests that counts such as 12.5 are reported instead of being truncated,
+        while whole numbers stored as floats in XLSX files are allowed."""
+        contents = b"Date,1,2\n2030-01-07,12.5,3\n"
+        result = import_class_periods(BytesIO(contents), "file.csv")
+        self.assertListEqual(
+            result.problems,
+            ['Row 2: The count for period 1 ("12.5") is not a whole number.'],
+        )
+
+        workbook = Workbook()
+        sheet = workbook.active
+        sheet.append(["Date", 1, 2])
+        sheet.append([date(2030, 1, 8), 12.0, 3])
+        sheet.append([date(2030, 1, 9), 2.7, 3])
+        file = BytesIO()
+        workbook.save(file)
+        file.seek(0)
+        result = import_class_periods(file, "file.xlsx")
+        self.assertListEqual(
+            result.problems,
+            ['Row 3: The count for period 1 ("2.7") is not a whole number.'],
+        )
+
+        self.assertListEqual(
+            get_periods(), [(date(2030, 1, 8), 1, 12), (date(2030, 1, 8), 2, 3)]
+        )
+
+    def test_invalid_rows_and_conflicts(self):
+        """Tests that invalid rows and periods that would have fewer spots than
+        sign-ups are skipped and reported."""
+        period = ClassPeriod.objects.create(
+            date=date(2030, 1, 7), number=1, max_student_count=10
+        )
+        for email in ("student1@myhchs.org", "student2@myhchs.org"):
+            ClassPeriodSignUp.objects.create(
+                student=Student.objects.create_user(email=email),
+                class_period=period,
+                reason=ClassPeriodSignUp.STUDY_HALL,
+            )
+
+        contents = b"Date,1,2\n2030-01-07,1,5\nnot a date,1,1\n2030-01-08,-1,1\n"
+        result = import_class_periods(BytesIO(contents), "file.csv")
+
+        self.assertEqual((result.created, result.skipped), (1, 1))
+        self.assertListEqual(
+            result.problems,
+            [
+                'Row 3: "not a date" is not a valid date.',
+                "Row 4: The count for period 1 is negative.",
+                "Period 1 on 2030-01-07 has more sign-ups than its new maximum, so it "
+                "was skipped.",
+            ],
+        )
+        self.assertListEqual(
+            get_periods(), [(date(2030, 1, 7), 1, 10), (date(2030, 1, 7), 2, 5)]
+        )
+
+
+@override_config(MAX_PERIOD_NUMBER=2)
+class TestImportClassPeriodsView(TestCase):
+    """Tests :class:`signup.faculty.views.ImportClassPeriodsFormView` and the
+    ``importclassperiods`` management command."""
+
+    def test_uploading_file(self):
+        """Tests uploading a file as a dry run and then for real."""
+        library_faculty_member = LibraryFacultyMember.objects.create_user(
+            email="faculty@myhchs.org"
+        )
+        self.client.force_login(library_faculty_member)
+
+        response = self.client.post(
+            reverse("import_class_periods"),
+            {"file": SimpleUploadedFile("file.csv", CSV_CONTENTS), "dry_run": "on"},
+        )
+        self.assertContains(response, "5 periods would be created")
+        self.assertContains(
+            response,
+            "Period 1 on 2030-01-07 would be created with a maximum of 10 students.",
+        )
+        self.assertFalse(ClassPeriod.objects.exists())
+
+        response = self.client.post(
+            reverse("import_class_periods"),
+            {"file": SimpleUploadedFile("file.csv", CSV_CONTENTS)},
+        )
+        self.assertContains(response, "5 periods were created")
+        self.assertEqual(ClassPeriod.objects.count(), 5)
+
+    def test_management_command(self):
+        """Tests importing a file with the management command."""
+        with NamedTemporaryFile(suffix=".csv") as file:
+            file.write(CSV_CONTENTS)
+            file.flush()
+
+            stdout = StringIO()
+            call_command("importclassperiods", file.name, stdout=stdout)
+
+        self.assertIn("5 periods were created", stdout.getvalue())
+        self.assertEqual(ClassPeriod.objects.count(), 5)
+
+        with self.assertRaises(CommandError):
+            call_command(
+                "importclassperiods", file.name, "--batch-size", "0", stdout=stdout
+            )
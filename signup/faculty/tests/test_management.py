@@ -1,19 +1,23 @@
 from datetime import date, datetime
+from io import StringIO
 from unittest.mock import patch
 
 from django.core.management import call_command
 from django.test import TestCase
 from django.utils import timezone
 
+from signup.faculty.archives import iter_archive_records, list_archives
+from signup.faculty.tests.common import TemporaryArchiveDirMixin
 from signup.models import ClassPeriod, ClassPeriodSignUp, Student
 
 
-class TestDeleteOldClassPeriods(TestCase):
+class TestDeleteOldClassPeriods(TemporaryArchiveDirMixin, TestCase):
     """Tests :mod:`signup.faculty.management.commands.deleteoldclassperiods```. Checks
     that the command does not delete ClassPeriods that are part of the current school
     year."""
 
     def setUp(self):
+        super().setUp()
         student = Student.objects.create_user(
             email="student@myhchs.org", password="12345"
         )
@@ -62,7 +66,7 @@ class TestDeleteOldClassPeriods(TestCase):
             # Deletes only self.period1 since it is the only period that is part of the
             # 2021-2022 school year, and the command is not supposed to delete periods
             # that are part of (or after) the current school year.
-            call_command("deleteoldclassperiods", 7, 1)
+            call_command("deleteoldclassperiods", 7, 1, stdout=StringIO())
 
         periods = ClassPeriod.objects.all()
         self.assertQuerySetEqual(periods, [self.period2, self.period3], ordered=False)
@@ -79,10 +83,129 @@ class TestDeleteOldClassPeriods(TestCase):
             now_patched.return_value = datetime(2023, 9, 1)
             # Deletes both self.period1 (which is from year 2022) and self.period2
             # (which is part of the 2022-2023 school year).
-            call_command("deleteoldclassperiods", 7, 1)
+            call_command("deleteoldclassperiods", 7, 1, stdout=StringIO())
 
         periods = ClassPeriod.objects.all()
         self.assertQuerySetEqual(periods, [self.period3])
 
         signups = ClassPeriodSignUp.objects.all()
         self.assertQuerySetEqual(signups, [self.signup3])
+
+    def test_batches(self):
+        """Tests deleting the class periods and sign-ups in batches, with the progress
+        written after each batch."""
+        stdout = StringIO()
+        with patch("django.utils.timezone.now") as now_patched:
+            now_patched.return_value = datetime(2023, 9, 1)
+            call_command(
+                "deleteoldclassperiods", 7, 1, "--batch-size", "1", stdout=stdout
+            )
+
+        self.assertQuerySetEqual(ClassPeriod.objects.all(), [self.period3])
+        self.assertListEqual(
+            stdout.getvalue().splitlines(),
+            [
+                "Deleted 1 sign-ups and 0 class periods so far.",
+                "Deleted 2 sign-ups and 0 class periods so far.",
+                "Deleted 2 sign-ups and 1 class periods so far.",
+                "Deleted 2 sign-ups and 2 class periods so far.",
+                "Deleted 2 sign-ups and 2 class periods on or before 2023-07-01.",
+            ],
+        )
+
+    def test_archive(self):
+        """Tests that the deleted class periods and sign-ups are archived by school
+        year."""
+        with patch("django.utils.timezone.now") as now_patched:
+            now_patched.return_value = datetime(2023, 9, 1)
+            call_command("deleteoldclassperiods", 7, 1, stdout=StringIO())
+
+        self.assertListEqual(list_archives(), ["2021-2022", "2022-2023"])
+        for school_year, period, signup in [
+            ("2021-2022", self.period1, self.signup1),
+            ("2022-2023", self.period2, self.signup2),
+        ]:
+            self.assertListEqual(
+                [
+                    (record["type"], record["id"])
+                    for record in iter_archive_records(school_year)
+                ],
+                [("signup", signup.pk), ("period", period.pk)],
+            )
+
+    def test_no_archive(self):
+        with patch("django.utils.timezone.now") as now_patched:
+            now_patched.return_value = datetime(2023, 9, 1)
+            call_command(
+                "deleteoldclassperiods", 7, 1, "--no-archive", stdout=StringIO()
+            )
+
+        self.assertQuerySetEqual(ClassPeriod.objects.all(), [self.period3])
+        self.assertListEqual(list_archives(), [])
+
+
+class TestBenchmark(TestCase):
+    """Tests :mod:`signup.faculty.management.commands.benchmark`."""
+
+    def test_serializers(self):
+        """Tests that the serializer benchmark runs and doesn't save its data."""
+        stdout = StringIO()
+        call_command("benchmark", "serializers", "--rows", "20", stdout=stdout)
+
+        self.assertIn("Speedup", stdout.getvalue())
+        self.assertFalse(ClassPeriodSignUp.objects.exists())
+
+    def test_search(self):
+        """Tests that the search benchmark runs for each number of users and doesn't
+        save its data."""
+        stdout = StringIO()
+        call_command(
+            "benchmark", "search", "--users", "10", "20", "--query", "1", stdout=stdout
+        )
+
+        self.assertIn("Searching 10 students", stdout.getvalue())
+        self.assertIn("Searching 20 students", stdout.getvalue())
+        self.assertFalse(ClassPeriodSignUp.objects.exists())
+
+    def test_spreadsheet(self):
+        """Tests that the spreadsheet benchmark runs and doesn't save its data."""
+        stdout = StringIO()
+        call_command("benchmark", "spreadsheet", "--rows", "20", stdout=stdout)
+
+        self.assertIn("Exporting 20 sign-ups", stdout.getvalue())
+        self.assertIn("Peak RSS", stdout.getvalue())
+        self.assertFalse(ClassPeriodSignUp.objects.exists())
+
+    def test_exports(self):
+        """Tests that the export format benchmark runs and doesn't save its data."""
+        stdout = StringIO()
+        call_command("benchmark", "exports", "--rows", "20", stdout=stdout)
+
+        self.assertIn("JSON Lines", stdout.getvalue())
+        self.assertFalse(ClassPeriodSignUp.objects.exists())
+
+    def test_analytics(self):
+        """Tests that the analytics benchmark runs and doesn't save its data."""
+        stdout = StringIO()
+        call_command(
+            "benchmark", "analytics", "--days", "2", "--students", "5", stdout=stdout
+        )
+
+        self.assertIn("Exporting 10 sign-ups", stdout.getvalue())
+        self.assertFalse(ClassPeriodSignUp.objects.exists())
+
+    def test_json(self):
+        """Tests that the JSON benchmark runs and doesn't save its data."""
+        stdout = StringIO()
+        call_command("benchmark", "json", "--rows", "20", stdout=stdout)
+
+        self.assertIn("FastJSONRenderer", stdout.getvalue())
+        self.assertFalse(ClassPeriodSignUp.objects.exists())
+
+    def test_retention(self):
+        """Tests that the retention benchmark runs and doesn't save its data."""
+        stdout = StringIO()
+        call_command("benchmark", "retention", "--rows", "20", stdout=stdout)
+
+        self.assertIn("delete_class_periods()", stdout.getvalue())
+        self.assertFalse(ClassPeriodSignUp.objects.exists())
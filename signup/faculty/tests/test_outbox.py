@@ -0,0 +1,100 @@
+from datetime import timedelta
+from io import StringIO
+from smtplib import SMTPException
+from unittest.mock import patch
+
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from signup.faculty.notifications import send_outbox_emails
+from signup.faculty.tasks import queue_emails
+from signup.models import OutboxEmail
+
+
+def create_messages(count):
+    return [
+        ("Subject", f"Body {i}", None, (f"student{i}@myhchs.org",))
+        for i in range(count)
+    ]
+
+
+class TestOutbox(TestCase):
+    """Tests :func:`signup.faculty.tasks.queue_emails` and
+    :func:`signup.faculty.notifications.send_outbox_emails`."""
+
+    def test_queueing(self):
+        """Tests that queued emails are only sent in the background after the
+        transaction is committed."""
+        with patch("signup.faculty.tasks.Thread") as thread:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.assertEqual(queue_emails(create_messages(2)), 2)
+                thread.return_value.start.assert_not_called()
+
+        thread.return_value.start.assert_called_once()
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(OutboxEmail.objects.filter(date_sent=None).count(), 2)
+
+    def test_sending_in_batches(self):
+        """Tests that every email is sent once over a single connection."""
+        queue_emails(create_messages(5))
+
+        with patch(
+            "signup.faculty.notifications.get_connection",
+            wraps=mail.get_connection,
+        ) as get_connection:
+            self.assertEqual(send_outbox_emails(batch_size=2), 5)
+
+        get_connection.assert_called_once()
+        self.assertListEqual(
+            sorted(message.to[0] for message in mail.outbox),
+            [f"student{i}@myhchs.org" for i in range(5)],
+        )
+        self.assertFalse(OutboxEmail.objects.filter(date_sent=None).exists())
+
+        # Sent emails aren't sent again.
+        self.assertEqual(send_outbox_emails(), 0)
+        self.assertEqual(len(mail.outbox), 5)
+
+    @override_settings(EMAIL_OUTBOX_MAX_ATTEMPTS=2)
+    def test_retrying(self):
+        """Tests that failed emails are retried later until they have failed too many
+        times."""
+        queue_emails(create_messages(2))
+
+        with patch(
+            "signup.faculty.notifications.EmailMessage.send",
+            side_effect=[SMTPException("Unavailable"), 1],
+        ):
+            self.assertEqual(send_outbox_emails(), 1)
+
+        email = OutboxEmail.objects.get(date_sent=None)
+        self.assertEqual(email.attempts, 1)
+        self.assertEqual(email.last_error, "Unavailable")
+        self.assertGreater(email.next_attempt, timezone.now())
+
+        # The email isn't retried until its next attempt is due.
+        self.assertEqual(send_outbox_emails(), 0)
+
+        OutboxEmail.objects.update(next_attempt=timezone.now() - timedelta(seconds=1))
+        with patch(
+            "signup.faculty.notifications.EmailMessage.send",
+            side_effect=SMTPException("Unavailable"),
+        ):
+            self.assertEqual(send_outbox_emails(), 0)
+
+        # The email has now failed twice, so it is no longer retried.
+        OutboxEmail.objects.update(next_attempt=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(send_outbox_emails(), 0)
+        self.assertEqual(OutboxEmail.objects.get(pk=email.pk).attempts, 2)
+
+    def test_management_command(self):
+        """Tests sending the emails with the management command."""
+        queue_emails(create_messages(3))
+
+        stdout = StringIO()
+        call_command("sendoutboxemails", "--batch-size", "2", stdout=stdout)
+
+        self.assertIn("3 emails were sent.", stdout.getvalue())
+        self.assertEqual(len(mail.outbox), 3)
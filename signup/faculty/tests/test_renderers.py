@@ -0,0 +1,50 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+from unittest import mock, skipIf
+
+from django.test import SimpleTestCase
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+
+from signup.faculty.api import renderers
+from signup.faculty.api.renderers import FastJSONRenderer
+
+
+class TestFastJSONRenderer(SimpleTestCase):
+    """Tests :class:`signup.faculty.api.renderers.FastJSONRenderer`."""
+
+    data = [
+        {
+            "id": 1,
+            "name": "Zoë Student",
+            "date": datetime(2025, 1, 6, 14, 30, 15, 123456, tzinfo=timezone.utc),
+            "amount": Decimal("1.5"),
+            "reason": gettext_lazy("lunch"),
+            "confirmed": None,
+        }
+    ]
+
+    @skipIf(renderers.orjson is None, "orjson isn't installed.")
+    def test_same_as_json_renderer(self):
+        """Tests that orjson renders the same JSON as DRF's renderer, including for
+        values that orjson doesn't support itself."""
+        self.assertEqual(
+            FastJSONRenderer().render(self.data), JSONRenderer().render(self.data)
+        )
+
+    def test_fallback(self):
+        """Tests that the json module is used if orjson isn't installed."""
+        with mock.patch.object(renderers, "orjson", None):
+            content = FastJSONRenderer().render(self.data)
+        self.assertEqual(content, JSONRenderer().render(self.data))
+
+    def test_indent(self):
+        """Tests that indented JSON can still be requested."""
+        content = FastJSONRenderer().render(self.data, "application/json; indent=4", {})
+        self.assertEqual(
+            content, JSONRenderer().render(self.data, "application/json; indent=4", {})
+        )
+        self.assertIn(b"\n    ", content)
+
+    def test_none(self):
+        self.assertEqual(FastJSONRenderer().render(None), b"")
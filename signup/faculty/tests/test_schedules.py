@@ -0,0 +1,278 @@
+from datetime import date, timedelta
+
+from constance.test import override_config
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from signup.faculty.schedules import (
+    find_capacity_conflicts_by_number,
+    plan_class_periods,
+)
+from signup.models import (
+    ClassPeriod,
+    ClassPeriodSignUp,
+    ClosedDay,
+    LibraryFacultyMember,
+    ScheduleTemplate,
+    ScheduleTemplatePeriod,
+    Student,
+)
+
+# A Monday.
+MONDAY = date(2030, 1, 7)
+
+
+def create_template(template_type, max_student_counts, rotation_length=2):
+    """Creates a :class:`ScheduleTemplate` with two periods per day. Period 1 uses the
+    value in ``max_student_counts`` for that day, and period 2 uses that value plus
+    one."""
+    template = ScheduleTemplate.objects.create(
+        name="Template", template_type=template_type, rotation_length=rotation_length
+    )
+    ScheduleTemplatePeriod.objects.bulk_create(
+        ScheduleTemplatePeriod(
+            template=template,
+            day=day,
+            number=number,
+            max_student_count=max_student_count + number - 1,
+        )
+        for day, max_student_count in enumerate(max_student_counts)
+        for number in (1, 2)
+    )
+    return template
+
+
+class TestPlanClassPeriods(TestCase):
+    """Tests :func:`signup.faculty.schedules.plan_class_periods`."""
+
+    def test_weekly_template(self):
+        """Tests that a weekly template uses the counts for each weekday and skips
+        weekends and closed days."""
+        template = create_template(ScheduleTemplate.WEEKLY, [10, 20, 30, 40, 50])
+        ClosedDay.objects.create(date=MONDAY + timedelta(days=2))
+
+        # Covers two full weeks.
+        periods = plan_class_periods(template, MONDAY, MONDAY + timedelta(days=13))
+        planned = [
+            (period.date, period.number, period.max_student_count) for period in periods
+        ]
+
+        expected = []
+        for days, max_student_count in [
+            (0, 10),
+            (1, 20),
+            (3, 40),
+            (4, 50),
+            (7, 10),
+            (8, 20),
+            (9, 30),
+            (10, 40),
+            (11, 50),
+        ]:
+            expected.append((MONDAY + timedelta(days=days), 1, max_student_count))
+            expected.append((MONDAY + timedelta(days=days), 2, max_student_count + 1))
+
+        self.assertListEqual(planned, expected)
+
+    def test_rotating_template(self):
+        """Tests that a rotating template only advances on school days and starts from
+        the requested rotation day."""
+        template = create_template(
+            ScheduleTemplate.ROTATING, [10, 20, 30], rotation_length=3
+        )
+        ClosedDay.objects.create(date=MONDAY + timedelta(days=1))
+
+        # Starts on the Friday before MONDAY with the second rotation day.
+        periods = plan_class_periods(
+            template, MONDAY - timedelta(days=3), MONDAY + timedelta(days=3), 1
+        )
+        planned = [
+            (period.date, period.max_student_count)
+            for period in periods
+            if period.number == 1
+        ]
+
+        self.assertListEqual(
+            planned,
+            [
+                (MONDAY - timedelta(days=3), 20),
+                (MONDAY, 30),
+                (MONDAY + timedelta(days=2), 10),
+                (MONDAY + timedelta(days=3), 20),
+            ],
+        )
+
+
+class TestFindCapacityConflictsByNumber(TestCase):
+    """Tests :func:`signup.faculty.schedules.find_capacity_conflicts_by_number`."""
+
+    def test_only_conflicts_are_returned(self):
+        """Tests that only the periods whose sign-ups exceed the new maximum for their
+        period number are returned, using a single query."""
+        students = [
+            Student.objects.create_user(email=f"student{i}@myhchs.org")
+            for i in range(3)
+        ]
+        tuesday = MONDAY + timedelta(days=1)
+
+        # Period 1 on Monday has 3 sign-ups, period 2 on Monday has 1, and period 1 on
+        # Tuesday has 2.
+        for date, number, signed_up_count in [
+            (MONDAY, 1, 3),
+            (MONDAY, 2, 1),
+            (tuesday, 1, 2),
+        ]:
+            period = ClassPeriod.objects.create(
+                date=date, number=number, max_student_count=5
+            )
+            ClassPeriodSignUp.objects.bulk_create(
+                ClassPeriodSignUp(
+                    student=student,
+                    class_period=period,
+                    reason=ClassPeriodSignUp.STUDY_HALL,
+                )
+                for student in students[:signed_up_count]
+            )
+
+        with self.assertNumQueries(1):
+            conflicts = find_capacity_conflicts_by_number(MONDAY, tuesday, {1: 2, 2: 1})
+
+        self.assertListEqual(conflicts, [(MONDAY, 1, 3, 2)])
+
+        # Periods outside of the date range are ignored.
+        self.assertListEqual(
+            find_capacity_conflicts_by_number(tuesday, tuesday, {1: 1, 2: 0}),
+            [(tuesday, 1, 2, 1)],
+        )
+
+
+@override_config(MAX_PERIOD_NUMBER=2)
+class TestScheduleTemplateViews(TestCase):
+    """Tests the views for creating, editing, and applying schedule templates."""
+
+    def setUp(self):
+        library_faculty_member = LibraryFacultyMember.objects.create_user(
+            email="faculty@myhchs.org"
+        )
+        self.client.force_login(library_faculty_member)
+
+    def test_creating_and_editing_template(self):
+        """Tests creating a template and then setting its maximum student counts."""
+        response = self.client.post(
+            reverse("schedule_template_new"),
+            {"name": "A/B Days", "template_type": "R", "rotation_length": "2"},
+        )
+        template = ScheduleTemplate.objects.get()
+        self.assertRedirects(
+            response,
+            reverse("schedule_template_capacities", kwargs={"pk": template.pk}),
+        )
+
+        # Checks that there is one row of fields for each day of the rotation.
+        response = self.client.get(
+            reverse("schedule_template_capacities", kwargs={"pk": template.pk})
+        )
+        self.assertContains(response, "Day 1")
+        self.assertContains(response, "Day 2")
+        self.assertNotContains(response, "Day 3")
+
+        response = self.client.post(
+            reverse("schedule_template_capacities", kwargs={"pk": template.pk}),
+            {
+                "day_0_period_1": "10",
+                "day_0_period_2": "11",
+                "day_1_period_1": "20",
+                "day_1_period_2": "21",
+            },
+        )
+        self.assertRedirects(response, reverse("schedule_templates_list"))
+
+        self.assertListEqual(
+            list(
+                template.periods.order_by("day", "number").values_list(
+                    "day", "number", "max_student_count"
+                )
+            ),
+            [(0, 1, 10), (0, 2, 11), (1, 1, 20), (1, 2, 21)],
+        )
+
+    def test_applying_template(self):
+        """Tests that applying a template creates the new ClassPeriods and updates the
+        existing ones."""
+        template = create_template(ScheduleTemplate.WEEKLY, [10, 20, 30, 40, 50])
+        ClassPeriod.objects.create(date=MONDAY, number=1, max_student_count=5)
+
+        response = self.client.get(reverse("schedule_templates_list"))
+        self.assertContains(response, "Template")
+
+        response = self.client.get(
+            reverse("schedule_template_apply", kwargs={"pk": template.pk})
+        )
+        self.assertContains(response, "Rotation day of the first school day")
+
+        response = self.client.post(
+            reverse("schedule_template_apply", kwargs={"pk": template.pk}),
+            {
+                "start_date": str(MONDAY),
+                "end_date": str(MONDAY + timedelta(days=6)),
+            },
+        )
+        self.assertRedirects(response, reverse("future_class_periods_list"))
+
+        periods = ClassPeriod.objects.order_by("date", "number").values_list(
+            "date", "number", "max_student_count"
+        )
+
+        # Five weekdays with two periods each. The weekend is skipped.
+        self.assertEqual(periods.count(), 10)
+        self.assertTupleEqual(periods[0], (MONDAY, 1, 10))
+        self.assertTupleEqual(periods[1], (MONDAY, 2, 11))
+        self.assertTupleEqual(periods[9], (MONDAY + timedelta(days=4), 2, 51))
+
+    def test_applying_template_with_existing_signups(self):
+        """Tests that a template cannot be applied if it would lower the maximum student
+        count of a period below the number of students who already signed up."""
+        template = create_template(ScheduleTemplate.WEEKLY, [1, 1, 1, 1, 1])
+        period = ClassPeriod.objects.create(date=MONDAY, number=1, max_student_count=5)
+
+        for email in ("student1@myhchs.org", "student2@myhchs.org"):
+            ClassPeriodSignUp.objects.create(
+                student=Student.objects.create_user(email=email),
+                class_period=period,
+                date_signed_up=timezone.now(),
+                reason=ClassPeriodSignUp.STUDY_HALL,
+            )
+
+        response = self.client.post(
+            reverse("schedule_template_apply", kwargs={"pk": template.pk}),
+            {"start_date": str(MONDAY), "end_date": str(MONDAY + timedelta(days=4))},
+        )
+        self.assertContains(
+            response,
+            f"Period 1 on {MONDAY} currently has 2 students, which is greater than the new maximum of 1",
+            1,
+        )
+
+        # Checks that nothing was created or updated.
+        self.assertEqual(ClassPeriod.objects.get().max_student_count, 5)
+
+    def test_closed_days(self):
+        """Tests adding and removing closed days."""
+        closed_date = timezone.now().date() + timedelta(days=10)
+
+        response = self.client.post(
+            reverse("closed_days_form"),
+            {"date": str(closed_date), "description": "Snow day"},
+        )
+        self.assertRedirects(response, reverse("closed_days_form"))
+
+        response = self.client.get(reverse("closed_days_form"))
+        self.assertContains(response, "Snow day")
+
+        closed_day = ClosedDay.objects.get(date=closed_date)
+        response = self.client.post(
+            reverse("closed_day_delete", kwargs={"pk": closed_day.pk})
+        )
+        self.assertRedirects(response, reverse("closed_days_form"))
+        self.assertFalse(ClosedDay.objects.exists())
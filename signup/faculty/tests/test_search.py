@@ -0,0 +1,131 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from signup.models import (
+    LibraryFacultyMember,
+    Student,
+    StudentInfo,
+    User,
+    UserNamePrefix,
+    get_name_prefixes,
+)
+
+
+def search(text):
+    return list(
+        UserNamePrefix.objects.filter_by_name(User.objects.all(), text)
+        .order_by("email")
+        .values_list("email", flat=True)
+    )
+
+
+class TestNamePrefixes(TestCase):
+    """Tests :class:`signup.models.UserNamePrefix` and its manager."""
+
+    def setUp(self):
+        self.student = Student.objects.create_user(
+            email="student@myhchs.org", name="José García-López"
+        )
+        Student.objects.create_user(email="other@myhchs.org", name="Joseph Garrett")
+
+    def test_prefixes(self):
+        """Tests that names are split into lowercase words without accents."""
+        self.assertSetEqual(get_name_prefixes("Al Bé"), {"a", "al", "b", "be"})
+
+    def test_searching(self):
+        """Tests that every word searched for must start a word in the name."""
+        self.assertListEqual(search("jos"), ["other@myhchs.org", "student@myhchs.org"])
+        self.assertListEqual(search("JOSÉ"), ["other@myhchs.org", "student@myhchs.org"])
+        self.assertListEqual(search("jose lop"), ["student@myhchs.org"])
+        self.assertListEqual(search("gar garr"), ["other@myhchs.org"])
+        # Only the start of each word is matched.
+        self.assertListEqual(search("arcia"), [])
+        # Searching for nothing doesn't filter anything.
+        self.assertEqual(len(search(" - ")), 2)
+
+    def test_renaming(self):
+        """Tests that saving a user updates their prefixes, and that saving other
+        fields doesn't touch them."""
+        self.student.name = "Ana López"
+        self.student.save()
+        self.assertListEqual(search("jose"), ["other@myhchs.org"])
+        self.assertListEqual(search("ana lopez"), ["student@myhchs.org"])
+
+        with self.assertNumQueries(1):
+            self.student.save(update_fields=["last_login"])
+
+    def test_saving_without_renaming(self):
+        """Tests that saving a user doesn't fetch their name again to check if it
+        changed."""
+        student = Student.objects.get(pk=self.student.pk)
+        # Only the user is updated and their prefixes are fetched, inside a savepoint.
+        with self.assertNumQueries(4):
+            student.save()
+
+        # Users that weren't loaded from the database still fetch it.
+        student = Student(pk=self.student.pk, email=self.student.email, name="Ana")
+        student.save()
+        self.assertListEqual(search("ana"), ["student@myhchs.org"])
+
+    def test_rebuilding(self):
+        """Tests rebuilding the index after names are changed with update()."""
+        User.objects.filter(pk=self.student.pk).update(name="Ana")
+        self.assertListEqual(search("ana"), [])
+
+        stdout = StringIO()
+        call_command("rebuildnamesearch", stdout=stdout)
+
+        self.assertIn("The names of 2 users were indexed.", stdout.getvalue())
+        self.assertListEqual(search("ana"), ["student@myhchs.org"])
+        self.assertListEqual(search("jose"), ["other@myhchs.org"])
+
+
+class TestStudentSearchView(APITestCase):
+    """Tests :class:`signup.faculty.api.views.StudentSearchView`."""
+
+    def setUp(self):
+        student = Student.objects.create_user(
+            email="student1@myhchs.org", name="Alice Smith"
+        )
+        StudentInfo.objects.create(student=student, id="123456")
+        Student.objects.create_user(email="student2@myhchs.org", name="Alan Smithers")
+        self.library_faculty_member = LibraryFacultyMember.objects.create_user(
+            email="faculty@myhchs.org", name="Alex Librarian"
+        )
+        self.client.force_login(self.library_faculty_member)
+
+    def test_suggestions(self):
+        """Tests that only students whose names match are suggested."""
+        response = self.client.get(reverse("api-student-search"), {"q": "al smith"})
+        self.assertEqual(response.status_code, 200)
+        self.assertListEqual(
+            [student["name"] for student in response.data],
+            ["Alan Smithers", "Alice Smith"],
+        )
+        self.assertEqual(response.data[1]["student_id"], "123456")
+
+        response = self.client.get(reverse("api-student-search"), {"q": "alic"})
+        self.assertListEqual(
+            response.data,
+            [
+                {
+                    "id": response.data[0]["id"],
+                    "name": "Alice Smith",
+                    "email": "student1@myhchs.org",
+                    "student_id": "123456",
+                }
+            ],
+        )
+
+        response = self.client.get(reverse("api-student-search"), {"q": ""})
+        self.assertListEqual(response.data, [])
+
+    def test_students_cannot_search(self):
+        """Tests that students get an HTTP 403 error."""
+        self.client.force_login(Student.objects.get(email="student1@myhchs.org"))
+        response = self.client.get(reverse("api-student-search"), {"q": "al"})
+        self.assertEqual(response.status_code, 403)
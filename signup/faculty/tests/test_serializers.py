@@ -1,7 +1,10 @@
 from django.test import TestCase
 from django.utils import timezone
 
-from signup.faculty.api.serializers import ClassPeriodSignUpSerializer
+from signup.faculty.api.serializers import (
+    ClassPeriodSignUpSerializer,
+    serialize_values,
+)
 from signup.faculty.tests.common import convert_datetime
 from signup.models import ClassPeriod, ClassPeriodSignUp, Student, StudentInfo
 
@@ -135,3 +138,21 @@ class TestClassPeriodSignUpSerializer(TestCase):
                 "attendance_confirmed": True,
             },
         )
+
+    def test_serialize_values(self):
+        """Tests that :func:`signup.faculty.api.serializers.serialize_values` produces
+        the same data as the serializer, including for students without a
+        :class:`StudentInfo` and confirmed attendance, using one query."""
+        StudentInfo.objects.filter(student=self.signup2.student).delete()
+        self.signup1.attendance_confirmed = True
+        self.signup1.date_attendance_confirmed = self.now
+        self.signup1.save()
+
+        queryset = ClassPeriodSignUp.objects.order_by("id")
+        with self.assertNumQueries(1):
+            data = serialize_values(ClassPeriodSignUpSerializer(), queryset)
+
+        self.assertListEqual(
+            data, ClassPeriodSignUpSerializer(queryset, many=True).data
+        )
+        self.assertIsNone(data[1]["student_id"])
@@ -1,10 +1,25 @@
+from datetime import datetime
+from io import BytesIO
+
 from django.test import TestCase
 from django.utils import timezone
+from openpyxl import load_workbook
 
-from signup.faculty.api.spreadsheets import generate_spreadsheet
+from signup.faculty.api.spreadsheets import (
+    generate_analytics_spreadsheet,
+    generate_spreadsheet,
+)
 from signup.models import ClassPeriod, ClassPeriodSignUp, Student, StudentInfo
 
 
+def round_datetimes(values):
+    """Removes the (possibly rounded) microseconds from each datetime in ``values``."""
+    return [
+        value.replace(microsecond=0) if isinstance(value, datetime) else value
+        for value in values
+    ]
+
+
 class CommonTestLogicMixin:
     """Contains common logic for testing spreadsheet-related functionality."""
 
@@ -57,7 +72,9 @@ class TestSpreadsheetGeneration(CommonTestLogicMixin, TestCase):
     def test_generate_spreadsheet(self):
         """Tests that the generated spreadsheet contains the correct headings and rows
         for the ClassPeriodSignUps."""
-        workbook = generate_spreadsheet(ClassPeriodSignUp.objects.all())
+        with BytesIO() as file:
+            generate_spreadsheet(ClassPeriodSignUp.objects.all(), file, chunk_size=1)
+            workbook = load_workbook(file)
 
         # Checks that the workbook only contains one sheet.
         self.assertEqual(len(workbook.worksheets), 1)
@@ -84,34 +101,125 @@ class TestSpreadsheetGeneration(CommonTestLogicMixin, TestCase):
             ],
         )
 
+        # Excel doesn't store time zones or microseconds, and dates are read back as
+        # datetimes.
+        now = timezone.localtime(self.now).replace(tzinfo=None, microsecond=0)
+        midnight = now.replace(hour=0, minute=0, second=0)
+
         # Checks that the second row contains the first signup.
-        second_row_values = [cell.value for cell in rows[1]]
+        second_row_values = round_datetimes(cell.value for cell in rows[1])
         self.assertEqual(
             second_row_values,
             [
-                self.now.date(),
+                midnight,
                 1,
                 "Student1",
                 "123456",
                 "lunch",
-                timezone.localtime(self.now).replace(tzinfo=None),
+                now,
                 True,
-                timezone.localtime(self.now).replace(tzinfo=None),
+                now,
             ],
         )
 
         # Checks that the third row contains the second signup.
-        third_row_values = [cell.value for cell in rows[2]]
+        third_row_values = round_datetimes(cell.value for cell in rows[2])
         self.assertEqual(
             third_row_values,
             [
-                self.now.date(),
+                midnight,
                 2,
                 "Student2",
                 None,
                 "study hall",
-                timezone.localtime(self.now).replace(tzinfo=None),
+                now,
                 True,
-                timezone.localtime(self.now).replace(tzinfo=None),
+                now,
+            ],
+        )
+
+    def test_unconfirmed_attendance(self):
+        """Tests that the attendance confirmation date is left empty for sign-ups whose
+        attendance wasn't confirmed."""
+        ClassPeriodSignUp.objects.update(
+            attendance_confirmed=False, date_attendance_confirmed=None
+        )
+
+        with BytesIO() as file:
+            generate_spreadsheet(ClassPeriodSignUp.objects.all(), file)
+            workbook = load_workbook(file)
+
+        rows = list(workbook.active.values)
+        self.assertEqual(len(rows), 3)
+        self.assertListEqual([row[7] for row in rows[1:]], [None, None])
+
+
+class TestAnalyticsSpreadsheetGeneration(CommonTestLogicMixin, TestCase):
+    """Tests :func:`signup.faculty.spreadsheets.generate_analytics_spreadsheet`."""
+
+    def setUp(self):
+        super().setUp()
+        ClassPeriodSignUp.objects.filter(student__name="Student2").update(
+            attendance_confirmed=False, date_attendance_confirmed=None
+        )
+        # Nobody signed up for the third period.
+        ClassPeriod.objects.create(date=self.now, number=3, max_student_count=5)
+
+        with BytesIO() as file:
+            # One query lists the sign-ups, and each summary takes one more (plus one
+            # for the totals of the lunch vs. study hall split).
+            with self.assertNumQueries(6):
+                generate_analytics_spreadsheet(ClassPeriodSignUp.objects.all(), file)
+            self.workbook = load_workbook(file)
+
+        self.midnight = timezone.localtime(self.now).replace(
+            tzinfo=None, hour=0, minute=0, second=0, microsecond=0
+        )
+
+    def get_rows(self, title):
+        return [list(row) for row in self.workbook[title].values]
+
+    def test_sheets(self):
+        """Tests that the summaries are added after the list of sign-ups."""
+        self.assertListEqual(
+            self.workbook.sheetnames,
+            [
+                "Student Sign-Ups",
+                "Daily Totals",
+                "Period Fill Rates",
+                "Lunch vs. Study Hall",
+                "Student Attendance",
+            ],
+        )
+        self.assertEqual(len(self.get_rows("Student Sign-Ups")), 3)
+
+    def test_daily_totals(self):
+        self.assertListEqual(
+            self.get_rows("Daily Totals")[1:], [[self.midnight, 2, 1, 1, 1, 0.5]]
+        )
+
+    def test_period_fill_rates(self):
+        self.assertListEqual(
+            self.get_rows("Period Fill Rates")[1:],
+            [
+                [self.midnight, 1, 1, 10, 0.1],
+                [self.midnight, 2, 1, 10, 0.1],
+                [self.midnight, 3, 0, 5, 0],
+            ],
+        )
+
+    def test_reasons(self):
+        self.assertListEqual(
+            self.get_rows("Lunch vs. Study Hall")[1:],
+            [
+                [1, 1, 1, 0, 1, 0],
+                [2, 1, 0, 1, 0, 1],
+                ["All Periods", 2, 1, 1, 0.5, 0.5],
             ],
         )
+
+    def test_student_attendance(self):
+        self.assertListEqual(
+            self.get_rows("Student Attendance")[1:],
+            [["Student1", "123456", 1, 1, 1], ["Student2", None, 1, 0, 0]],
+        )
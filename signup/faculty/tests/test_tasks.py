@@ -1,13 +1,21 @@
-from datetime import timedelta
+from datetime import date, timedelta
+from unittest.mock import patch
 
 from django.test import TestCase
 from django.utils import timezone
 
-from signup.faculty.tasks import delete_old_periods_and_signups
-from signup.models import ClassPeriod, ClassPeriodSignUp, Student
+from signup.faculty.tasks import delete_class_periods, delete_old_periods_and_signups
+from signup.faculty.tests.common import TemporaryArchiveDirMixin
+from signup.models import (
+    ClassPeriod,
+    ClassPeriodSignUp,
+    SignUpDateVersion,
+    SignUpTombstone,
+    Student,
+)
 
 
-class TestTaskDependencies(TestCase):
+class TestTaskDependencies(TemporaryArchiveDirMixin, TestCase):
     """Tests the functions and methods that tasks in :mod:`signup.faculty.tasks` depend
     on."""
 
@@ -48,3 +56,67 @@ class TestTaskDependencies(TestCase):
         # future should remain.
         self.assertEqual(ClassPeriod.objects.get(), period2)
         self.assertEqual(ClassPeriodSignUp.objects.get(), signup2)
+
+
+class TestDeleteClassPeriods(TestCase):
+    """Tests :func:`signup.faculty.tasks.delete_class_periods`."""
+
+    def setUp(self):
+        self.dates = [date(2022, 4, 1), date(2022, 4, 4)]
+        for number in range(3):
+            student = Student.objects.create_user(email=f"student{number}@myhchs.org")
+            for period_date in self.dates:
+                period, _ = ClassPeriod.objects.get_or_create(
+                    date=period_date, number=1, defaults={"max_student_count": 10}
+                )
+                ClassPeriodSignUp.objects.create(
+                    student=student,
+                    class_period=period,
+                    reason=ClassPeriodSignUp.STUDY_HALL,
+                )
+
+        self.kept_period = ClassPeriod.objects.create(
+            date=date(2022, 9, 1), number=1, max_student_count=10
+        )
+        self.periods = ClassPeriod.objects.get_unordered_queryset().filter(
+            date__lte=date(2022, 7, 1)
+        )
+
+    def test_batches(self):
+        """Tests that the sign-ups and then the class periods are deleted in batches
+        with a pause after each one, and that their dates are reset instead of
+        creating tombstones."""
+        progress = []
+        with patch("signup.faculty.tasks.sleep") as sleep:
+            counts = delete_class_periods(
+                self.periods,
+                batch_size=2,
+                pause=0.5,
+                progress=lambda *counts: progress.append(counts),
+            )
+
+        self.assertEqual(counts, (6, 2))
+        self.assertListEqual(progress, [(2, 0), (4, 0), (6, 0), (6, 2)])
+        self.assertEqual(sleep.call_count, 4)
+        sleep.assert_called_with(0.5)
+
+        self.assertQuerySetEqual(ClassPeriod.objects.all(), [self.kept_period])
+        self.assertFalse(ClassPeriodSignUp.objects.exists())
+        self.assertFalse(SignUpTombstone.objects.exists())
+        for period_date in self.dates:
+            version, reset_version = SignUpDateVersion.objects.get_versions(period_date)
+            self.assertEqual(version, reset_version)
+
+    def test_resume(self):
+        """Tests that running it again after it was interrupted deletes the rest."""
+
+        def interrupt(signup_count, period_count):
+            raise KeyboardInterrupt
+
+        with self.assertRaises(KeyboardInterrupt):
+            delete_class_periods(self.periods, batch_size=4, progress=interrupt)
+        # The first batch was committed.
+        self.assertEqual(ClassPeriodSignUp.objects.count(), 2)
+
+        self.assertEqual(delete_class_periods(self.periods, batch_size=4), (2, 2))
+        self.assertQuerySetEqual(ClassPeriod.objects.all(), [self.kept_period])
@@ -3,10 +3,21 @@ from datetime import datetime
 from django.urls import include, path, register_converter
 
 from signup.faculty.views import (
+    ApplyScheduleTemplateFormView,
+    CancelClassPeriodsFormView,
     ClassPeriodsListView,
+    ClosedDayCreateView,
+    ClosedDayDeleteView,
     FutureClassPeriodsFormView,
+    ImportClassPeriodsFormView,
     IndexRedirectView,
+    KioskView,
+    PeriodCancellationStatusView,
+    ScheduleTemplateCapacitiesFormView,
+    ScheduleTemplateCreateView,
+    ScheduleTemplateListView,
     SettingsFormView,
+    SignUpEventsView,
     SignUpsView,
 )
 
@@ -38,6 +49,21 @@ urlpatterns = [
         FutureClassPeriodsFormView.as_view(),
         name="future_class_periods_new",
     ),
+    path(
+        "periods/import/",
+        ImportClassPeriodsFormView.as_view(),
+        name="import_class_periods",
+    ),
+    path(
+        "periods/cancel/",
+        CancelClassPeriodsFormView.as_view(),
+        name="cancel_class_periods",
+    ),
+    path(
+        "periods/cancel/<int:pk>/",
+        PeriodCancellationStatusView.as_view(),
+        name="period_cancellation_status",
+    ),
     path(
         "periods/<start_date>/",
         FutureClassPeriodsFormView.as_view(),
@@ -48,7 +74,39 @@ urlpatterns = [
         ClassPeriodsListView.as_view(future=False),
         name="past_class_periods_list",
     ),
+    path(
+        "schedules/",
+        ScheduleTemplateListView.as_view(),
+        name="schedule_templates_list",
+    ),
+    path(
+        "schedules/new/",
+        ScheduleTemplateCreateView.as_view(),
+        name="schedule_template_new",
+    ),
+    path(
+        "schedules/<int:pk>/",
+        ScheduleTemplateCapacitiesFormView.as_view(),
+        name="schedule_template_capacities",
+    ),
+    path(
+        "schedules/<int:pk>/apply/",
+        ApplyScheduleTemplateFormView.as_view(),
+        name="schedule_template_apply",
+    ),
+    path("closed-days/", ClosedDayCreateView.as_view(), name="closed_days_form"),
+    path(
+        "closed-days/<int:pk>/delete/",
+        ClosedDayDeleteView.as_view(),
+        name="closed_day_delete",
+    ),
     path("signups/", SignUpsView.as_view(), name="signups_app"),
+    path(
+        "signups/events/<signup_date>/",
+        SignUpEventsView.as_view(),
+        name="signup_events",
+    ),
+    path("kiosk/", KioskView.as_view(), name="kiosk"),
     path("settings/", SettingsFormView.as_view(), name="settings_form"),
     # API urls.
     path("api/", include("signup.faculty.api.urls")),
@@ -1,17 +1,59 @@
-from datetime import timedelta
+import asyncio
+from datetime import date
 from itertools import groupby, islice
 
+from asgiref.sync import sync_to_async
 from constance import config
 from django.conf import settings
 from django.contrib.auth.mixins import UserPassesTestMixin
 from django.contrib.messages.views import SuccessMessageMixin
+from django.core.exceptions import PermissionDenied
+from django.core.handlers.asgi import ASGIRequest
 from django.db import transaction
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse, reverse_lazy
 from django.utils import timezone
-from django.views.generic import FormView, ListView, RedirectView, TemplateView
-
-from signup.faculty.forms import FutureClassPeriodsForm, SettingsForm
-from signup.models import ClassPeriod, is_library_faculty_member
+from django.views.generic import (
+    CreateView,
+    DeleteView,
+    DetailView,
+    FormView,
+    ListView,
+    RedirectView,
+    TemplateView,
+    View,
+)
+
+from signup.events import format_event, get_backend, get_signups_channel
+from signup.faculty.api.pagination import KeysetPagination
+from signup.faculty.forms import (
+    ApplyScheduleTemplateForm,
+    CancelClassPeriodsForm,
+    ClosedDayForm,
+    FutureClassPeriodsForm,
+    ImportClassPeriodsForm,
+    ScheduleTemplateCapacitiesForm,
+    ScheduleTemplateForm,
+    SettingsForm,
+)
+from signup.faculty.imports import import_class_periods
+from signup.faculty.tasks import (
+    mark_closed,
+    restart_period_cancellation,
+    run_in_background,
+    run_period_cancellation,
+)
+from signup.models import (
+    ClassPeriod,
+    ClassPeriodSignUp,
+    ClosedDay,
+    PeriodCancellation,
+    ScheduleTemplate,
+    ScheduleTemplatePeriod,
+    SignUpDateVersion,
+    is_library_faculty_member,
+)
 
 
 class UserIsLibraryFacultyMemberMixin(UserPassesTestMixin):
@@ -34,6 +76,9 @@ class ClassPeriodsListView(UserIsLibraryFacultyMemberMixin, ListView):
     context_object_name = "periods_grouped"
     future = True
     paginate_by = 10
+    # Listing the class periods only reads, so it can use the replica (see
+    # signup.middleware.ReplicaMiddleware).
+    replica_actions = {"get"}
 
     def get_queryset(self):
         periods = ClassPeriod.objects.get_unordered_queryset()
@@ -124,7 +169,11 @@ class FutureClassPeriodsFormView(UserIsLibraryFacultyMemberMixin, FormView):
 
         context |= {
             "DEBUG": settings.DEBUG,
-            "script_data": {"start_date": start_date, "end_date": end_date},
+            "script_data": {
+                "start_date": start_date,
+                "end_date": end_date,
+                "preview_url": reverse("api-periods-preview"),
+            },
         }
 
         return context
@@ -147,39 +196,74 @@ class FutureClassPeriodsFormView(UserIsLibraryFacultyMemberMixin, FormView):
 
         return initial
 
+    def form_valid(self, form):
+        # Creates the missing ClassPeriods and updates the existing ones in batches.
+        with transaction.atomic():
+            ClassPeriod.objects.bulk_upsert(form.get_planned_periods(), batch_size=500)
+
+        return super().form_valid(form)
+
+
+class ImportClassPeriodsFormView(UserIsLibraryFacultyMemberMixin, FormView):
+    template_name = "signup/faculty/import_periods_form.html"
+    form_class = ImportClassPeriodsForm
+
+    def form_valid(self, form):
+        result = import_class_periods(
+            form.cleaned_data["file"],
+            form.cleaned_data["file"].name,
+            dry_run=form.cleaned_data["dry_run"],
+        )
+
+        # Shows the result on the same page instead of redirecting so that a dry run
+        # can be reviewed before the file is uploaded again.
+        return self.render_to_response(self.get_context_data(form=form, result=result))
+
+
+class CancelClassPeriodsFormView(UserIsLibraryFacultyMemberMixin, FormView):
+    template_name = "signup/faculty/cancel_periods_form.html"
+    form_class = CancelClassPeriodsForm
+
     def form_valid(self, form):
         start_date = form.cleaned_data["start_date"]
         end_date = form.cleaned_data["end_date"]
 
-        all_existing_periods = ClassPeriod.objects.filter(
-            date__gte=start_date, date__lte=end_date
+        cancellation = PeriodCancellation.objects.create(
+            start_date=start_date, end_date=end_date, requested_by=self.request.user
         )
 
-        number_range = range(1, config.MAX_PERIOD_NUMBER + 1)
+        if form.cleaned_data["mark_closed"]:
+            mark_closed(start_date, end_date, form.cleaned_data["description"])
 
-        with transaction.atomic():
-            for number in number_range:
-                all_existing_periods.filter(number=number).update(
-                    max_student_count=form.cleaned_data[f"period_{number}"]
-                )
+        sign_up_count = ClassPeriodSignUp.objects.filter(
+            class_period__date__gte=start_date, class_period__date__lte=end_date
+        ).count()
 
-            date_range = (
-                start_date + timedelta(days=x)
-                for x in range((end_date - start_date).days + 1)
-            )
-            to_create = (
-                ClassPeriod(
-                    date=date,
-                    number=number,
-                    max_student_count=form.cleaned_data[f"period_{number}"],
-                )
-                for date in date_range
-                for number in number_range
+        # Small cancellations finish quickly enough to run during the request. Larger
+        # ones run in the background, and their progress is shown on the status page.
+        if sign_up_count > settings.BACKGROUND_CANCELLATION_THRESHOLD:
+            run_in_background(
+                run_period_cancellation,
+                cancellation.pk,
+                task_name="Cancel Class Periods",
             )
+        else:
+            run_period_cancellation(cancellation.pk)
 
-            ClassPeriod.objects.bulk_create(to_create, ignore_conflicts=True)
+        return redirect("period_cancellation_status", pk=cancellation.pk)
 
-        return super().form_valid(form)
+
+class PeriodCancellationStatusView(UserIsLibraryFacultyMemberMixin, DetailView):
+    """Shows the progress of a cancellation. Cancellations that failed or were
+    interrupted can be restarted by sending a POST request."""
+
+    template_name = "signup/faculty/period_cancellation_status.html"
+    model = PeriodCancellation
+    context_object_name = "cancellation"
+
+    def post(self, request, *args, **kwargs):
+        restart_period_cancellation(self.get_object())
+        return redirect("period_cancellation_status", pk=kwargs["pk"])
 
 
 class SignUpsView(UserIsLibraryFacultyMemberMixin, TemplateView):
@@ -196,9 +280,22 @@ class SignUpsView(UserIsLibraryFacultyMemberMixin, TemplateView):
                 # requires an argument.
                 "individual_url": "/f/api/signups/",
                 "delete_multiple_signups": reverse("api-signups-delete-multiple"),
+                "delete_matching_signups": reverse("api-signups-delete-matching"),
+                "confirm_attendance_url": reverse("api-signups-confirm-attendance"),
                 "spreadsheet_url": reverse("api-signups-generate-spreadsheet"),
+                "export_url": reverse("api-signups-export"),
+                "analytics_url": reverse("api-signups-analytics"),
+                "changes_url": reverse("api-signups-changes"),
+                "student_search_url": reverse("api-student-search"),
+                "events_url": reverse(
+                    "signup_events", kwargs={"signup_date": "0000-00-00"}
+                ),
+                # How often (in milliseconds) to check for new sign-ups if the server
+                # can't push changes.
+                "sync_interval": 10000,
                 "default_date": timezone.now(),
                 "default_sort": "student__name",
+                "page_size": KeysetPagination.page_size,
             },
         }
 
@@ -234,3 +331,167 @@ class SettingsFormView(UserIsLibraryFacultyMemberMixin, SuccessMessageMixin, For
         config.LUNCH_PERIODS_END = data["lunch_periods_end"]
 
         return super().form_valid(form)
+
+
+class ScheduleTemplateListView(UserIsLibraryFacultyMemberMixin, ListView):
+    template_name = "signup/faculty/schedule_templates_list.html"
+    context_object_name = "templates"
+    queryset = ScheduleTemplate.objects.order_by("name")
+
+
+class ScheduleTemplateCreateView(UserIsLibraryFacultyMemberMixin, CreateView):
+    template_name = "signup/faculty/schedule_template_form.html"
+    form_class = ScheduleTemplateForm
+
+    def get_success_url(self):
+        return reverse("schedule_template_capacities", kwargs={"pk": self.object.pk})
+
+
+class ScheduleTemplateMixin:
+    """Retrieves the :class:`ScheduleTemplate` specified in the URL and passes it to
+    the form and the template."""
+
+    def dispatch(self, request, *args, **kwargs):
+        self.schedule_template = get_object_or_404(ScheduleTemplate, pk=kwargs["pk"])
+        return super().dispatch(request, *args, **kwargs)
+
+    def get_form_kwargs(self):
+        return super().get_form_kwargs() | {"schedule_template": self.schedule_template}
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["schedule_template"] = self.schedule_template
+        return context
+
+
+class ScheduleTemplateCapacitiesFormView(
+    UserIsLibraryFacultyMemberMixin, ScheduleTemplateMixin, FormView
+):
+    template_name = "signup/faculty/schedule_template_capacities_form.html"
+    form_class = ScheduleTemplateCapacitiesForm
+    success_url = reverse_lazy("schedule_templates_list")
+
+    def form_valid(self, form):
+        schedule_template = self.schedule_template
+        number_range = range(1, config.MAX_PERIOD_NUMBER + 1)
+
+        with transaction.atomic():
+            schedule_template.periods.all().delete()
+            ScheduleTemplatePeriod.objects.bulk_create(
+                ScheduleTemplatePeriod(
+                    template=schedule_template,
+                    day=day,
+                    number=number,
+                    max_student_count=form.cleaned_data[f"day_{day}_period_{number}"],
+                )
+                for day in range(schedule_template.day_count)
+                for number in number_range
+            )
+
+        return super().form_valid(form)
+
+
+class ApplyScheduleTemplateFormView(
+    UserIsLibraryFacultyMemberMixin, ScheduleTemplateMixin, FormView
+):
+    template_name = "signup/faculty/apply_schedule_template_form.html"
+    form_class = ApplyScheduleTemplateForm
+    success_url = reverse_lazy("future_class_periods_list")
+
+    def form_valid(self, form):
+        # The ClassPeriods were already generated when the form was validated, so they
+        # are inserted (or updated) in batches instead of one date at a time.
+        with transaction.atomic():
+            ClassPeriod.objects.bulk_upsert(form.planned_periods, batch_size=500)
+
+        return super().form_valid(form)
+
+
+class ClosedDayCreateView(UserIsLibraryFacultyMemberMixin, CreateView):
+    template_name = "signup/faculty/closed_days_form.html"
+    form_class = ClosedDayForm
+    success_url = reverse_lazy("closed_days_form")
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+
+        # Lists closed days today and in the future.
+        context["closed_days"] = ClosedDay.objects.filter(date__gte=timezone.now())
+
+        return context
+
+
+class ClosedDayDeleteView(UserIsLibraryFacultyMemberMixin, DeleteView):
+    model = ClosedDay
+    success_url = reverse_lazy("closed_days_form")
+    http_method_names = ["post"]
+
+
+class SignUpEventsView(View):
+    """Streams server-sent events to the sign-ups page whenever a sign-up on
+    ``signup_date`` is created, updated, or deleted. Each event contains the date's new
+    :class:`SignUpDateVersion`, which the page uses to fetch the changes.
+
+    Streams stay open indefinitely, so this only works when the project is served with
+    ASGI. Otherwise, HTTP 501 is returned, and the page checks for changes
+    periodically instead."""
+
+    async def get(self, request, signup_date):
+        # UserIsLibraryFacultyMemberMixin doesn't support asynchronous views.
+        if not is_library_faculty_member(await request.auser()):
+            raise PermissionDenied
+
+        try:
+            signup_date = date.fromisoformat(signup_date)
+        except ValueError:
+            raise Http404 from None
+
+        if not isinstance(request, ASGIRequest):
+            return HttpResponse(status=501)
+
+        response = StreamingHttpResponse(
+            self.stream_events(signup_date), content_type="text/event-stream"
+        )
+        response.headers["Cache-Control"] = "no-cache"
+        # Stops nginx from buffering the events.
+        response.headers["X-Accel-Buffering"] = "no"
+        return response
+
+    async def stream_events(self, signup_date):
+        async with get_backend().subscribe(
+            get_signups_channel(signup_date)
+        ) as subscription:
+            # Lets the page catch up on changes made before it subscribed.
+            version = await sync_to_async(SignUpDateVersion.objects.get_version)(
+                signup_date
+            )
+            yield format_event({"version": version, "reset": False})
+
+            while True:
+                try:
+                    message = await asyncio.wait_for(
+                        subscription.get(), settings.SIGNUP_EVENTS_KEEPALIVE_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                else:
+                    yield format_event(message)
+
+
+class KioskView(UserIsLibraryFacultyMemberMixin, TemplateView):
+    """Shows a page for checking in students by scanning their ID cards."""
+
+    template_name = "signup/faculty/kiosk.html"
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+
+        context |= {
+            "DEBUG": settings.DEBUG,
+            "script_data": {
+                "check_in_url": reverse("api-kiosk-check-in"),
+                "max_period_number": config.MAX_PERIOD_NUMBER,
+            },
+        }
+
+        return context
@@ -0,0 +1,203 @@
+from time import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+from django.urls import Resolver404, resolve
+from django.utils.cache import patch_vary_headers
+from django.utils.regex_helper import _lazy_re_compile
+
+from signup.routers import (
+    aiterate_from_replica,
+    iterate_from_replica,
+    read_from_replica,
+    replica_configured,
+)
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+re_accepts_brotli = _lazy_re_compile(r"\bbr\b")
+
+# Only API responses and text exports are compressed. HTML pages contain CSRF tokens,
+# which compression could leak (see the BREACH attack), and Excel spreadsheets and
+# event streams are already compressed or can't be buffered.
+COMPRESSED_CONTENT_TYPES = {"application/json", "text/csv", "application/jsonl"}
+
+# Brotli's default quality (11) is meant for static files and is far too slow for
+# responses that are compressed on every request.
+BROTLI_QUALITY = 5
+
+
+def compress_sequence_brotli(sequence):
+    compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+    for item in sequence:
+        # Each chunk is flushed so that the client receives it right away.
+        data = compressor.process(item) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+async def acompress_sequence_brotli(sequence):
+    compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+    async for item in sequence:
+        data = compressor.process(item) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """Compresses API responses and exports with Brotli if the client accepts it and
+    the brotli package is installed, or with gzip otherwise. Streaming responses are
+    compressed a chunk at a time."""
+
+    def process_response(self, request, response):
+        content_type = response.get("Content-Type", "").split(";")[0].strip()
+        if content_type not in COMPRESSED_CONTENT_TYPES:
+            return response
+
+        accept_encoding = request.META.get("HTTP_ACCEPT_ENCODING", "")
+        if brotli is None or not re_accepts_brotli.search(accept_encoding):
+            return super().process_response(request, response)
+
+        # The rest of this follows GZipMiddleware.process_response().
+        if not response.streaming and len(response.content) < 200:
+            return response
+        if response.has_header("Content-Encoding"):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = acompress_sequence_brotli(
+                    response.streaming_content
+                )
+            else:
+                response.streaming_content = compress_sequence_brotli(
+                    response.streaming_content
+                )
+            del response.headers["Content-Length"]
+        else:
+            compressed_content = brotli.compress(
+                response.content, quality=BROTLI_QUALITY
+            )
+            if len(compressed_content) >= len(response.content):
+                return response
+            response.content = compressed_content
+            response.headers["Content-Length"] = str(len(response.content))
+
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = "br"
+
+        return response
+
+
+# The session key storing the time until which the session's reads go to the primary
+# database.
+PRIMARY_PINNED_UNTIL_SESSION_KEY = "primary_pinned_until"
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+def reads_from_replica(request):
+    """Determines if the view that ``request`` is for may read from the replica. Views
+    opt in by listing the handlers (or for viewsets, the actions) that only read in
+    ``replica_actions``."""
+    if not replica_configured() or request.method not in SAFE_METHODS:
+        return False
+    try:
+        view_func = resolve(request.path_info, getattr(request, "urlconf", None)).func
+    except Resolver404:
+        return False
+
+    # DRF views store their class in cls, and Django views in view_class.
+    view_class = getattr(view_func, "cls", None) or getattr(
+        view_func, "view_class", None
+    )
+    method = request.method.lower()
+    handler = (getattr(view_func, "actions", None) or {}).get(method, method)
+    return handler in getattr(view_class, "replica_actions", ())
+
+
+def stream_from_replica(response):
+    """Makes the content of a streaming response, which is only generated after the
+    view returns, read from the replica too."""
+    if response.streaming and response.is_async:
+        response.streaming_content = aiterate_from_replica(response.streaming_content)
+    elif response.streaming:
+        response.streaming_content = iterate_from_replica(response.streaming_content)
+    return response
+
+
+def get_pinned_until():
+    return time() + settings.DATABASE_REPLICA_PIN_SECONDS
+
+
+class ReplicaMiddleware:
+    """Sends the reads of read-only faculty views to the replica, if one is configured
+    (see :class:`signup.routers.ReplicaRouter`).
+
+    The replica can lag behind the primary database, so after a session sends a
+    request that might write (anything but GET, HEAD, or OPTIONS), its requests read
+    from the primary database for ``DATABASE_REPLICA_PIN_SECONDS``. This way, users
+    always see their own changes.
+
+    The view is called inside :func:`signup.routers.read_from_replica`, so the context
+    variable is set and reset in the same context under both WSGI and ASGI."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        if (
+            reads_from_replica(request)
+            and request.session.get(PRIMARY_PINNED_UNTIL_SESSION_KEY, 0) <= time()
+        ):
+            # The user is loaded from the primary database, so a new account or login
+            # is never missing from the replica.
+            request.user.is_authenticated  # pylint: disable=pointless-statement
+            with read_from_replica():
+                response = self.get_response(request)
+            response = stream_from_replica(response)
+        else:
+            response = self.get_response(request)
+
+        if replica_configured() and request.method not in SAFE_METHODS:
+            request.session[PRIMARY_PINNED_UNTIL_SESSION_KEY] = get_pinned_until()
+        return response
+
+    async def __acall__(self, request):
+        if (
+            reads_from_replica(request)
+            and await request.session.aget(PRIMARY_PINNED_UNTIL_SESSION_KEY, 0)
+            <= time()
+        ):
+            # As in __call__(), the user is loaded from the primary database.
+            await request.auser()
+            with read_from_replica():
+                response = await self.get_response(request)
+            response = stream_from_replica(response)
+        else:
+            response = await self.get_response(request)
+
+        if replica_configured() and request.method not in SAFE_METHODS:
+            await request.session.aset(
+                PRIMARY_PINNED_UNTIL_SESSION_KEY, get_pinned_until()
+            )
+        return response
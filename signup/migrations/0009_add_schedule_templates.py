@@ -0,0 +1,109 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("signup", "0008_make_field_nullable_and_blank"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ClosedDay",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField(unique=True, verbose_name="date")),
+                (
+                    "description",
+                    models.CharField(
+                        blank=True, max_length=100, verbose_name="description"
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["date"],
+            },
+        ),
+        migrations.CreateModel(
+            name="ScheduleTemplate",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "name",
+                    models.CharField(max_length=100, unique=True, verbose_name="name"),
+                ),
+                (
+                    "template_type",
+                    models.CharField(
+                        choices=[("W", "weekly"), ("R", "rotating")],
+                        default="W",
+                        max_length=1,
+                        verbose_name="template type",
+                    ),
+                ),
+                (
+                    "rotation_length",
+                    models.PositiveSmallIntegerField(
+                        default=2, verbose_name="number of days in rotation"
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="ScheduleTemplatePeriod",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.PositiveSmallIntegerField(verbose_name="day")),
+                ("number", models.SmallIntegerField(verbose_name="period number")),
+                (
+                    "max_student_count",
+                    models.PositiveIntegerField(
+                        verbose_name="maximum students allowed"
+                    ),
+                ),
+                (
+                    "template",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="periods",
+                        to="signup.scheduletemplate",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("template", "day", "number"),
+                        name="unique_template_day_number",
+                    )
+                ],
+            },
+        ),
+    ]
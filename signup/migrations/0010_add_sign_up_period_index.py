@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("signup", "0009_add_schedule_templates"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="classperiodsignup",
+            index=models.Index(
+                fields=["class_period", "student"], name="sign_up_period_student_idx"
+            ),
+        ),
+    ]
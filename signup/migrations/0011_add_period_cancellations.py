@@ -0,0 +1,79 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:23
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("signup", "0010_add_sign_up_period_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PeriodCancellation",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("start_date", models.DateField(verbose_name="start date")),
+                ("end_date", models.DateField(verbose_name="end date")),
+                (
+                    "date_requested",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now, verbose_name="date requested"
+                    ),
+                ),
+                (
+                    "date_finished",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="date finished"
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("P", "pending"),
+                            ("R", "running"),
+                            ("F", "finished"),
+                            ("E", "failed"),
+                        ],
+                        default="P",
+                        max_length=1,
+                    ),
+                ),
+                (
+                    "sign_up_count",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="sign-ups to delete"
+                    ),
+                ),
+                (
+                    "deleted_sign_up_count",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="sign-ups deleted"
+                    ),
+                ),
+                (
+                    "requested_by",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("signup", "0012_add_sign_up_date_versions"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SignUpTombstone",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "signup_id",
+                    models.PositiveBigIntegerField(verbose_name="sign-up ID"),
+                ),
+                ("date", models.DateField(verbose_name="date")),
+                ("version", models.PositiveBigIntegerField(verbose_name="version")),
+            ],
+        ),
+        migrations.AddField(
+            model_name="classperiodsignup",
+            name="version",
+            field=models.PositiveBigIntegerField(
+                default=0, editable=False, verbose_name="version"
+            ),
+        ),
+        migrations.AddField(
+            model_name="signupdateversion",
+            name="reset_version",
+            field=models.PositiveBigIntegerField(
+                default=0, verbose_name="reset version"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="classperiodsignup",
+            index=models.Index(
+                fields=["class_period", "version"], name="sign_up_period_version_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="signuptombstone",
+            index=models.Index(
+                fields=["date", "version"], name="tombstone_date_version_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:01
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+from signup.models import get_name_prefixes
+
+
+def add_name_prefixes(apps, schema_editor):
+    User = apps.get_model("signup", "User")
+    UserNamePrefix = apps.get_model("signup", "UserNamePrefix")
+    UserNamePrefix.objects.bulk_create(
+        (
+            UserNamePrefix(user_id=pk, prefix=prefix)
+            for pk, name in User.objects.values_list("pk", "name").iterator()
+            for prefix in get_name_prefixes(name)
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("signup", "0013_add_sign_up_sync"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UserNamePrefix",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("prefix", models.CharField(max_length=20, verbose_name="prefix")),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="name_prefixes",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("prefix", "user"), name="user_name_prefix_unique"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(add_name_prefixes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,84 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:21
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("signup", "0015_add_outbox_emails"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SpreadsheetExport",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("query", models.TextField(blank=True, verbose_name="query")),
+                (
+                    "cache_key",
+                    models.CharField(
+                        db_index=True, max_length=64, verbose_name="cache key"
+                    ),
+                ),
+                (
+                    "date_requested",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now, verbose_name="date requested"
+                    ),
+                ),
+                (
+                    "date_finished",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="date finished"
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("P", "pending"),
+                            ("R", "running"),
+                            ("F", "finished"),
+                            ("E", "failed"),
+                        ],
+                        default="P",
+                        max_length=1,
+                    ),
+                ),
+                (
+                    "row_count",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="sign-ups to export"
+                    ),
+                ),
+                (
+                    "exported_row_count",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="sign-ups exported"
+                    ),
+                ),
+                (
+                    "requested_by",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("signup", "0016_add_spreadsheet_exports"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="periodcancellation",
+            name="date_updated",
+            field=models.DateTimeField(
+                blank=True, null=True, verbose_name="date updated"
+            ),
+        ),
+    ]
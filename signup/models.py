@@ -1,14 +1,25 @@
+import re
+import unicodedata
+from datetime import timedelta
+from functools import partial
+from itertools import islice
+
 from constance import config
+from django.conf import settings
 from django.contrib.auth.models import (
     AbstractBaseUser,
     BaseUserManager,
     PermissionsMixin,
 )
-from django.db import models
+from django.db import connections, models, transaction
+from django.db.models import F
 from django.db.models.constraints import UniqueConstraint
+from django.db.models.signals import post_delete, pre_delete
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
+from signup.events import publish_signup_versions
+
 
 class UserManager(BaseUserManager):
     def create_user(self, email, password=None, **kwargs):
@@ -43,6 +54,10 @@ class UserManager(BaseUserManager):
         )
 
 
+# Marks that the name a User was saved with isn't known yet.
+NAME_NOT_LOADED = object()
+
+
 class User(AbstractBaseUser, PermissionsMixin):
     objects = UserManager()
 
@@ -86,6 +101,51 @@ class User(AbstractBaseUser, PermissionsMixin):
         max_length=1, choices=USER_TYPES, default=default_user_type
     )
 
+    # The name that was last loaded from or saved to the database, or NAME_NOT_LOADED
+    # if it hasn't been (see get_saved_name()).
+    _saved_name = NAME_NOT_LOADED
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "name" not in update_fields:
+            # Saves such as updating last_login on every login stay a single query.
+            super().save(*args, **kwargs)
+            return
+
+        adding = self._state.adding
+        with transaction.atomic():
+            old_name = None if adding else self.get_saved_name()
+            super().save(*args, **kwargs)
+            # Keeps the name search index up to date (see UserNamePrefix).
+            UserNamePrefix.objects.set_prefixes(self, adding=adding)
+            if not adding and old_name != self.name:
+                touch_sign_ups(self.pk)
+        self._saved_name = self.name
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        user = super().from_db(db, field_names, values)
+        # Remembers the saved name so that save() can tell if it changed without
+        # fetching it again.
+        if "name" in field_names:
+            # pylint: disable-next=protected-access
+            user._saved_name = values[field_names.index("name")]
+        return user
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using, fields, from_queryset)
+        if fields is None or "name" in fields:
+            self._saved_name = self.name
+
+    def get_saved_name(self):
+        """Returns the name that was last saved to the database, which is only fetched
+        if the user wasn't loaded with it."""
+        if self._saved_name is NAME_NOT_LOADED:
+            self._saved_name = (
+                User.objects.filter(pk=self.pk).values_list("name", flat=True).first()
+            )
+        return self._saved_name
+
 
 class Student(User):
     class Meta:
@@ -102,6 +162,17 @@ class StudentInfo(models.Model):
     )
     id = models.CharField(_("student ID"), unique=True, max_length=6)
 
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            old_id = (
+                StudentInfo.objects.filter(student_id=self.student_id)
+                .values_list("id", flat=True)
+                .first()
+            )
+            super().save(*args, **kwargs)
+            if old_id is not None and old_id != self.id:
+                touch_sign_ups(self.student_id)
+
 
 # Function could have been part of Student proxy model, but then I would have difficulty
 # casting from a User object to a Student object without an additional database call.
@@ -127,13 +198,212 @@ def is_library_faculty_member(user):
     return user.is_authenticated and user.user_type == User.LIBRARY_FACULTY_MEMBER
 
 
-class ClassPeriodManager(models.Manager):
+# Longer words are only indexed (and searched) by their first characters.
+MAX_NAME_PREFIX_LENGTH = 20
+
+
+def get_name_words(name):
+    """Splits ``name`` into lowercase words without accents, so that searching for
+    "jose" finds "José"."""
+    decomposed = unicodedata.normalize("NFKD", name)
+    without_accents = "".join(
+        character for character in decomposed if not unicodedata.combining(character)
+    )
+    return re.findall(r"\w+", without_accents.casefold())
+
+
+def get_name_prefixes(name):
+    """Returns every prefix of every word in ``name`` (see :func:`get_name_words`)."""
+    return {
+        word[:length]
+        for word in get_name_words(name)
+        for length in range(1, min(len(word), MAX_NAME_PREFIX_LENGTH) + 1)
+    }
+
+
+class UserNamePrefixManager(models.Manager):
+    def set_prefixes(self, user, adding=False):
+        """Updates the prefixes of ``user`` to match their name. Only the prefixes that
+        changed are deleted or created. If ``adding`` is True, the user was just
+        created, so they don't have any prefixes yet."""
+        prefixes = get_name_prefixes(user.name)
+        existing = set()
+        if not adding:
+            existing = set(self.filter(user=user).values_list("prefix", flat=True))
+
+        if existing - prefixes:
+            self.filter(user=user, prefix__in=existing - prefixes).delete()
+        if prefixes - existing:
+            self.bulk_create(
+                self.model(user=user, prefix=prefix) for prefix in prefixes - existing
+            )
+
+    def rebuild(self, users, batch_size=1000):
+        """Replaces the prefixes of every user in the ``users`` queryset. This is needed
+        after names are changed without calling :meth:`User.save` (e.g. with
+        ``bulk_create()`` or ``update()``). Returns the number of users updated."""
+        rows = users.order_by("pk").values_list("pk", "name").iterator()
+        count = 0
+        while batch := list(islice(rows, batch_size)):
+            with transaction.atomic():
+                self.filter(user__in=[pk for pk, _ in batch]).delete()
+                self.bulk_create(
+                    (
+                        self.model(user_id=pk, prefix=prefix)
+                        for pk, name in batch
+                        for prefix in get_name_prefixes(name)
+                    ),
+                    batch_size=batch_size,
+                )
+            count += len(batch)
+        return count
+
+    def filter_by_name(self, queryset, text, user_field="pk"):
+        """Filters ``queryset`` to the rows whose user (``user_field``) has a name
+        containing a word that starts with each word in ``text``. Every word is found
+        with an indexed equality lookup instead of ``LIKE '%text%'``."""
+        for word in get_name_words(text):
+            user_ids = self.filter(prefix=word[:MAX_NAME_PREFIX_LENGTH]).values("user")
+            queryset = queryset.filter(**{f"{user_field}__in": user_ids})
+        return queryset
+
+
+class UserNamePrefix(models.Model):
+    """Indexes the start of each word in a user's name, so that users can be searched
+    by name (see :meth:`UserNamePrefixManager.filter_by_name`). Kept up to date by
+    :meth:`User.save`."""
+
+    class Meta:
+        constraints = [
+            UniqueConstraint(fields=["prefix", "user"], name="user_name_prefix_unique")
+        ]
+
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="name_prefixes"
+    )
+    prefix = models.CharField(_("prefix"), max_length=MAX_NAME_PREFIX_LENGTH)
+
+    objects = UserNamePrefixManager()
+
+
+class SignUpDateVersionManager(models.Manager):
+    def get_version(self, date):
+        """Returns the current version of the sign-ups on ``date``."""
+        return self.filter(date=date).values_list("version", flat=True).first() or 0
+
+    def get_versions(self, date):
+        """Returns the current version of the sign-ups on ``date`` and the version of
+        the last change that wasn't recorded sign-up by sign-up."""
+        return self.filter(date=date).values_list(
+            "version", "reset_version"
+        ).first() or (0, 0)
+
+    def bump(self, dates, reset=False):
+        """Increments the version of each date in ``dates`` and returns a dictionary
+        mapping each date to its new version. If ``reset`` is True, clients that synced
+        before this change must fetch every sign-up again.
+
+        This should be called in the same transaction as the change itself. The updated
+        rows stay locked until the transaction ends, so changes to the same date are
+        committed in the order of their versions."""
+        dates = set(dates)
+        if not dates:
+            return {}
+
+        self.bulk_create(
+            [SignUpDateVersion(date=date) for date in dates], ignore_conflicts=True
+        )
+        changes = {"version": F("version") + 1}
+        if reset:
+            changes["reset_version"] = F("version") + 1
+        self.filter(date__in=dates).update(**changes)
+
+        versions = dict(self.filter(date__in=dates).values_list("date", "version"))
+        # Faculty viewing these dates are only notified once the change is visible.
+        transaction.on_commit(
+            partial(publish_signup_versions, versions, reset), using=self.db
+        )
+        return versions
+
+    def get_total_version(self):
+        """Returns a number that changes whenever any sign-up changes. Each change
+        increments the version of one date, so the sum of every version only grows."""
+        return self.aggregate(total=models.Sum("version"))["total"] or 0
+
+    def bump_date(self, date, reset=False):
+        """Increments the version of ``date`` and returns its new version."""
+        self.bump([date], reset=reset)
+        return self.filter(date=date).values_list("version", flat=True).get()
+
+
+class SignUpDateVersion(models.Model):
+    """Stores a number that changes whenever a sign-up for a date is created, updated,
+    or deleted (or one of the date's class periods is deleted). This lets clients
+    check if the sign-ups for a date have changed without fetching them."""
+
+    objects = SignUpDateVersionManager()
+
+    date = models.DateField(_("date"), unique=True)
+    version = models.PositiveBigIntegerField(_("version"), default=0)
+    # Deleting class periods doesn't create a SignUpTombstone for each sign-up, so
+    # clients that synced before this version have to start over.
+    reset_version = models.PositiveBigIntegerField(_("reset version"), default=0)
+
+
+class SignUpTombstone(models.Model):
+    """Records that a sign-up was deleted, so that clients syncing the sign-ups for a
+    date can remove it."""
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["date", "version"], name="tombstone_date_version_idx")
+        ]
+
+    signup_id = models.PositiveBigIntegerField(_("sign-up ID"))
+    date = models.DateField(_("date"))
+    version = models.PositiveBigIntegerField(_("version"))
+
+
+class ClassPeriodQuerySet(models.QuerySet):
+    def delete(self):
+        # Deleting a class period also deletes its sign-ups. Their tombstones would
+        # take as long to create as the sign-ups themselves, so the dates are reset
+        # instead.
+        with transaction.atomic():
+            dates = set(self.order_by().values_list("date", flat=True).distinct())
+            SignUpDateVersion.objects.bump(dates, reset=True)
+            SignUpTombstone.objects.filter(date__in=dates).delete()
+            return super().delete()
+
+
+class ClassPeriodManager(models.Manager.from_queryset(ClassPeriodQuerySet)):
     def get_queryset(self):
         return super().get_queryset().order_by("number")
 
     def get_unordered_queryset(self):
         return super().get_queryset()
 
+    def bulk_upsert(self, periods, batch_size=None):
+        """Creates the ClassPeriods in ``periods``. If a ClassPeriod with the same date
+        and number already exists, its ``max_student_count`` is updated instead. This is
+        done with one ``INSERT ... ON CONFLICT``/``ON DUPLICATE KEY UPDATE`` statement
+        per batch."""
+        # MySQL determines the conflicting rows by itself and refuses to accept
+        # unique_fields, while SQLite and PostgreSQL require it.
+        features = connections[self.db].features
+        unique_fields = (
+            ["date", "number"]
+            if features.supports_update_conflicts_with_target
+            else None
+        )
+        return self.bulk_create(
+            periods,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=unique_fields,
+            update_fields=["max_student_count"],
+        )
+
 
 class ClassPeriod(models.Model):
     """Represents a class period that students could potentially sign up for."""
@@ -152,6 +422,12 @@ class ClassPeriod(models.Model):
     number = models.SmallIntegerField(_("period number"))
     max_student_count = models.PositiveIntegerField(_("maximum students allowed"))
 
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            SignUpDateVersion.objects.bump([self.date], reset=True)
+            SignUpTombstone.objects.filter(date=self.date).delete()
+            return super().delete(*args, **kwargs)
+
     def is_lunch_period(self):
         return config.LUNCH_PERIODS_START <= self.number <= config.LUNCH_PERIODS_END
 
@@ -159,6 +435,63 @@ class ClassPeriod(models.Model):
         return f"Period {self.number} on {self.date.strftime('%m/%d/%Y')}"
 
 
+class ClassPeriodSignUpQuerySet(models.QuerySet):
+    """Keeps the :class:`SignUpDateVersion` of each affected date (and the version of
+    each sign-up) up to date when sign-ups are updated or deleted in bulk."""
+
+    def get_dates(self):
+        return self.order_by().values_list("class_period__date", flat=True).distinct()
+
+    def update(self, **kwargs):
+        with transaction.atomic():
+            versions = SignUpDateVersion.objects.bump(self.get_dates())
+
+            # Sign-ups on different dates get different versions.
+            updated = 0
+            for date, version in versions.items():
+                updated += super(
+                    ClassPeriodSignUpQuerySet, self.filter(class_period__date=date)
+                ).update(version=version, **kwargs)
+            return updated
+
+    def delete(self):
+        with transaction.atomic():
+            signups = list(self.order_by().values_list("pk", "class_period__date"))
+            versions = SignUpDateVersion.objects.bump(date for _, date in signups)
+            SignUpTombstone.objects.bulk_create(
+                (
+                    SignUpTombstone(signup_id=pk, date=date, version=versions[date])
+                    for pk, date in signups
+                ),
+                batch_size=1000,
+            )
+            return super().delete()
+
+    def delete_resetting_versions(self):
+        """Deletes the sign-ups without creating a :class:`SignUpTombstone` for each of
+        them, like deleting their class periods. Clients syncing their dates must fetch
+        every sign-up again instead. This is much faster when deleting old sign-ups in
+        bulk."""
+        with transaction.atomic():
+            SignUpDateVersion.objects.bump(self.get_dates(), reset=True)
+            return super().delete()
+
+
+class ClassPeriodSignUpManager(models.Manager.from_queryset(ClassPeriodSignUpQuerySet)):
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        with transaction.atomic():
+            dates = dict(
+                ClassPeriod.objects.get_unordered_queryset()
+                .filter(pk__in={signup.class_period_id for signup in objs})
+                .values_list("pk", "date")
+            )
+            versions = SignUpDateVersion.objects.bump(dates.values())
+            for signup in objs:
+                signup.version = versions[dates[signup.class_period_id]]
+            return super().bulk_create(objs, *args, **kwargs)
+
+
 class ClassPeriodSignUp(models.Model):
     """
     Represents a student signing up for a specific class period. Also requires student
@@ -173,6 +506,17 @@ class ClassPeriodSignUp(models.Model):
                 name="unique_sign_up_class_period",
             )
         ]
+        indexes = [
+            # Lets sign-ups be counted/listed per class period using only the index
+            # (the unique constraint above starts with the student instead).
+            models.Index(
+                fields=["class_period", "student"], name="sign_up_period_student_idx"
+            ),
+            # Used to find the sign-ups that changed since a client last synced.
+            models.Index(
+                fields=["class_period", "version"], name="sign_up_period_version_idx"
+            ),
+        ]
 
     student = models.ForeignKey(
         Student, on_delete=models.CASCADE, related_name="sign_ups"
@@ -194,14 +538,278 @@ class ClassPeriodSignUp(models.Model):
 
     reason = models.CharField(max_length=1, choices=REASON_TYPES)
 
+    objects = ClassPeriodSignUpManager()
+
+    # The version of the sign-up's date (see SignUpDateVersion) when it last changed.
+    version = models.PositiveBigIntegerField(_("version"), default=0, editable=False)
+
     # Allows library faculty to confirm that a student showed up to the library.
     attendance_confirmed = models.BooleanField(_("attendance confirmed"), default=False)
     date_attendance_confirmed = models.DateTimeField(
         _("date attendance was confirmed"), null=True, blank=True
     )
 
+    def save(self, *args, **kwargs):
+        if kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = {*kwargs["update_fields"], "version"}
+
+        with transaction.atomic():
+            self.version = SignUpDateVersion.objects.bump_date(self.class_period.date)
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        date = self.class_period.date
+        with transaction.atomic():
+            version = SignUpDateVersion.objects.bump_date(date)
+            SignUpTombstone.objects.create(
+                signup_id=self.pk, date=date, version=version
+            )
+            return super().delete(*args, **kwargs)
+
     def __str__(self):
         return (
             f"{self.student} sign up for period {self.class_period.number} on "
             f"{self.class_period.date.strftime('%m/%d/%Y')}"
         )
+
+
+def touch_sign_ups(student_id):
+    """Gives the sign-ups of the student with ``student_id`` new versions (see
+    :class:`SignUpDateVersion`). The student's name and ID are part of each sign-up in
+    the faculty API and in exports, so this must be called when they change."""
+    ClassPeriodSignUp.objects.filter(student_id=student_id).update()
+
+
+def delete_sign_ups_of_user(sender, instance, **kwargs):
+    """Deletes the sign-ups of a user who is about to be deleted, so that tombstones
+    are created for them instead of the cascade deleting them without changing the
+    versions of their dates."""
+    ClassPeriodSignUp.objects.filter(student_id=instance.pk).delete()
+
+
+def touch_sign_ups_of_student_info(sender, instance, **kwargs):
+    touch_sign_ups(instance.student_id)
+
+
+# The senders are listed so that deleting other models can still skip the signals.
+for user_model in (User, Student, LibraryFacultyMember):
+    pre_delete.connect(delete_sign_ups_of_user, sender=user_model)
+# Without its StudentInfo, a student's sign-ups no longer have a student ID.
+post_delete.connect(touch_sign_ups_of_student_info, sender=StudentInfo)
+
+
+class ClosedDay(models.Model):
+    """Represents a day that the school is closed (such as a holiday). Schedule
+    templates will not create class periods on these days."""
+
+    class Meta:
+        ordering = ["date"]
+
+    date = models.DateField(_("date"), unique=True)
+    description = models.CharField(_("description"), max_length=100, blank=True)
+
+    def __str__(self):
+        return f"Closed on {self.date.strftime('%m/%d/%Y')}"
+
+
+class ScheduleTemplate(models.Model):
+    """Stores a named set of maximum student counts that can be applied to a range of
+    dates at once. A weekly template has a set of counts for each weekday, while a
+    rotating template cycles through its days (e.g. A/B/C days) on each school day."""
+
+    # The days of a weekly template are Monday through Friday.
+    WEEKLY = "W"
+    ROTATING = "R"
+
+    TEMPLATE_TYPES = [
+        (WEEKLY, _("weekly")),
+        (ROTATING, _("rotating")),
+    ]
+
+    WEEKDAY_NAMES = [
+        _("Monday"),
+        _("Tuesday"),
+        _("Wednesday"),
+        _("Thursday"),
+        _("Friday"),
+    ]
+
+    name = models.CharField(_("name"), max_length=100, unique=True)
+    template_type = models.CharField(
+        _("template type"), max_length=1, choices=TEMPLATE_TYPES, default=WEEKLY
+    )
+    # Only used by rotating templates.
+    rotation_length = models.PositiveSmallIntegerField(
+        _("number of days in rotation"), default=2
+    )
+
+    @property
+    def day_count(self):
+        """The number of days that the template has maximum student counts for."""
+        if self.template_type == self.WEEKLY:
+            return len(self.WEEKDAY_NAMES)
+        return self.rotation_length
+
+    def day_name(self, day):
+        """Returns a readable name for ``day``, which starts from zero."""
+        if self.template_type == self.WEEKLY:
+            return self.WEEKDAY_NAMES[day]
+        return f"Day {day + 1}"
+
+    def __str__(self):
+        return self.name
+
+
+class ScheduleTemplatePeriod(models.Model):
+    """Stores the maximum student count of a specific period on one of the days of a
+    :class:`ScheduleTemplate`."""
+
+    class Meta:
+        constraints = [
+            UniqueConstraint(
+                fields=["template", "day", "number"],
+                name="unique_template_day_number",
+            )
+        ]
+
+    template = models.ForeignKey(
+        ScheduleTemplate, on_delete=models.CASCADE, related_name="periods"
+    )
+    # For weekly templates, zero is Monday. For rotating templates, zero is the first
+    # day of the rotation.
+    day = models.PositiveSmallIntegerField(_("day"))
+    number = models.SmallIntegerField(_("period number"))
+    max_student_count = models.PositiveIntegerField(_("maximum students allowed"))
+
+
+class PeriodCancellation(models.Model):
+    """Tracks the cancellation of every class period in a range of dates (for example,
+    because of a snow day). Sign-ups are deleted in batches, so the progress is stored
+    here while the cancellation runs. ``date_updated`` is set after each batch, so a
+    cancellation that was interrupted without being marked as failed can be detected
+    and restarted."""
+
+    PENDING = "P"
+    RUNNING = "R"
+    FINISHED = "F"
+    FAILED = "E"
+
+    STATUSES = [
+        (PENDING, _("pending")),
+        (RUNNING, _("running")),
+        (FINISHED, _("finished")),
+        (FAILED, _("failed")),
+    ]
+
+    start_date = models.DateField(_("start date"))
+    end_date = models.DateField(_("end date"))
+    requested_by = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+    date_requested = models.DateTimeField(_("date requested"), default=timezone.now)
+    date_finished = models.DateTimeField(_("date finished"), null=True, blank=True)
+    date_updated = models.DateTimeField(_("date updated"), null=True, blank=True)
+    status = models.CharField(max_length=1, choices=STATUSES, default=PENDING)
+    sign_up_count = models.PositiveIntegerField(_("sign-ups to delete"), default=0)
+    deleted_sign_up_count = models.PositiveIntegerField(
+        _("sign-ups deleted"), default=0
+    )
+
+    @property
+    def is_done(self):
+        return self.status in (self.FINISHED, self.FAILED)
+
+    @property
+    def is_stale(self):
+        """Whether the cancellation is pending or running but hasn't made progress for
+        ``PERIOD_CANCELLATION_STALE_SECONDS``."""
+        if self.is_done:
+            return False
+        last_update = self.date_updated or self.date_requested
+        return timezone.now() - last_update > timedelta(
+            seconds=settings.PERIOD_CANCELLATION_STALE_SECONDS
+        )
+
+    @property
+    def can_restart(self):
+        return self.status == self.FAILED or self.is_stale
+
+    @property
+    def percent_done(self):
+        if self.status == self.FINISHED:
+            return 100
+        if not self.sign_up_count:
+            return 0
+        return self.deleted_sign_up_count * 100 // self.sign_up_count
+
+
+class SpreadsheetExport(models.Model):
+    """Tracks the export of the sign-ups matching a set of filters to a spreadsheet,
+    which runs in the background. Finished spreadsheets are cached on disk under a key
+    that changes when the filters or the sign-ups change, so exporting the same sign-ups
+    again reuses the file."""
+
+    PENDING = "P"
+    RUNNING = "R"
+    FINISHED = "F"
+    FAILED = "E"
+
+    STATUSES = [
+        (PENDING, _("pending")),
+        (RUNNING, _("running")),
+        (FINISHED, _("finished")),
+        (FAILED, _("failed")),
+    ]
+
+    # The normalized query string containing the filters.
+    query = models.TextField(_("query"), blank=True)
+    cache_key = models.CharField(_("cache key"), max_length=64, db_index=True)
+    requested_by = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+    date_requested = models.DateTimeField(_("date requested"), default=timezone.now)
+    date_finished = models.DateTimeField(_("date finished"), null=True, blank=True)
+    status = models.CharField(max_length=1, choices=STATUSES, default=PENDING)
+    row_count = models.PositiveIntegerField(_("sign-ups to export"), default=0)
+    exported_row_count = models.PositiveIntegerField(_("sign-ups exported"), default=0)
+
+    @property
+    def is_done(self):
+        return self.status in (self.FINISHED, self.FAILED)
+
+    @property
+    def percent_done(self):
+        if self.status == self.FINISHED:
+            return 100
+        if not self.row_count:
+            return 0
+        return self.exported_row_count * 100 // self.row_count
+
+
+class OutboxEmail(models.Model):
+    """Stores an email until it is sent. Emails are saved in the same transaction as
+    the change they describe and sent afterwards in the background (see
+    :func:`signup.faculty.notifications.send_outbox_emails`)."""
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["date_sent", "next_attempt"], name="outbox_email_pending_idx"
+            )
+        ]
+
+    subject = models.CharField(_("subject"), max_length=255)
+    body = models.TextField(_("body"))
+    # Blank if the default sender (DEFAULT_FROM_EMAIL) should be used.
+    from_email = models.CharField(_("from"), max_length=254, blank=True)
+    recipient = models.EmailField(_("recipient"))
+    date_created = models.DateTimeField(_("date created"), default=timezone.now)
+
+    # The email isn't sent (or retried) before this time.
+    next_attempt = models.DateTimeField(_("next attempt"), default=timezone.now)
+    attempts = models.PositiveIntegerField(_("failed attempts"), default=0)
+    last_error = models.TextField(_("last error"), blank=True)
+    date_sent = models.DateTimeField(_("date sent"), null=True, blank=True)
+
+    def __str__(self):
+        return f'"{self.subject}" to {self.recipient}'
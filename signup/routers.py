@@ -0,0 +1,66 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+# The alias of the read replica in settings.DATABASES. The replica is optional.
+REPLICA_DB_ALIAS = "replica"
+
+reading_from_replica = ContextVar("reading_from_replica", default=False)
+
+
+def replica_configured():
+    return REPLICA_DB_ALIAS in settings.DATABASES
+
+
+@contextmanager
+def read_from_replica():
+    """Sends the reads in the block to the replica, if one is configured. Writes still
+    go to the primary database."""
+    token = reading_from_replica.set(True)
+    try:
+        yield
+    finally:
+        reading_from_replica.reset(token)
+
+
+def iterate_from_replica(iterable):
+    """Iterates over ``iterable`` while reading from the replica. This is used for
+    streaming responses, whose content is only generated after the view returns."""
+    with read_from_replica():
+        yield from iterable
+
+
+async def aiterate_from_replica(iterable):
+    """Like :func:`iterate_from_replica`, for asynchronous streaming responses."""
+    with read_from_replica():
+        async for item in iterable:
+            yield item
+
+
+class ReplicaRouter:
+    """Routes reads to the replica inside :func:`read_from_replica` (which
+    :class:`signup.middleware.ReplicaMiddleware` uses for read-only faculty views) and
+    everything else to the primary database. If no replica is configured, every query
+    goes to the primary database."""
+
+    # The signatures are Django's, and _state.db is the documented way to find the
+    # database an object was loaded from.
+    # pylint: disable=unused-argument,protected-access
+
+    def db_for_read(self, model, **hints):
+        if reading_from_replica.get() and replica_configured():
+            return REPLICA_DB_ALIAS
+        return None
+
+    def db_for_write(self, model, **hints):
+        # Objects read from the replica are saved to the primary database too.
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica has the same data as the primary database.
+        databases = {DEFAULT_DB_ALIAS, REPLICA_DB_ALIAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
@@ -0,0 +1,87 @@
+import gzip
+from unittest import mock, skipIf
+
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase
+
+from signup import middleware
+from signup.middleware import CompressionMiddleware
+
+CONTENT = b'{"signups": [' + b", ".join([b'{"name": "Student"}'] * 100) + b"]}"
+
+
+class TestCompressionMiddleware(SimpleTestCase):
+    """Tests :class:`signup.middleware.CompressionMiddleware`."""
+
+    def get_response(
+        self, accept_encoding, content_type="application/json", streaming=False
+    ):
+        request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING=accept_encoding)
+        if streaming:
+            response = StreamingHttpResponse(
+                [CONTENT[:100], CONTENT[100:]], content_type=content_type
+            )
+        else:
+            response = HttpResponse(CONTENT, content_type=content_type)
+            response["ETag"] = '"version"'
+        return CompressionMiddleware(lambda request: response)(request)
+
+    def test_gzip(self):
+        """Tests that responses are compressed with gzip if Brotli isn't accepted."""
+        response = self.get_response("gzip, deflate")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+        self.assertEqual(response["ETag"], 'W/"version"')
+        self.assertEqual(gzip.decompress(response.content), CONTENT)
+
+    @skipIf(middleware.brotli is None, "brotli isn't installed.")
+    def test_brotli(self):
+        """Tests that Brotli is preferred if it is accepted."""
+        response = self.get_response("gzip, deflate, br")
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertEqual(response["ETag"], 'W/"version"')
+        self.assertEqual(middleware.brotli.decompress(response.content), CONTENT)
+
+    @skipIf(middleware.brotli is None, "brotli isn't installed.")
+    def test_brotli_streaming(self):
+        """Tests that streaming responses (such as CSV exports) are compressed a chunk
+        at a time."""
+        response = self.get_response("br", content_type="text/csv", streaming=True)
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertEqual(
+            middleware.brotli.decompress(b"".join(response.streaming_content)),
+            CONTENT,
+        )
+
+    @skipIf(middleware.brotli is None, "brotli isn't installed.")
+    async def test_brotli_async_streaming(self):
+        """Tests that asynchronous streaming responses (such as exports served with
+        ASGI) are compressed a chunk at a time."""
+
+        async def stream():
+            yield CONTENT[:100]
+            yield CONTENT[100:]
+
+        request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING="br")
+        response = StreamingHttpResponse(stream(), content_type="text/csv")
+        response = CompressionMiddleware(lambda request: response)(request)
+        self.assertTrue(response.is_async)
+        self.assertEqual(response["Content-Encoding"], "br")
+        chunks = [chunk async for chunk in response.streaming_content]
+        self.assertEqual(middleware.brotli.decompress(b"".join(chunks)), CONTENT)
+
+    def test_without_brotli(self):
+        """Tests that gzip is used if the brotli package isn't installed."""
+        with mock.patch.object(middleware, "brotli", None):
+            response = self.get_response("gzip, br")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+
+    def test_not_accepted(self):
+        response = self.get_response("identity")
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual(response.content, CONTENT)
+
+    def test_html(self):
+        """Tests that HTML pages, which contain CSRF tokens, aren't compressed."""
+        response = self.get_response("gzip, br", content_type="text/html")
+        self.assertFalse(response.has_header("Content-Encoding"))
@@ -0,0 +1,206 @@
+from datetime import timedelta
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.db import connections
+from django.test import SimpleTestCase, TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from signup import middleware
+from signup.models import (
+    ClassPeriod,
+    ClassPeriodSignUp,
+    LibraryFacultyMember,
+    Student,
+    StudentInfo,
+)
+from signup.routers import REPLICA_DB_ALIAS, ReplicaRouter, read_from_replica
+
+# The replica is only a separate database with project.replica_test_settings. A
+# replica configured with DB_REPLICA_HOST mirrors the primary database during tests.
+REPLICA_TEST_SETTINGS = settings.DATABASES.get(REPLICA_DB_ALIAS, {}).get("TEST", {})
+SEPARATE_REPLICA = REPLICA_DB_ALIAS in settings.DATABASES and not (
+    REPLICA_TEST_SETTINGS.get("MIRROR")
+)
+
+
+@skipUnless(SEPARATE_REPLICA, "Requires project.replica_test_settings.")
+class TestReplicaRouting(TransactionTestCase):
+    """Tests :class:`signup.routers.ReplicaRouter` and
+    :class:`signup.middleware.ReplicaMiddleware`. The replica only receives the data
+    of the primary database when :meth:`replicate` is called, so data created after
+    that is only visible in responses read from the primary database."""
+
+    databases = "__all__"
+
+    def setUp(self):
+        self.faculty_member = LibraryFacultyMember.objects.create_user(
+            email="faculty@myhchs.org", password="12345"
+        )
+        self.client.force_login(self.faculty_member)
+
+        self.today = timezone.localdate(timezone.now())
+        self.period = ClassPeriod.objects.create(
+            date=self.today, number=1, max_student_count=10
+        )
+        self.signup = ClassPeriodSignUp.objects.create(
+            student=self.create_student(1),
+            class_period=self.period,
+            reason=ClassPeriodSignUp.STUDY_HALL,
+        )
+        self.replicate()
+
+        # Not replicated yet.
+        ClassPeriodSignUp.objects.create(
+            student=self.create_student(2),
+            class_period=self.period,
+            reason=ClassPeriodSignUp.LUNCH,
+        )
+
+    def create_student(self, number):
+        student = Student.objects.create_user(
+            email=f"student{number}@myhchs.org", name=f"Student{number}"
+        )
+        StudentInfo.objects.create(student=student, id=f"{number:06}")
+        return student
+
+    def replicate(self):
+        """Copies the primary database to the replica."""
+        for alias in ("default", REPLICA_DB_ALIAS):
+            connections[alias].ensure_connection()
+        connections["default"].connection.backup(
+            connections[REPLICA_DB_ALIAS].connection
+        )
+
+    def list_signups(self):
+        response = self.client.get(
+            reverse("api-signups-list") + f"?class_period__date={self.today}"
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_list_reads_from_replica(self):
+        self.assertEqual(len(self.list_signups()), 1)
+
+        self.replicate()
+        self.assertEqual(len(self.list_signups()), 2)
+
+    def test_class_periods_list_reads_from_replica(self):
+        ClassPeriod.objects.create(
+            date=self.today + timedelta(days=1), number=1, max_student_count=10
+        )
+
+        response = self.client.get(reverse("future_class_periods_list"))
+        self.assertEqual(response.context["paginator"].count, 1)
+
+    def test_csv_export_reads_from_replica(self):
+        """Tests that streamed exports, which are generated after the view returns,
+        still read from the replica."""
+        response = self.client.get(
+            reverse("api-signups-generate-spreadsheet")
+            + f"?class_period__date={self.today}&format=csv"
+        )
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 2)
+
+    async def test_asgi_csv_export_reads_from_replica(self):
+        """Tests that exports streamed asynchronously under ASGI read from the replica
+        too."""
+        await self.async_client.aforce_login(self.faculty_member)
+        response = await self.async_client.get(
+            reverse("api-signups-generate-spreadsheet")
+            + f"?class_period__date={self.today}&format=csv"
+        )
+        self.assertTrue(response.is_async)
+        chunks = [chunk async for chunk in response.streaming_content]
+        self.assertEqual(len(b"".join(chunks).decode().splitlines()), 2)
+
+    def test_other_actions_read_from_primary(self):
+        response = self.client.get(
+            reverse("api-signups-changes") + f"?class_period__date={self.today}&since=0"
+        )
+        self.assertEqual(len(response.json()["changed"]), 2)
+
+    def test_read_your_writes(self):
+        """Tests that a session reads from the primary database for a while after
+        sending a request that might write."""
+        response = self.client.post(
+            reverse("api-signups-confirm-attendance")
+            + f"?class_period__date={self.today}",
+            {"attendance_confirmed": True},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+
+        signups = self.list_signups()
+        self.assertEqual(len(signups), 2)
+        self.assertTrue(all(signup["attendance_confirmed"] for signup in signups))
+
+        # Another session still reads from the replica.
+        self.client.logout()
+        self.client.force_login(self.faculty_member)
+        self.assertEqual(len(self.list_signups()), 1)
+
+    def test_pin_expires(self):
+        self.client.post(
+            reverse("api-signups-confirm-attendance")
+            + f"?class_period__date={self.today}",
+            {"attendance_confirmed": True},
+            content_type="application/json",
+        )
+
+        later = middleware.time() + settings.DATABASE_REPLICA_PIN_SECONDS + 1
+        with mock.patch.object(middleware, "time", return_value=later):
+            self.assertEqual(len(self.list_signups()), 1)
+
+    async def test_asgi(self):
+        """Tests reading from the replica and pinning sessions to the primary database
+        under ASGI, where the view runs in a different context than the middleware's
+        hooks."""
+        url = reverse("api-signups-list") + f"?class_period__date={self.today}"
+        await self.async_client.aforce_login(self.faculty_member)
+        response = await self.async_client.get(url)
+        self.assertEqual(len(response.json()), 1)
+
+        response = await self.async_client.post(
+            reverse("api-signups-confirm-attendance")
+            + f"?class_period__date={self.today}",
+            {"attendance_confirmed": True},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        response = await self.async_client.get(url)
+        self.assertEqual(len(response.json()), 2)
+
+    def test_writes_go_to_primary(self):
+        """Tests that objects read from the replica are saved to the primary
+        database."""
+        with read_from_replica():
+            signup = ClassPeriodSignUp.objects.get(pk=self.signup.pk)
+            # pylint: disable-next=protected-access
+            self.assertEqual(signup._state.db, REPLICA_DB_ALIAS)
+            signup.attendance_confirmed = True
+            signup.save()
+
+        self.assertTrue(
+            ClassPeriodSignUp.objects.using("default")
+            .get(pk=signup.pk)
+            .attendance_confirmed
+        )
+        self.assertFalse(
+            ClassPeriodSignUp.objects.using(REPLICA_DB_ALIAS)
+            .get(pk=signup.pk)
+            .attendance_confirmed
+        )
+
+
+class TestReplicaRouterWithoutReplica(SimpleTestCase):
+    """Tests that every query goes to the primary database if no replica is
+    configured."""
+
+    def test_without_replica(self):
+        with mock.patch.dict(settings.DATABASES), read_from_replica():
+            settings.DATABASES.pop(REPLICA_DB_ALIAS, None)
+            self.assertIsNone(ReplicaRouter().db_for_read(ClassPeriod))
+            self.assertEqual(ReplicaRouter().db_for_write(ClassPeriod), "default")
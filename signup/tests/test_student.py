@@ -13,6 +13,7 @@ from signup.models import (
     ClassPeriod,
     ClassPeriodSignUp,
     LibraryFacultyMember,
+    SignUpDateVersion,
     Student,
     StudentInfo,
     student_has_info,
@@ -361,6 +362,23 @@ class TestStudentSignUpView(TestCase):
         self.assertNotContains(response, "form")
         self.assertContains(response, "no available")
 
+    def test_one_version_per_submission(self):
+        """Tests that signing up for several periods at once only increments the
+        version of their date once."""
+        self.add_period_1()
+        self.add_period_6()
+
+        response = self.client.post(
+            reverse("student_sign_up_form"), {"period_1": True, "period_6": "L"}
+        )
+        self.assertRedirects(response, reverse("student_sign_up_success"))
+
+        signup_date = ClassPeriod.objects.first().date
+        self.assertEqual(SignUpDateVersion.objects.get_version(signup_date), 1)
+        self.assertListEqual(
+            list(ClassPeriodSignUp.objects.values_list("version", flat=True)), [1, 1]
+        )
+
     def test_choices(self):
         """Tests that the "lunch" and "study hall" choices are only listed when there is
         a lunch period on the form."""
@@ -145,6 +145,7 @@ class StudentSignUpFormView(StudentNeedsInfoMixin, StudentSignUpOpenMixin, FormV
         return StudentSignUpForm(student=self.request.user, **self.get_form_kwargs())
 
     def form_valid(self, form):
+        signups = []
         for period in form.available_periods:
             number = period.number
             # Checks if period was part of form.
@@ -158,12 +159,17 @@ class StudentSignUpFormView(StudentNeedsInfoMixin, StudentSignUpOpenMixin, FormV
                     reason = yes
                 else:
                     reason = ClassPeriodSignUp.STUDY_HALL
-                ClassPeriodSignUp.objects.create(
-                    student=self.request.user,
-                    class_period=period,
-                    reason=reason,
+                signups.append(
+                    ClassPeriodSignUp(
+                        student=self.request.user,
+                        class_period=period,
+                        reason=reason,
+                    )
                 )
 
+        # The sign-ups are created together so that the version of the date (see
+        # SignUpDateVersion) is only incremented, and its row locked, once.
+        ClassPeriodSignUp.objects.bulk_create(signups)
         return super().form_valid(form)
 
 
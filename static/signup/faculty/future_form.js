@@ -35,3 +35,24 @@ createApp({
         }
     }
 }).mount('#app')
+
+createApp({
+    data() {
+        return { preview: null, previewError: false }
+    },
+    methods: {
+        loadPreview() {
+            let formData = new FormData(document.querySelector('form'))
+
+            fetch(scriptData.preview_url, { method: 'POST', body: formData, headers: { 'X-CSRFToken': formData.get('csrfmiddlewaretoken') } })
+                .then(response => response.ok ? response.json() : Promise.reject())
+                .then(data => {
+                    this.preview = data
+                    this.previewError = false
+                }).catch(() => {
+                    this.preview = null
+                    this.previewError = true
+                })
+        }
+    }
+}).mount('#preview')
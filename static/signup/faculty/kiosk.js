@@ -0,0 +1,57 @@
+const { createApp } = Vue
+
+// Taken from https://stackoverflow.com/a/15724300.
+function getCookie(name) {
+    const value = `; ${document.cookie}`
+    const parts = value.split(`; ${name}=`)
+    if (parts.length === 2) return parts.pop().split(';').shift()
+}
+
+axiosSettings = { headers: { "X-CSRFToken": getCookie('csrftoken') } }
+
+scriptData = JSON.parse(document.getElementById('script_data').textContent)
+
+// Only this many scans are listed under "Recent scans".
+const RECENT_SCAN_COUNT = 10
+
+createApp({
+    data() {
+        // Remembers the selected period if the page is reloaded.
+        let period = Number(localStorage.getItem('kioskPeriod')) || 1
+        return { period: period, studentId: '', result: null, recent: [], errorOccurred: false }
+    },
+    methods: {
+        savePeriod() {
+            localStorage.setItem('kioskPeriod', this.period)
+            this.$refs.studentIdInput.focus()
+        },
+        checkIn() {
+            let studentId = this.studentId.trim()
+            // Clears the input right away so that the next student can scan their ID.
+            this.studentId = ''
+            if (!studentId) return
+
+            axios.post(scriptData.check_in_url, { student_id: studentId, period: this.period }, axiosSettings).then(response => {
+                this.errorOccurred = false
+                this.result = response.data
+                this.recent.unshift(response.data)
+                this.recent.splice(RECENT_SCAN_COUNT)
+            }).catch(() => { this.errorOccurred = true; this.result = null })
+        }
+    },
+    computed: {
+        periodNumbers() {
+            return Array.from({ length: scriptData.max_period_number }, (_, i) => i + 1)
+        },
+        resultClass() {
+            switch (this.result.status) {
+                case 'checked_in':
+                    return 'alert-success'
+                case 'already_checked_in':
+                    return 'alert-info'
+                default:
+                    return 'alert-warning'
+            }
+        }
+    }
+}).mount('#app')
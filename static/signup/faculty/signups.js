@@ -18,6 +18,11 @@ axiosSettings = { headers: { "X-CSRFToken": getCookie('csrftoken') } }
 
 scriptData = JSON.parse(document.getElementById('script_data').textContent)
 
+// Maps the sort keys used by the API to the fields of each sign-up.
+listFields = 'id,period_number,student_name,student_id,reason,attendance_confirmed'
+
+sortFields = { class_period__number: 'period_number', student__name: 'student_name', student__info__id: 'student_id', reason: 'reason', attendance_confirmed: 'attendance_confirmed' }
+
 // filterModal = new bootstrap.Modal(document.getElementById('filterModal'), { 'keyboard': false })
 
 createApp({
@@ -38,11 +43,11 @@ createApp({
         }
     },
     data() {
-        return { signups: [], errorOccurred: false, sortKey: scriptData.default_sort, sortDescending: false, periodNumberInputChecked: false, showFilterModal: false, filterInputs: {}, filters: { date: new Date(scriptData.default_date), periodNumber: null, studentName: null, studentId: null, reason: "" } }
+        return { signups: [], nameSuggestions: [], exportProgress: null, nextUrl: null, loadingMore: false, requestNumber: 0, syncToken: null, syncing: false, eventSource: null, pollingTimer: null, errorOccurred: false, sortKey: scriptData.default_sort, sortDescending: false, periodNumberInputChecked: false, showFilterModal: false, filterInputs: {}, filters: { date: new Date(scriptData.default_date), periodNumber: null, studentName: null, studentId: null, reason: "" } }
     },
     methods: {
-        getURLQueryParameters() {
-            let params = `class_period__date=${getDateFormatted(this.filters.date)}`
+        getURLQueryParameters(dateParameters = null) {
+            let params = dateParameters || `class_period__date=${getDateFormatted(this.filters.date)}`
 
             // Won't filter by period number if this.filters.periodNumber is not a valid number.
             if (this.periodNumberInputChecked && this.filters.periodNumber !== null) {
@@ -63,23 +68,184 @@ createApp({
 
             params += `&ordering=` + (this.sortDescending ? `-${this.sortKey}` : this.sortKey)
 
+            // The dates that students signed up and were confirmed aren't shown, so they aren't fetched.
+            params += `&fields=${listFields}`
+
             return params
         },
         updateSignups() {
-            let url = `${scriptData.list_url}?${this.getURLQueryParameters()}`
+            // Only the first page is fetched. The rest are fetched by loadMoreSignups().
+            let url = `${scriptData.list_url}?${this.getURLQueryParameters()}&page_size=${scriptData.page_size}`
+
+            // Ignores responses for filters or sorting that have since been changed.
+            let requestNumber = ++this.requestNumber
+
+            axios.get(url).then(response => {
+                if (requestNumber !== this.requestNumber) return
+
+                this.signups = response.data.results
+                this.nextUrl = response.data.next
+                this.syncToken = response.headers['x-sync-token']
+                this.loadingMore = false
+                this.$nextTick(this.signupCheckboxToggled)
+            }).catch(() => { this.errorOccurred = true })
+        },
+        suggestNames() {
+            let query = this.filterInputs.studentName
+            if (!query || !query.trim()) {
+                this.nameSuggestions = []
+                return
+            }
+
+            axios.get(scriptData.student_search_url, { params: { q: query } }).then(response => {
+                // Ignores suggestions for text that has since been changed.
+                if (query !== this.filterInputs.studentName) return
+                this.nameSuggestions = [...new Set(response.data.map(student => student.name))]
+            }).catch(() => { this.nameSuggestions = [] })
+        },
+        loadMoreSignups() {
+            if (!this.nextUrl || this.loadingMore) return
+
+            let requestNumber = this.requestNumber
+            this.loadingMore = true
+
+            axios.get(this.nextUrl).then(response => {
+                if (requestNumber !== this.requestNumber) return
+
+                this.signups.push(...response.data.results)
+                this.nextUrl = response.data.next
+                this.loadingMore = false
+                this.$nextTick(this.signupCheckboxToggled)
+            }).catch(() => { this.errorOccurred = true; this.loadingMore = false })
+        },
+        listenForChanges() {
+            // The server pushes an event whenever a sign-up on the selected date changes.
+            if (this.eventSource) {
+                this.eventSource.close()
+            }
+            if (this.pollingTimer) {
+                return
+            }
+
+            let url = scriptData.events_url.replace('0000-00-00', getDateFormatted(this.filters.date))
+            this.eventSource = new EventSource(url)
+
+            this.eventSource.addEventListener('change', event => {
+                let message = JSON.parse(event.data)
+                if (message.reset) {
+                    this.updateSignups()
+                } else if (this.syncToken !== null && message.version > Number(this.syncToken)) {
+                    this.syncSignups()
+                }
+            })
+
+            this.eventSource.onerror = () => {
+                // Browsers reconnect automatically unless the server can't push changes (e.g. it isn't using ASGI), in which case changes are checked for periodically.
+                if (this.eventSource.readyState === EventSource.CLOSED) {
+                    this.eventSource = null
+                    this.pollingTimer = setInterval(this.syncSignups, scriptData.sync_interval)
+                }
+            }
+        },
+        syncSignups() {
+            // Fetches only the sign-ups that changed since the list was loaded or last synced.
+            if (this.syncToken === null || this.syncing) return
+
+            let url = `${scriptData.changes_url}?${this.getURLQueryParameters()}&since=${this.syncToken}`
+            let requestNumber = this.requestNumber
+            this.syncing = true
+
+            axios.get(url).then(response => {
+                this.syncing = false
+                if (requestNumber !== this.requestNumber) return
+
+                if (response.data.reset) {
+                    this.updateSignups()
+                    return
+                }
+
+                let removed = new Set(response.data.removed)
+                this.signups = this.signups.filter(signup => !removed.has(signup.id))
 
-            axios.get(url).then(response => { this.signups = response.data }).catch(() => { this.errorOccurred = true })
+                let addedSignup = false
+                response.data.changed.forEach(changed => {
+                    let existing = this.signups.find(signup => signup.id === changed.id)
+                    if (existing) {
+                        Object.assign(existing, changed)
+                    } else if (!this.nextUrl) {
+                        // New sign-ups are only added once every page has been loaded. Otherwise, they will be included in a later page.
+                        this.signups.push(changed)
+                        addedSignup = true
+                    }
+                })
+                if (addedSignup) {
+                    this.sortSignups()
+                }
+
+                this.syncToken = response.data.token
+                this.$nextTick(this.signupCheckboxToggled)
+            }).catch(() => { this.syncing = false })
+        },
+        sortSignups() {
+            // Sorts the same way as the API: null values first, then ties by ID.
+            let field = sortFields[this.sortKey] || 'student_name'
+            let direction = this.sortDescending ? -1 : 1
+
+            this.signups.sort((a, b) => {
+                let [x, y] = [a[field], b[field]]
+                if (x === y) return (a.id - b.id) * direction
+                if (x === null) return -direction
+                if (y === null) return direction
+                return (x < y ? -1 : 1) * direction
+            })
         },
         downloadSpreadsheet() {
-            let url = `${scriptData.spreadsheet_url}?${this.getURLQueryParameters()}`
+            // The spreadsheet is generated in the background, so its progress is polled until it can be downloaded.
+            let url = `${scriptData.export_url}?${this.getURLQueryParameters()}`
+
+            axios.post(url, {}, axiosSettings).then(response => this.waitForExport(response.data)).catch(() => { this.errorOccurred = true; this.exportProgress = null })
+        },
+        downloadMonthlyAnalytics() {
+            // Summarizes every sign-up matching the other filters in the month of the selected date.
+            let date = this.filters.date
+            let start = new Date(date.getFullYear(), date.getMonth(), 1)
+            let end = new Date(date.getFullYear(), date.getMonth() + 1, 0)
+            let dateParameters = `class_period__date__gte=${getDateFormatted(start)}&class_period__date__lte=${getDateFormatted(end)}`
 
-            window.open(url, '_blank').focus()
+            window.location = `${scriptData.analytics_url}?${this.getURLQueryParameters(dateParameters)}`
+        },
+        waitForExport(spreadsheetExport) {
+            if (spreadsheetExport.status === 'E') {
+                this.errorOccurred = true
+                this.exportProgress = null
+            } else if (spreadsheetExport.download_url) {
+                this.exportProgress = null
+                window.location = spreadsheetExport.download_url
+            } else {
+                this.exportProgress = spreadsheetExport.percent_done
+                setTimeout(() => {
+                    axios.get(spreadsheetExport.status_url).then(response => this.waitForExport(response.data)).catch(() => { this.errorOccurred = true; this.exportProgress = null })
+                }, 1000)
+            }
         },
         confirmAttendance(signUpId, will_confirm) {
             axios.patch(`${scriptData.individual_url}${signUpId}/`, { 'attendance_confirmed': will_confirm }, axiosSettings).then(response => {
                 this.signups.filter(signup => signup.id == signUpId)[0].attendance_confirmed = response.data.attendance_confirmed
             }).catch(() => { this.errorOccurred = true })
         },
+        confirmMultiple(willConfirm) {
+            let ids = this.signups.filter(signup => signup.selected).map(signup => signup.id)
+
+            // Confirms every selected sign-up with one request.
+            axios.post(scriptData.confirm_attendance_url, { id: ids, attendance_confirmed: willConfirm }, axiosSettings).then(response => {
+                response.data.forEach(updated => {
+                    let existing = this.signups.find(signup => signup.id === updated.id)
+                    if (existing) {
+                        Object.assign(existing, updated)
+                    }
+                })
+            }).catch(() => { this.errorOccurred = true })
+        },
         sort(key) {
             if (this.sortKey === key && !this.sortDescending) {
                 this.sortDescending = true
@@ -103,11 +269,15 @@ createApp({
 
             this.filters = { ...this.filterInputs }
             this.updateSignups()
+            this.listenForChanges()
         },
         signupCheckboxToggled() {
             let selectedSignups = this.signups.filter(signup => signup.selected)
             let selectAllCheckbox = document.querySelector("#select-all-signups-checkbox")
 
+            // The checkbox is hidden when there are no sign-ups.
+            if (!selectAllCheckbox) return
+
             if (selectedSignups.length === this.signups.length) {
                 selectAllCheckbox.checked = true
                 selectAllCheckbox.indeterminate = false
@@ -137,15 +307,30 @@ createApp({
             }
         },
         removeMultiple() {
-            let ids = this.signups.filter(signup => signup.selected).map(signup => `id=${signup.id}`).join("&");
+            let request
+            if (!this.nextUrl && this.syncToken && this.signups.every(signup => signup.selected)) {
+                // Every sign-up matching the filters is selected, so the filters are sent instead of the IDs. The sync
+                // token makes the server refuse if the sign-ups changed since they were listed.
+                request = axios.post(`${scriptData.delete_matching_signups}?${this.getURLQueryParameters()}&version=${this.syncToken}`, {}, axiosSettings)
+            } else {
+                let ids = this.signups.filter(signup => signup.selected).map(signup => `id=${signup.id}`).join("&");
+                request = axios.post(scriptData.delete_multiple_signups, ids, axiosSettings)
+            }
 
-            axios.post(scriptData.delete_multiple_signups, ids, axiosSettings).then(() => {
+            request.then(() => {
                 this.signups = this.signups.filter(signup => !signup.selected)
 
                 let selectAllCheckbox = document.querySelector("#select-all-signups-checkbox")
                 selectAllCheckbox.checked = false
                 selectAllCheckbox.indeterminate = false
-            }).catch(() => { this.errorOccurred = true })
+            }).catch(error => {
+                if (error.response && error.response.status === 412) {
+                    // The list is out of date, so it's loaded again for the user to review before deleting.
+                    this.updateSignups()
+                } else {
+                    this.errorOccurred = true
+                }
+            })
         }
     },
     computed: {
@@ -180,6 +365,7 @@ createApp({
     },
     mounted() {
         this.updateSignups()
+        this.listenForChanges()
         this.filterInputs = { ...this.filters }
     }
 }).mount('#app')